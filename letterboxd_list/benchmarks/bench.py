@@ -0,0 +1,229 @@
+"""
+Benchmarks for the package, run against the local stand-in for Letterboxd
+from the tests (see `tests/stub_letterboxd.py`), so the numbers don't depend
+on the real site, and can be compared from one run to the next.
+
+Run from the directory with the `pyproject.toml` in it:
+
+    python -m benchmarks.bench --films 500 --latency 0.05 --json bench.jsonl
+
+The stand-in's film pages are made up, though as long as real ones. To
+download and parse real pages instead, record a run first (e.g. `lblist
+<list URL> --record pages.sqlite3`), and pass `--recorded pages.sqlite3`:
+the stand-in then serves the recorded film and stats pages.
+
+Each scenario runs in a process of its own, so its peak memory use can be
+measured on its own. Results are printed as a table, and with `--json`,
+appended to a file as one JSON line per run, to track them over time.
+"""
+import os
+import sys
+import json
+import time
+import resource
+import tempfile
+import contextlib
+import multiprocessing as mp
+from datetime import datetime, timezone
+from argparse import ArgumentParser
+import letterboxd_list.containers as lbc
+import letterboxd_list.transport as lbt
+import letterboxd_list.__main__ as lbmain
+import letterboxd_list.profiling as profiling
+from letterboxd_list.profiling import percentile
+from letterboxd_list.replay import ResponseArchive
+from tests.stub_letterboxd import StubLetterboxd
+
+ATTRS     = ["director", "writer", "genre", "cast-list", "avg-rating", "likes"]
+LIST_PATH = "/bench/list/benchmark-list/"
+
+
+def peak_rss_mb() -> float:
+    """
+    The most memory this process (or any of its finished children, like
+    pool workers) has had resident at once, in MB.
+    """
+    usage = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    )
+
+    # Linux reports kilobytes, MacOS bytes
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def bench_export(site_url: str, films: int, concurrency: int) -> dict:
+    """
+    `lblist` end to end: `get_list_with_attrs()` into a temporary file. The
+    time per film is the time spent on it across its stages in the workers,
+    from the `--profile` report.
+    """
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(devnull):
+            lbmain.get_list_with_attrs(
+                site_url + LIST_PATH, list(ATTRS), tmp + "/out.csv", concurrency,
+                profile_file=tmp + "/profile.json"
+            )
+        seconds = time.perf_counter() - start
+
+        with open(tmp + "/profile.json", encoding="utf-8") as report_file:
+            per_film = json.load(report_file)["per_film"]
+
+    return {"films": films, "seconds": seconds, "p50_ms": per_film["p50_ms"], "p99_ms": per_film["p99_ms"]}
+
+
+def bench_sub_init(site_url: str, films: int, concurrency: int) -> dict:
+    """
+    `LetterboxdList(sub_init=True)`: the list pages, then every film page.
+    The time per film is the time spent on it across its stages (see
+    `profiling.Profile.film_seconds()`).
+    """
+    profiling.enable()
+    start = time.perf_counter()
+    lbc.LetterboxdList(site_url + LIST_PATH, sub_init=True, max_concurrent=concurrency)
+    seconds = time.perf_counter() - start
+
+    profile = profiling.Profile()
+    profile.merge(profiling.take())
+    profiling.disable()
+
+    return {"films": films, "seconds": seconds, "latencies": list(profile.film_seconds().values())}
+
+
+def bench_fetch_films(site_url: str, films: int, concurrency: int) -> dict:
+    """
+    `fetch_films()` with stats pages, timing each film from when its first
+    request is started to when it's ready.
+    """
+    urls    = [f"{site_url}/film/film-{n}/" for n in range(films)]
+    started = {}
+
+    def timed(film_urls):
+        # the engine takes the next URL just as it starts the request for it
+        for i, url in enumerate(film_urls):
+            started[i] = time.perf_counter()
+            yield url
+
+    latencies = []
+    start     = time.perf_counter()
+    for i, _ in lbc.fetch_films(timed(urls), concurrency, with_stats=True):
+        latencies.append(time.perf_counter() - started[i])
+
+    return {"films": films, "seconds": time.perf_counter() - start, "latencies": latencies}
+
+
+def bench_get_attrs_csv(site_url: str, films: int, concurrency: int) -> dict:
+    """
+    `get_attrs_csv()` alone, on films (and stats pages) fetched beforehand,
+    so this is just the cost of extraction.
+    """
+    urls    = [f"{site_url}/film/film-{n}/" for n in range(films)]
+    fetched = [film for _, film in lbc.fetch_films(urls, concurrency, with_stats=True)]
+    plan    = lbc.ExtractionPlan(ATTRS)
+
+    latencies = []
+    start     = time.perf_counter()
+    for film in fetched:
+        film_start = time.perf_counter()
+        film.get_attrs_csv(plan)
+        latencies.append(time.perf_counter() - film_start)
+
+    return {"films": films, "seconds": time.perf_counter() - start, "latencies": latencies}
+
+
+SCENARIOS = {
+    "export":        bench_export,
+    "sub-init":      bench_sub_init,
+    "fetch-films":   bench_fetch_films,
+    "get-attrs-csv": bench_get_attrs_csv,
+}
+
+
+def run_scenario(name: str, site_url: str, films: int, concurrency: int, results):
+    """
+    Runs one scenario (in its own process), putting its results in `results`.
+    """
+    outcome = SCENARIOS[name](site_url, films, concurrency)
+    latencies = outcome.pop("latencies", [])
+
+    outcome["films_per_sec"] = outcome["films"] / outcome["seconds"]
+    outcome.setdefault("p50_ms", percentile([s * 1000 for s in latencies], 50))
+    outcome.setdefault("p99_ms", percentile([s * 1000 for s in latencies], 99))
+    outcome["peak_rss_mb"]   = peak_rss_mb()
+    results.put(outcome)
+
+
+def run(films: int, latency: float, concurrency: int, scenarios: list[str], recorded: str | None = None) -> dict:
+    """
+    Runs `scenarios` against a stand-in site with a list of `films` films,
+    where every response takes `latency` seconds. With `recorded` (the path
+    to a `ResponseArchive`), the site serves the film pages recorded in it.
+    """
+    site = StubLetterboxd()
+    site.latency = latency
+    site.add_list(LIST_PATH, list(range(films)))
+    if recorded:
+        site.serve_recorded(ResponseArchive(recorded))
+
+    ctx     = mp.get_context("spawn")
+    results = {}
+    try:
+        for name in scenarios:
+            queue = ctx.Queue()
+            proc  = ctx.Process(target=run_scenario, args=(name, site.url, films, concurrency, queue))
+            proc.start()
+            results[name] = queue.get()
+            proc.join()
+    finally:
+        site.close()
+
+    return results
+
+
+def print_table(results: dict):
+    """
+    Prints the results of a run, one scenario per row.
+    """
+    print(f"{'scenario':<15}{'films/s':>10}{'p50 (ms)':>10}{'p99 (ms)':>10}{'peak RSS (MB)':>15}")
+    for name, res in results.items():
+        p50 = f"{res['p50_ms']:.2f}" if res["p50_ms"] is not None else "-"
+        p99 = f"{res['p99_ms']:.2f}" if res["p99_ms"] is not None else "-"
+        print(f"{name:<15}{res['films_per_sec']:>10.1f}{p50:>10}{p99:>10}{res['peak_rss_mb']:>15.1f}")
+
+
+def main():
+    ap = ArgumentParser(description="Benchmarks the package against a local stand-in for Letterboxd.")
+    ap.add_argument('--films', type=int, default=300,
+                    help="How many films are in the benchmark list. Default: 300.")
+    ap.add_argument('--latency', type=float, default=0.02,
+                    help="Seconds added to every response from the stand-in site. Default: 0.02.")
+    ap.add_argument('-c', '--concurrency', type=int, default=lbt.DEFAULT_CONCURRENCY,
+                    help="The most requests to have in flight at once. Default: 64.")
+    ap.add_argument('--scenarios', nargs='*', choices=list(SCENARIOS), default=list(SCENARIOS),
+                    help="Which scenarios to run. Default: all of them.")
+    ap.add_argument('--recorded', type=str, default=None,
+                    help="Serve the film and stats pages recorded in this archive \
+                        (made with `lblist --record`), instead of made-up ones.")
+    ap.add_argument('--json', type=str, default=None,
+                    help="Append the results to this file, as a line of JSON.")
+    args = ap.parse_args()
+
+    results = run(args.films, args.latency, args.concurrency, args.scenarios, args.recorded)
+    print_table(results)
+
+    if args.json:
+        record = {
+            "time":        datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "films":       args.films,
+            "latency":     args.latency,
+            "concurrency": args.concurrency,
+            "recorded":    args.recorded,
+            "results":     results,
+        }
+        with open(args.json, "a", encoding="utf-8") as out:
+            out.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,39 +4,40 @@ This gets the elements of a list on Letterboxd
 
 import os
 import sys
+import time
+import queue
 import multiprocessing as mp
-import itertools
-from shutil import get_terminal_size
 from math import ceil
 from datetime import datetime
-from argparse import ArgumentParser
+from collections.abc import Iterator
+from argparse import ArgumentParser, ArgumentTypeError
 import letterboxd_list.containers as lbc
-
-
-def go_global(row_counter):
-    global rows_done
-    rows_done = row_counter
-
-
-def print_progress_bar(rows_now: int, total_rows: int, func_start_time: datetime):
-    """
-    Handles progress bar output. Will change width if terminal width changes
-    during runtime.
-    """
-    output_width  = get_terminal_size(fallback=(80,25))[0]-37
-    completion    = rows_now/total_rows
-    bar_width_now = ceil(output_width * completion)
-
-    since_start   = datetime.now() - func_start_time
-    est_remaining = since_start * (total_rows/rows_now - 1)
-    minutes       = int(est_remaining.total_seconds()) // 60
-    seconds       = est_remaining.seconds % 60                   # `seconds` may be > 60
-
-    print("| ", "█" * bar_width_now,
-            (output_width - bar_width_now) * " ", "|",
-            f"{completion:.0%}  ",
-            f"Time remaining: {minutes:02d}:{seconds:02d}",
-            end = "\r")
+import letterboxd_list.transport as lbt
+import letterboxd_list.sinks as sinks
+import letterboxd_list.progress as progress
+import letterboxd_list.profiling as profiling
+from letterboxd_list.checkpoint import Checkpoint, Manifest
+from letterboxd_list.cache import ResponseCache, DEFAULT_MAX_AGES
+from letterboxd_list.ratelimit import RateLimiter
+from letterboxd_list.replay import ResponseArchive
+from letterboxd_list.scheduler import ChunkScheduler
+from letterboxd_list.traffic import Traffic
+from letterboxd_list.transport import DEFAULT_CONCURRENCY
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+# for handing out work to the pool (see get_list_with_attrs())
+MIN_CHUNK_SIZE        = 16
+MAX_CHUNK_SIZE_FACTOR = 4           # the biggest chunk, in multiples of the smallest
+CHUNKS_QUEUED_PER_CPU = 2
+CHUNKS_AHEAD_PER_CPU  = 4
+
+
+def go_global(progress_args, transport_options, profile=False):
+    progress.attach_worker(*progress_args)
+    lbt.configure_default_transport(**transport_options)
+    if profile:
+        profiling.enable()
 
 
 def to_capital_header(attr: str) -> str:
@@ -50,102 +51,536 @@ def to_capital_header(attr: str) -> str:
     return uc_attr
 
 
+def csv_header(attrs: list) -> str:
+    """
+    The CSV header for `attrs` (without the rank).
+    """
+    header = "Title,Year"
+    for attr in attrs:
+        header  += "," + to_capital_header(attr)
+
+    return header
+
+
+def open_sink(
+    output_format: str,
+    path: str,
+    attrs: list,
+    ranked: bool,
+    extra_columns: tuple = ()
+    ) -> sinks.Sink:
+    """
+    The sink to write an export's rows to `path` with, in `output_format`
+    (see `sinks.FORMATS`), with columns for `attrs` and `extra_columns`
+    after the title and year.
+    """
+    if output_format == "csv":
+        header = csv_header(list(attrs) + list(extra_columns))
+        return sinks.CSVSink(path, header, ranked)
+
+    columns = ["title", "year"] + list(attrs) + list(extra_columns)
+    if output_format == "jsonl":
+        return sinks.JSONLinesSink(path, columns, ranked)
+
+    return sinks.ArrowSink(path, columns, ranked, output_format)
+
+
 # for parallelization
 def get_batch_rows(
     batch: tuple, 
-    attrs: list, 
-    start_time: datetime, 
-    total_rows: int
+    plan: lbc.ExtractionPlan, 
+    max_concurrent: int,
+    output_format: str = "csv"
     ) -> list:
     """
-    Since the iterable sent to this function is created by 
-    `itertools.batched`, it is a `list` of `LetterboxdFilms`, 
-    not a `LetterboxdList`, which is fine for our puposes here.
+    Since the iterable sent to this function is a slice of the
+    list's URLs, it is a `list` of `str`s, not a `LetterboxdList`,
+    which is fine for our puposes here.
+
+    The films in the batch are fetched concurrently (up to `max_concurrent`
+    at a time), so the rows are put back in batch order as they come in.
+    If likes or watches were requested, each film's stats page is fetched 
+    alongside its film page.
+
+    Finished films are counted with `progress.report_done()`, which doesn't
+    lock or print anything; the main process shows the progress.
+
+    Rows are CSV lines, unless `output_format` is one of the structured
+    ones, in which case each row is a `list` of the film's title, year, and 
+    attribute values, for the sink to lay out.
     """
     
-    batch_rows = []
-    for url in batch:
-        film = lbc.LetterboxdFilm(url)
+    batch_rows = [""] * len(batch)
+    for i, film in lbc.fetch_films(batch, max_concurrent, with_stats=plan.needs_stats):
+        if output_format != "csv":
+            batch_rows[i] = [film.title, film.year, *plan.extract(film)]
+            progress.report_done()
+            continue
+
         title = "\"" + film.title + "\""            # rudimentary sanitizing
         file_row = title+","+film.year
 
-        if len(attrs) > 0:
-            file_row += "," + film.get_attrs_csv(attrs)
+        if len(plan.attrs) > 0:
+            file_row += "," + film.get_attrs_csv(plan)
 
-        batch_rows.append(file_row + "\n")
-
-        with rows_done.get_lock():
-            rows_done.value += 1
-            print_progress_bar(rows_done.value, total_rows, start_time)
+        batch_rows[i] = file_row + "\n"
+        progress.report_done()
 
     return batch_rows
 
 
+def timed_batch_rows(*args) -> tuple[list, float, dict | None, dict]:
+    """
+    `get_batch_rows()`, along with how many seconds it took, which the
+    scheduler sizes later chunks from, the worker's per-stage timings
+    of the films (if profiling; see `profiling.take()`), and the bytes 
+    it's downloaded since its last chunk (see `Traffic.take()`).
+    """
+    start = time.perf_counter()
+    rows  = get_batch_rows(*args)
+    return rows, time.perf_counter() - start, profiling.take(), lbt.default_transport().traffic.take()
+
+
 def get_list_with_attrs(letterboxd_list_url: str,
                         attrs: list,
-                        output_file: str):
+                        output_file: str,
+                        concurrency: int = DEFAULT_CONCURRENCY,
+                        transport_options: dict | None = None,
+                        resume: bool = False,
+                        update: bool = False,
+                        profile_file: str | None = None,
+                        output_format: str = "csv"):
     """
     The central function for the app.
+
+    `concurrency` is the total number of film requests in flight at once,
+    split evenly between the worker processes. `transport_options` are passed 
+    on to every `Transport` made, in this process and the workers (see 
+    `transport.configure_default_transport()`); a `limiter`'s rate is split 
+    evenly between the workers too.
+
+    Rows are written to `output_file` as they finish (in list order), 
+    rather than all at the end. They're also journaled to a checkpoint file
+    until the export is complete; with `resume`, the films already in that
+    journal aren't fetched again.
+
+    With `update`, `output_file` is brought up to date with the list rather
+    than made from scratch: only the films added since the export recorded 
+    in its manifest are fetched, and the rest of the rows are reused (with 
+    their ranks corrected).
+
+    With `profile_file`, the time each film spends in each stage (see
+    `profiling.STAGES`) is recorded in the workers, and a report of it is
+    written to that file as JSON at the end.
+
+    `output_format` is one of `sinks.FORMATS`; only CSV exports can be
+    updated.
+
+    At the end, how many bytes were downloaded for the list, film and stats
+    pages is printed, compressed and decompressed (see `Traffic.report()`).
     """
+    if update and output_format != "csv":
+        raise lbc.RequestError("Only CSV exports can be brought up to date with --update.")
 
     print("\nCollecting films in list...\n")
-    start_time = datetime.now()     # used in est time remaining in print_progress_bar()
+    start_time = datetime.now()     # used in est time remaining in the progress bar
     attrs.sort()                    # alphabetize
+    transport_options = transport_options or {}
+    lbt.configure_default_transport(**transport_options)
     lb_list = lbc.LetterboxdList(letterboxd_list_url)
+    plan    = lbc.ExtractionPlan(attrs)     # worked out once, for every film
+
+    header  = csv_header(attrs)
+    if output_format != "csv":
+        header += f" ({output_format})"        # so a checkpoint isn't resumed in another format
 
     cpus       = os.cpu_count()
-    rows_done  = mp.Value('i', 0)
-    tpool      = mp.Pool(processes=cpus, initializer=go_global, initargs=(rows_done,))
-    batch_size = lb_list.length // cpus
-    
-    # don't multithread for small lists
-    if cpus > lb_list.length:
-        batch_size = lb_list.length
-    
-    batches   = [b for b in itertools.batched(lb_list, batch_size)]
-    threads   = [
-        tpool.apply_async(
-            get_batch_rows, 
-            [b, attrs, start_time, lb_list.length]
-        ) 
-        for b in batches
-    ]
-
-    csv_lines = []
-    for thread in threads:
-        csv_lines.extend(thread.get())
-
-    # easier to deal with ranking with the list all collected in one,
-    # versus making sure the right row number goes to the right row
-    if lb_list.is_ranked:
-        csv_lines = [f"{str(i+1)},{row}" for (i, row) in enumerate(csv_lines)]
-
-    with open(output_file, "w", encoding="utf-8") as lbfile_writer:
-
-        # finalize header
-        header = "Title,Year"
-        
-        for attr in attrs:
-            header  += "," + to_capital_header(attr)
-
-        if lb_list.is_ranked:
-            header = "Rank," + header
-        
-        lbfile_writer.write(header+"\n")
-        lbfile_writer.writelines(csv_lines)
+    film_urls  = list(lb_list)
+    per_proc   = max(1, ceil(concurrency / cpus))
+    checkpoint = Checkpoint(output_file, letterboxd_list_url, header)
+    manifest   = Manifest(output_file, letterboxd_list_url, header)
+
+    worker_options = dict(transport_options)
+    if "limiter" in worker_options:
+        worker_options["limiter"] = worker_options["limiter"].split(cpus)
+
+    # rows finished by an earlier run, if resuming (an interrupted update
+    # journals the rows it reuses, so it resumes from the journal too)
+    done     = {}
+    resuming = resume and checkpoint.exists
+    if resuming:
+        done = checkpoint.load(film_urls)
+    elif update:
+        prev_urls, prev_rows = manifest.load()
+        changes = lb_list.diff(prev_urls)
+        done    = reused_chunks(changes.kept, prev_rows)
+        print(
+            f"{len(changes.added)} film(s) added and {len(changes.removed)} removed "
+            "since the last export.\n"
+        )
+    profile  = profiling.Profile() if profile_file else None
+    traffic  = Traffic()
+    reporter = progress.ProgressReporter(lb_list.length, cpus, start_time)
+    reporter.add(sum(len(rows) for rows in done.values()))
+
+    # Chunks are handed out a few at a time as workers finish them (see
+    # `ChunkScheduler`), at least big enough to keep each worker's requests
+    # in flight. Only so many rows are handed out past the first unwritten
+    # one, which bounds how many finished rows can pile up in the sink 
+    # waiting for a slow chunk ahead of them.
+    chunk_size = max(MIN_CHUNK_SIZE, 2 * per_proc)
+    max_ahead  = CHUNKS_AHEAD_PER_CPU * cpus * chunk_size
+    scheduler  = ChunkScheduler(
+        missing_chunks(len(film_urls), done, len(film_urls)),
+        cpus,
+        chunk_size,
+        MAX_CHUNK_SIZE_FACTOR * chunk_size
+    )
+
+    with (
+        mp.Pool(
+            processes=cpus,
+            initializer=go_global,
+            initargs=(reporter.initargs(), worker_options, profile is not None)
+        ) as tpool,
+        open_sink(output_format, output_file, attrs, lb_list.is_ranked) as sink,
+        reporter
+    ):
+        checkpoint.start(resume)
+        try:
+            for start, rows in done.items():
+                if not resuming:
+                    checkpoint.record(start, film_urls[start:start+len(rows)], rows)
+                sink.write(start, rows)
+
+            chunks = run_chunks(
+                tpool, film_urls, scheduler, (plan, per_proc, output_format),
+                CHUNKS_QUEUED_PER_CPU * cpus, lambda: sink.written, max_ahead, profile, traffic
+            )
+            for start, rows in chunks:
+                checkpoint.record(start, film_urls[start:start+len(rows)], rows)
+                sink.write(start, rows)
+
+        except BaseException:
+            checkpoint.close()
+            print(
+                f"\n\nProgress has been saved to {checkpoint.path}. Run the same "
+                "command with --resume to pick up where this left off.",
+                file=sys.stderr
+            )
+            raise
+
+    manifest.save(film_urls)
+    checkpoint.remove()
+
+    if profile is not None:
+        profile.write(profile_file, (datetime.now() - start_time).total_seconds())
+
+    # the list pages were fetched from this process
+    traffic.merge(lbt.default_transport().traffic.take())
+    print("\n\n" + traffic.report())
+
+
+def get_lists_with_attrs(list_urls: list[str],
+                         attrs: list,
+                         output: str,
+                         concurrency: int = DEFAULT_CONCURRENCY,
+                         transport_options: dict | None = None,
+                         combined: bool = False,
+                         profile_file: str | None = None,
+                         output_format: str = "csv"):
+    """
+    Exports many lists in one go, fetching each film only once, however many
+    of the lists it's in. Otherwise, works like `get_list_with_attrs()`.
+
+    Without `combined`, each list is written to a file of its own in the 
+    `output` directory, named after the list (see `list_csv_name()`). With
+    it, every film in any of the lists is written once to the `output` file, 
+    along with a `Lists` column of the URLs of the lists it's in.
+
+    The bytes downloaded are reported at the end, for all the lists together.
+    """
+
+    print("\nCollecting films in lists...\n")
+    start_time = datetime.now()
+    attrs.sort()
+    transport_options = transport_options or {}
+    lbt.configure_default_transport(**transport_options)
+    lb_lists = [lbc.LetterboxdList(url) for url in list_urls]
+    plan     = lbc.ExtractionPlan(attrs)
+
+    paths = {}
+    if not combined:
+        for lb_list in lb_lists:
+            path = os.path.join(output, list_csv_name(lb_list.url, sinks.EXTENSIONS[output_format]))
+            if path in paths.values():
+                raise lbc.RequestError(f"More than one of the lists would be written to {path}.")
+            paths[lb_list.url] = path
+
+    # every film once, in the order they first come up
+    film_urls = list(dict.fromkeys(url for lb_list in lb_lists for url in lb_list))
+    total     = sum(lb_list.length for lb_list in lb_lists)
+    print(f"{len(film_urls)} unique film(s) across {len(lb_lists)} lists ({total} in all).\n")
+
+    cpus     = os.cpu_count()
+    per_proc = max(1, ceil(concurrency / cpus))
+
+    worker_options = dict(transport_options)
+    if "limiter" in worker_options:
+        worker_options["limiter"] = worker_options["limiter"].split(cpus)
+
+    profile    = profiling.Profile() if profile_file else None
+    traffic    = Traffic()
+    reporter   = progress.ProgressReporter(len(film_urls), cpus, start_time)
+    chunk_size = max(MIN_CHUNK_SIZE, 2 * per_proc)
+    scheduler  = ChunkScheduler(
+        [(0, len(film_urls))],
+        cpus,
+        chunk_size,
+        MAX_CHUNK_SIZE_FACTOR * chunk_size
+    )
+    rows = [None] * len(film_urls)
+
+    with (
+        mp.Pool(
+            processes=cpus,
+            initializer=go_global,
+            initargs=(reporter.initargs(), worker_options, profile is not None)
+        ) as tpool,
+        reporter
+    ):
+        chunks = run_chunks(
+            tpool, film_urls, scheduler, (plan, per_proc, output_format),
+            CHUNKS_QUEUED_PER_CPU * cpus, profile=profile, traffic=traffic
+        )
+        for start, chunk_rows in chunks:
+            rows[start:start+len(chunk_rows)] = chunk_rows
+
+    row_of = dict(zip(film_urls, rows))
+    if combined:
+        in_lists = {url: [] for url in film_urls}
+        for lb_list in lb_lists:
+            for url in lb_list:
+                in_lists[url].append(lb_list.url)
+
+        with open_sink(output_format, output, attrs, False, ("lists",)) as sink:
+            if output_format == "csv":
+                sink.write(0, [
+                    row[:-1] + "," + lbc.quote_enclose("; ".join(in_lists[url])) + "\n"
+                    for url, row in row_of.items()
+                ])
+            else:
+                sink.write(0, [row + [in_lists[url]] for url, row in row_of.items()])
+    else:
+        os.makedirs(output, exist_ok=True)
+        for lb_list in lb_lists:
+            with open_sink(output_format, paths[lb_list.url], attrs, lb_list.is_ranked) as sink:
+                sink.write(0, [row_of[url] for url in lb_list])
+
+    if profile is not None:
+        profile.write(profile_file, (datetime.now() - start_time).total_seconds())
+
+    traffic.merge(lbt.default_transport().traffic.take())
+    print("\n\n" + traffic.report())
+
+
+def run_chunks(
+    tpool,
+    film_urls: list[str],
+    scheduler: ChunkScheduler,
+    row_args: tuple,
+    max_queued: int,
+    written=None,
+    max_ahead: int = 0,
+    profile: profiling.Profile | None = None,
+    traffic: Traffic | None = None
+    ) -> Iterator[tuple[int, list]]:
+    """
+    Hands out chunks of `film_urls` from `scheduler` to the workers in `tpool`
+    a few at a time (at most `max_queued` at once), yielding `(start, rows)` 
+    for each one as it finishes, in whatever order they do. Each chunk's rows
+    are made by `get_batch_rows()`, with `row_args` after the chunk's films.
+
+    If `written` is given (a function returning how many rows have been 
+    written out so far), no chunk is handed out that starts `max_ahead` or 
+    more rows past that. Workers' timings are added to `profile`, and the
+    bytes they download to `traffic`, if given.
+    """
+    finished    = queue.Queue()
+    outstanding = 0
+    while scheduler.remaining > 0 or outstanding > 0:
+
+        while (
+            scheduler.remaining > 0
+            and outstanding < max_queued
+            and (written is None or scheduler.next_start - written() < max_ahead)
+        ):
+            start, end = scheduler.next_chunk()
+            tpool.apply_async(
+                timed_batch_rows,
+                [film_urls[start:end], *row_args],
+                callback=lambda result, start=start: finished.put((start, result)),
+                error_callback=lambda err: finished.put((None, err))
+            )
+            outstanding += 1
+
+        start, result = finished.get()
+        if start is None:
+            raise result                # an exception from a worker
+
+        rows, seconds, timings, downloaded = result
+        outstanding -= 1
+        scheduler.record(len(rows), seconds)
+        if profile is not None:
+            profile.merge(timings)
+        if traffic is not None:
+            traffic.merge(downloaded)
+
+        yield start, rows
+
+
+def reused_chunks(kept: dict[int, int], prev_rows: list[str]) -> dict[int, list[str]]:
+    """
+    Groups the rows of films that are still in the list (`kept`, as from 
+    `LetterboxdList.diff()`) into runs of consecutive list indices, as a 
+    `dict` from each run's starting index to its rows (like `Checkpoint.load()`).
+    """
+    chunks = {}
+    start  = None
+    for n in sorted(kept):
+        if start is None or n != start + len(chunks[start]):
+            start = n
+            chunks[start] = []
+        chunks[start].append(prev_rows[kept[n]])
+
+    return chunks
+
+
+def missing_chunks(length: int, done: dict[int, list], chunk_size: int) -> list[tuple[int, int]]:
+    """
+    Splits the list indices not covered by `done` (a `dict` from a chunk's
+    starting index to its rows) into `(start, end)` chunks of at most 
+    `chunk_size` films. Chunks in `done` that overlap an earlier one are
+    dropped from it, so their films get fetched again instead.
+    """
+    covered = [False] * length
+    for start in sorted(done):
+        end = start + len(done[start])
+        if any(covered[start:end]):
+            del done[start]
+            continue
+        covered[start:end] = [True] * (end - start)
+
+    chunks = []
+    start  = 0
+    while start < length:
+        if covered[start]:
+            start += 1
+            continue
+
+        end = start
+        while end < length and not covered[end] and end - start < chunk_size:
+            end += 1
+
+        chunks.append((start, end))
+        start = end
+
+    return chunks
+
+
+def max_age_arg(value: str) -> tuple[str | None, float]:
+    """
+    Parses a `--max-age` value, which is either a duration (applying to
+    every kind of page) or `KIND=DURATION`. Durations are a number of
+    seconds, optionally followed by a unit: `s`, `m`, `h`, or `d`.
+    """
+    kind, _, duration = value.rpartition("=")
+    if kind and kind not in DEFAULT_MAX_AGES:
+        raise ArgumentTypeError(
+            f"unknown kind of page '{kind}' (choose from {', '.join(DEFAULT_MAX_AGES)})"
+        )
+
+    unit = duration[-1:]
+    if unit in DURATION_UNITS:
+        duration = duration[:-1]
+
+    try:
+        seconds = float(duration) * DURATION_UNITS.get(unit, 1)
+    except ValueError as val_err:
+        raise ArgumentTypeError(f"invalid duration '{value}'") from val_err
+
+    return (kind or None, seconds)
+
+
+def transport_options_from_args(cli_args: dict) -> dict:
+    """
+    Builds the options for `get_list_with_attrs()`'s `Transport`s from the
+    parsed command line arguments.
+    """
+    options = {}
+
+    if cli_args['cache_dir']:
+        max_ages = {}
+        for kind, seconds in cli_args['max_age']:
+            if kind is None:
+                max_ages |= {k: seconds for k in DEFAULT_MAX_AGES}
+            else:
+                max_ages[kind] = seconds
+
+        options["cache"] = ResponseCache(cli_args['cache_dir'], max_ages)
+
+    options["limiter"] = RateLimiter(cli_args['rate_limit'], max_retries=cli_args['max_retries'])
+    options["http2"]   = not cli_args['http1']
+
+    if cli_args['record']:
+        options["archive"] = ResponseArchive(cli_args['record'], "record")
+    elif cli_args['replay']:
+        options["archive"] = ResponseArchive(cli_args['replay'], "replay")
+
+    return options
+
+
+def list_csv_name(list_url: str, extension: str = ".csv") -> str:
+    """
+    The file name for a list's CSV: the list name as it appears at the
+    end of the URL, with `.csv` (or another `extension`) at the end.
+    """
+    return list_url.rstrip("/").split("/")[-1] + extension
+
+
+def list_urls_from_args(lists: list[str]) -> list[str]:
+    """
+    The list URLs given to `--batch`, where each value is either a URL or
+    the path to a file of them, one per line (blank lines and lines 
+    starting with `#` are skipped).
+    """
+    urls = []
+    for value in lists:
+        if value.startswith("http"):
+            urls.append(value)
+            continue
+
+        with open(value, encoding="utf-8") as url_file:
+            for line in url_file:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    urls.append(line)
+
+    return list(dict.fromkeys(urls))        # each list once
 
 
 # so the argparser will play nice with -h
 def default_output_file():
     """
-    Generate default output file name.
+    Generate default output file name. In batch mode, where the default
+    depends on `--combined`, it's left to `run_export()`.
     """
     url = [a for a in sys.argv if a.startswith("http")]
 
-    if len(url) == 0:
+    if len(url) == 0 or "--batch" in sys.argv:
         return None
 
-    return url[0].split("/")[-2]+".csv"   # use the list name in URL .csv
+    return list_csv_name(url[0])
 
 
 def parse_cli_args() -> dict:
@@ -156,12 +591,24 @@ def parse_cli_args() -> dict:
         given Letterboxd list, and puts it in a CSV file (title and year are automatically \
         included, and rank if list is ranked)")
 
-    ap.add_argument('-u','--list-url',
+    list_args = ap.add_mutually_exclusive_group(required=True)
+    list_args.add_argument('-u','--list-url',
                     type=str,
-                    required=True,
                     help="The URL of the Letterboxd list."
                     )
 
+    list_args.add_argument('--batch',
+                    nargs='+',
+                    default=None,
+                    metavar='LIST',
+                    help="Export many lists at once, given as URLs or as files \
+                        with one URL per line. Films in more than one of the \
+                        lists are only fetched once. Each list is written to \
+                        its own file (in the --format given), named after the \
+                        list, in the directory given by --output-file (by \
+                        default, the present one)."
+                    )
+
     ap.add_argument('-a','--attributes',
                     nargs='*',
                     choices=lbc.VALID_ATTRS,
@@ -178,9 +625,142 @@ def parse_cli_args() -> dict:
                     type=str,
                     default=default_output_file(),
                     required=False,
-                    help="CSV file to write the data to. Defaults to the \
-                        list name as it appears at the end of the URL with \
-                        '.csv' at the end, in the present directory."
+                    help="The file to write the data to, in the --format given \
+                        (CSV by default). Defaults to the list name as it \
+                        appears at the end of the URL, with the format's \
+                        extension (e.g. '.csv'), in the present directory. \
+                        With --batch, this is the directory each list's file \
+                        is written to instead, or with --combined, the one \
+                        file for all the lists ('lists.csv' by default, or \
+                        with the format's extension)."
+                    )
+
+    ap.add_argument('--format',
+                    choices=sinks.FORMATS,
+                    default="csv",
+                    required=False,
+                    help="The format to write the output in. Besides CSV, the \
+                        output can be JSON Lines (jsonl), Parquet, or an Arrow \
+                        IPC file (arrow), which keep lists, the cast list, and \
+                        numbers as they are instead of flattening them into \
+                        text (Parquet and Arrow need pyarrow). If no output \
+                        file is given, the default one gets the format's \
+                        extension. Default: csv."
+                    )
+
+    ap.add_argument('--combined',
+                    default=False,
+                    action='store_true',
+                    required=False,
+                    help="With --batch, write every film in any of the lists \
+                        to one file (--output-file, by default lists.csv, or \
+                        with the --format's extension) instead, with a column \
+                        of the lists each one is in."
+                    )
+
+    ap.add_argument('-c', '--concurrency',
+                    type=int,
+                    default=DEFAULT_CONCURRENCY,
+                    required=False,
+                    help="The most film page requests to have in flight at \
+                        once, across all worker processes. Raise this for \
+                        long lists on a fast connection. Default: 64."
+                    )
+
+    ap.add_argument('--cache-dir',
+                    type=str,
+                    default=None,
+                    required=False,
+                    help="Keep the pages fetched from Letterboxd in a cache in \
+                        this directory, so later runs over the same films \
+                        read them from disk instead. Off by default."
+                    )
+
+    ap.add_argument('--max-age',
+                    nargs='*',
+                    type=max_age_arg,
+                    default=[],
+                    required=False,
+                    help="How long cached pages are used before checking back \
+                        with Letterboxd, as KIND=DURATION (KIND being list, \
+                        film, or stats) or just DURATION for all of them, e.g. \
+                        '--max-age film=30d stats=1h'. Durations are in seconds, \
+                        or can end in s, m, h, or d. Defaults: list=1h, \
+                        film=7d, stats=6h."
+                    )
+
+    ap.add_argument('--rate-limit',
+                    type=float,
+                    default=None,
+                    required=False,
+                    help="The most requests to make to Letterboxd per second, \
+                        across all worker processes. Whether or not this is \
+                        set, fewer requests are kept in flight while the \
+                        server is turning them away. No limit by default."
+                    )
+
+    ap.add_argument('--max-retries',
+                    type=int,
+                    default=4,
+                    required=False,
+                    help="How many times to retry a request that the server \
+                        turned away (with a 429 or a 5xx status code) before \
+                        giving up, waiting a little longer each time. Default: 4."
+                    )
+
+    ap.add_argument('--http1',
+                    action='store_true',
+                    required=False,
+                    help="Only use HTTP/1.1. By default, requests are made over \
+                        HTTP/2 where possible, which lets many of them share \
+                        one connection."
+                    )
+
+    archive_args = ap.add_mutually_exclusive_group()
+    archive_args.add_argument('--record',
+                    type=str,
+                    default=None,
+                    required=False,
+                    help="Save every response from Letterboxd to this archive \
+                        file, so the run can be repeated later with --replay."
+                    )
+
+    archive_args.add_argument('--replay',
+                    type=str,
+                    default=None,
+                    required=False,
+                    help="Answer every request from this archive file (made \
+                        with --record) instead of Letterboxd, without using \
+                        the network at all."
+                    )
+
+    ap.add_argument('--resume',
+                    default=False,
+                    action='store_true',
+                    required=False,
+                    help="Pick up an export that was interrupted, from the \
+                        checkpoint it left next to the output file, fetching \
+                        only the films it hadn't gotten to yet."
+                    )
+
+    ap.add_argument('--update',
+                    default=False,
+                    action='store_true',
+                    required=False,
+                    help="Bring an earlier export (the output file) up to date \
+                        with the list, only fetching the films added to it \
+                        since. Films removed from the list are dropped, and \
+                        ranks are corrected."
+                    )
+
+    ap.add_argument('--profile',
+                    type=str,
+                    default=None,
+                    required=False,
+                    help="Time each stage every film goes through (DNS, \
+                        connecting, downloading, parsing, extracting each kind \
+                        of attribute, and so on), and write a report of where \
+                        the time went to this JSON file."
                     )
 
     ap.add_argument('--debug',
@@ -195,6 +775,49 @@ def parse_cli_args() -> dict:
     return vars(ap.parse_args())
 
 
+def run_export(cli_args: dict):
+    """
+    Runs the export asked for on the command line: a single list, or with
+    `--batch`, many.
+    """
+    extension = sinks.EXTENSIONS[cli_args['format']]
+
+    if not cli_args['batch']:
+        output = cli_args['output_file']
+        if output == list_csv_name(cli_args['list_url']):
+            output = list_csv_name(cli_args['list_url'], extension)     # the default, in this format
+
+        if os.path.isdir(output):
+            raise IsADirectoryError(21, 'Is a directory')
+
+        get_list_with_attrs(cli_args['list_url'],    # sends first argument as a list
+                            cli_args['attributes'],
+                            output,
+                            cli_args['concurrency'],
+                            transport_options_from_args(cli_args),
+                            cli_args['resume'],
+                            cli_args['update'],
+                            cli_args['profile'],
+                            cli_args['format'])
+        return
+
+    if cli_args['resume'] or cli_args['update']:
+        raise lbc.RequestError("--resume and --update only work with a single --list-url.")
+
+    output = cli_args['output_file'] or ("lists" + extension if cli_args['combined'] else ".")
+    if cli_args['combined'] and os.path.isdir(output):
+        raise IsADirectoryError(21, 'Is a directory')
+
+    get_lists_with_attrs(list_urls_from_args(cli_args['batch']),
+                         cli_args['attributes'],
+                         output,
+                         cli_args['concurrency'],
+                         transport_options_from_args(cli_args),
+                         cli_args['combined'],
+                         cli_args['profile'],
+                         cli_args['format'])
+
+
 def main():
     """
     The main function.
@@ -205,12 +828,7 @@ def main():
     if cli_args['debug']:
         print("\033[0;33m  /// Running in debug mode /// \033[0m")
         try:
-            if os.path.isdir(cli_args['output_file']):
-                raise IsADirectoryError(21, 'Is a directory')
-
-            get_list_with_attrs(cli_args['list_url'],    # sends first argument as a list
-                                cli_args['attributes'],
-                                cli_args['output_file'])
+            run_export(cli_args)
             print("\n\n\033[0;32mRetrival complete!\033[0m\n")
         except lbc.RequestError as rqe:
             print(f"ERROR: There is an issue with the input of your request: {repr(rqe)}", file=sys.stderr)
@@ -231,12 +849,7 @@ def main():
             )
     else:
         try:
-            if os.path.isdir(cli_args['output_file']):
-                raise IsADirectoryError(21, 'Is a directory')
-            
-            get_list_with_attrs(cli_args['list_url'],    # sends first argument as a list
-                                cli_args['attributes'],
-                                cli_args['output_file'])
+            run_export(cli_args)
             print("\n\n\033[0;32mRetrival complete!\033[0m\n")
         except lbc.RequestError as rqe:
             print(f"ERROR: There is an issue with the input of your request: {repr(rqe)}", file=sys.stderr)
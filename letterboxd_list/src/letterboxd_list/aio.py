@@ -0,0 +1,554 @@
+"""
+An `asyncio` interface to the package, for using it from inside an event loop
+(e.g. in a web service) without handing the blocking classes off to threads.
+
+`AsyncTransport` drives a `pycurl.CurlMulti` from the running event loop:
+libcurl says which sockets it's waiting on and when its next timeout is, and
+the loop wakes it up when one of those sockets is ready or the time comes.
+So any number of requests can be in flight from one thread, with the loop
+free to do other work in the meantime.
+
+`AsyncLetterboxdList` and `AsyncLetterboxdFilm` are the awaitable versions of
+`LetterboxdList` and `LetterboxdFilm`, and share all their parsing:
+
+.. code-block:: python
+
+    >>> lb_list = await AsyncLetterboxdList.load(list_url)
+    >>> async for film in lb_list:
+    ...     print(film.title, await film.get_likes())
+
+"""
+import asyncio
+from collections.abc import Iterable, AsyncIterator
+import pycurl
+from selectolax.parser import HTMLParser
+import letterboxd_list.transport as lbt
+from letterboxd_list.containers import (
+    LetterboxdFilm,
+    LetterboxdList,
+    ExtractionPlan,
+    PAGE_CONCURRENCY,
+    handle_http_err,
+    stats_url
+)
+
+
+class AsyncTransport:
+    """
+    Makes requests from the running event loop, through the handles (and so
+    the shared connections, and cache) of a `Transport`: the process' default
+    one, if none is given.
+
+    An `AsyncTransport` belongs to the event loop it's first used in, and
+    should be closed with `aclose()` (or used with `async with`) when done.
+    One that's closed can still be used again, and is reopened as needed.
+    """
+    def __init__(self, transport: lbt.Transport | None = None):
+        self._transport = transport or lbt.default_transport()
+        self._loop      = None
+        self._multi     = None
+        self._timer     = None
+        self._active    = {}                # handle -> (future, transfer)
+        self._implicit  = False
+
+
+    @classmethod
+    def _for_caller(cls, transport: "AsyncTransport | None") -> "AsyncTransport":
+        """
+        `transport`, or if it's `None`, a new `AsyncTransport` of the package's
+        own. Since nothing else would close that one, it's closed whenever it's
+        left with nothing in flight (see `_close_if_implicit()`).
+        """
+        if transport is not None:
+            return transport
+
+        transport           = cls()
+        transport._implicit = True
+        return transport
+
+
+    async def _close_if_implicit(self):
+        """
+        Closes the transport if the package made it (see `_for_caller()`)
+        and it has nothing in flight. Called at the end of everything that
+        makes requests through one.
+        """
+        if self._implicit and not self._active:
+            await self.aclose()
+
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+    @property
+    def transport(self) -> lbt.Transport:
+        """
+        The `Transport` whose handles are used.
+        """
+        return self._transport
+
+
+    def _start_loop(self):
+        """
+        Sets up the `CurlMulti` on the running event loop, the first time
+        a request is made.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            raise RuntimeError("An AsyncTransport can only be used from one event loop.")
+
+        self._loop  = loop
+        self._multi = self._transport.new_multi()
+        self._multi.setopt(pycurl.M_SOCKETFUNCTION, self._watch_socket)
+        self._multi.setopt(pycurl.M_TIMERFUNCTION, self._set_timer)
+
+
+    def _watch_socket(self, events: int, sock: int, _multi, _data):
+        """
+        For `pycurl.M_SOCKETFUNCTION`: libcurl telling us which of its sockets
+        to wait on, and for what (`POLL_REMOVE` means to stop waiting on one).
+        """
+        if events & pycurl.POLL_IN:
+            self._loop.add_reader(sock, self._socket_action, sock, pycurl.CSELECT_IN)
+        else:
+            self._loop.remove_reader(sock)
+
+        if events & pycurl.POLL_OUT:
+            self._loop.add_writer(sock, self._socket_action, sock, pycurl.CSELECT_OUT)
+        else:
+            self._loop.remove_writer(sock)
+
+
+    def _set_timer(self, timeout_ms: int):
+        """
+        For `pycurl.M_TIMERFUNCTION`: libcurl asking to be woken up in
+        `timeout_ms` milliseconds (or not at all, if it's -1).
+        """
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        # libcurl can't be called back into from inside this callback,
+        # so even a timeout of 0 waits for the next turn of the loop
+        if timeout_ms >= 0:
+            self._timer = self._loop.call_later(
+                timeout_ms / 1000,
+                self._socket_action,
+                pycurl.SOCKET_TIMEOUT,
+                0
+            )
+
+
+    def _socket_action(self, sock: int, events: int):
+        """
+        Lets libcurl do whatever work is waiting on a socket (or a timeout),
+        then hands out the responses of any transfers that finished.
+        """
+        while True:
+            ret, _ = self._multi.socket_action(sock, events)
+            if ret != pycurl.E_CALL_MULTI_PERFORM:
+                break
+
+        while True:
+            queued, ok_list, err_list = self._multi.info_read()
+
+            for handle in ok_list:
+                future, transfer = self._active.pop(handle)
+                self._multi.remove_handle(handle)
+                future.set_result(self._transport.finish(handle, transfer))
+
+            for handle, errno, errmsg in err_list:
+                future, transfer = self._active.pop(handle)
+                self._multi.remove_handle(handle)
+                if transfer.cut_short:
+                    future.set_result(self._transport.finish(handle, transfer))
+                    continue
+
+                handle.close()
+                future.set_exception(pycurl.error(errno, f"{errmsg} ({transfer.url})"))
+
+            if queued == 0:
+                break
+
+
+    async def get(self, url: str) -> lbt.Response:
+        """
+        Fetch a single URL. Pages that are fresh in the transport's cache
+        come back without a request being made. Network-level failures raise
+        `pycurl.error`; HTTP error codes are left to the caller.
+
+        Requests are paced and retried by the transport's `RateLimiter`, the
+        same as for `Transport.get()`, but waiting is done with `asyncio.sleep()`.
+        """
+        cached = self._transport.lookup(url)
+        if cached:
+            return cached
+
+        limiter = self._transport.limiter
+        attempt = 0
+        while True:
+            while (wait := limiter.try_acquire()) > 0:
+                await asyncio.sleep(wait)
+
+            resp  = await self._perform(url)
+            delay = limiter.record(resp.status, resp.headers, attempt, len(self._active) + 1)
+            if delay is None:
+                return resp
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+    async def _perform(self, url: str) -> lbt.Response:
+        """
+        Makes one request for `url` through the `CurlMulti`.
+        """
+        self._start_loop()
+        handle, transfer     = self._transport.start(url)
+        future               = self._loop.create_future()
+        self._active[handle] = (future, transfer)
+        self._multi.add_handle(handle)
+
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # a handle taken out mid-transfer can't be reused
+            if handle in self._active:
+                del self._active[handle]
+                self._multi.remove_handle(handle)
+                handle.close()
+            raise
+
+
+    async def fetch(
+        self,
+        urls: Iterable[str],
+        max_concurrent: int = lbt.DEFAULT_CONCURRENCY
+        ) -> AsyncIterator[tuple[int, lbt.Response]]:
+        """
+        The `async` version of `FetchEngine.fetch()`: yields `(i, response)`
+        pairs in the order the transfers finish, with at most `max_concurrent`
+        of them in flight at a time.
+        """
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1.")
+
+        pending   = enumerate(urls)
+        in_flight = set()
+
+        async def numbered(i: int, url: str) -> tuple[int, lbt.Response]:
+            return i, await self.get(url)
+
+        try:
+            while True:
+                for i, url in pending:
+                    in_flight.add(asyncio.ensure_future(numbered(i, url)))
+                    if len(in_flight) >= max_concurrent:
+                        break
+
+                if not in_flight:
+                    return
+
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+
+    async def fetch_ordered(
+        self,
+        urls: Iterable[str],
+        max_concurrent: int = lbt.DEFAULT_CONCURRENCY
+        ) -> list[lbt.Response]:
+        """
+        Fetches all of `urls` concurrently, but returns the responses
+        in the same order as the URLs were given.
+        """
+        urls      = list(urls)
+        responses = [None] * len(urls)
+        async for i, resp in self.fetch(urls, max_concurrent):
+            responses[i] = resp
+
+        return responses
+
+
+    async def aclose(self):
+        """
+        Cancels whatever is still in flight, and closes the `CurlMulti`.
+        """
+        for future, _ in self._active.values():
+            future.cancel()
+        for handle in self._active:
+            self._multi.remove_handle(handle)
+            handle.close()
+        self._active.clear()
+
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if self._multi:
+            self._multi.close()
+            self._multi = None
+        self._loop = None
+
+
+
+class AsyncLetterboxdFilm(LetterboxdFilm):
+    """
+    A `LetterboxdFilm` made with `await AsyncLetterboxdFilm.load(url)`, whose
+    stats (likes and watches) are fetched without blocking the event loop.
+    Everything read off the film page itself works the same as for a
+    `LetterboxdFilm`, since the page is already in hand.
+    """
+    def __init__(self, *args, **kwargs):
+        raise TypeError("AsyncLetterboxdFilm objects are made with `await AsyncLetterboxdFilm.load(url)`.")
+
+    @classmethod
+    async def load(
+        cls,
+        film_url: str,
+        transport: AsyncTransport | None = None,
+        with_stats: bool = False
+        ):
+        """
+        Fetches and initializes a film. With `with_stats`, its stats page
+        is fetched at the same time.
+        """
+        transport = AsyncTransport._for_caller(transport)
+
+        try:
+            if not with_stats:
+                resp = await transport.get(film_url)
+                handle_http_err(resp.status, film_url)
+                return cls.from_html(film_url, resp.body, transport)
+
+            # both are let finish, so that neither is still in flight when
+            # the transport's closed if the other one fails
+            resp, stats_resp = await asyncio.gather(
+                transport.get(film_url),
+                transport.get(stats_url(film_url)),
+                return_exceptions=True
+            )
+        finally:
+            await transport._close_if_implicit()
+
+        for result in (resp, stats_resp):
+            if isinstance(result, BaseException):
+                raise result
+        handle_http_err(resp.status, film_url)
+        handle_http_err(stats_resp.status, stats_resp.url)
+        return cls.from_html(film_url, resp.body, transport, stats_resp.body)
+
+
+    def _get_stats_html(self) -> HTMLParser:
+        # this would block the event loop, so it's not allowed
+        raise RuntimeError(
+            "The stats page of an AsyncLetterboxdFilm has to be fetched with "
+            "`await film.load_stats()` (which `get_likes()` and `get_watches()` do)."
+        )
+
+
+    async def load_stats(self):
+        """
+        Fetches the film's stats page, if it hasn't been already.
+        """
+        if self._stats_html:
+            return
+
+        try:
+            resp = await self._transport.get(self._stats_url)
+        finally:
+            await self._transport._close_if_implicit()
+        handle_http_err(resp.status, self._stats_url)
+        self._stats_html = HTMLParser(resp.body)
+
+
+    async def get_watches(self) -> int:
+        """
+        Return the amount of watches the film has on Letterboxd.
+        """
+        await self.load_stats()
+        return self._count_watches()
+
+    async def get_likes(self) -> int:
+        """
+        Return the amount of likes the film has on Letterboxd.
+        """
+        await self.load_stats()
+        return self._count_likes()
+
+
+    async def get_attrs_csv(self, attrs: list | str | ExtractionPlan) -> str:
+        """
+        See `LetterboxdFilm.get_attrs_csv()`.
+        """
+        plan = attrs if isinstance(attrs, ExtractionPlan) else ExtractionPlan(attrs)
+        if plan.needs_stats:
+            await self.load_stats()
+
+        return super().get_attrs_csv(plan)
+
+
+
+async def fetch_films(
+    film_urls: Iterable[str],
+    max_concurrent: int = lbt.DEFAULT_CONCURRENCY,
+    transport: AsyncTransport | None = None,
+    with_stats: bool = False
+    ) -> AsyncIterator[tuple[int, AsyncLetterboxdFilm]]:
+    """
+    The `async` version of `containers.fetch_films()`: yields `(i, film)`
+    pairs in the order the films finish, with up to `max_concurrent` requests
+    in flight at a time.
+    """
+    made_here = transport is None
+    transport = AsyncTransport._for_caller(transport)
+
+    try:
+        if not with_stats:
+            async for i, resp in transport.fetch(film_urls, max_concurrent):
+                handle_http_err(resp.status, resp.url)
+                yield i, AsyncLetterboxdFilm.from_html(resp.url, resp.body, transport)
+            return
+
+        # same as in containers.fetch_films(): film i's page is request 2i,
+        # and its stats page is request 2i+1
+        requests = (url for film_url in film_urls for url in (film_url, stats_url(film_url)))
+        arrived  = {}
+        async for j, resp in transport.fetch(requests, max_concurrent):
+            handle_http_err(resp.status, resp.url)
+
+            i, is_stats = divmod(j, 2)
+            if i not in arrived:
+                arrived[i] = resp
+                continue
+
+            film_resp, stats_resp = (arrived.pop(i), resp) if is_stats else (resp, arrived.pop(i))
+            yield i, AsyncLetterboxdFilm.from_html(film_resp.url, film_resp.body, transport, stats_resp.body)
+    finally:
+        # if the loop over the films was left early, what's still in flight
+        # is only this call's, so it's all cancelled
+        if made_here:
+            await transport.aclose()
+        else:
+            await transport._close_if_implicit()
+
+
+
+class AsyncLetterboxdList(LetterboxdList):
+    """
+    A `LetterboxdList` made with `await AsyncLetterboxdList.load(url)`, whose
+    films are fetched without blocking the event loop. It can be indexed,
+    sliced and iterated over like a `LetterboxdList`; `async for` goes over its
+    films in list order, initializing them as `AsyncLetterboxdFilm`s, with
+    up to `max_concurrent` requests in flight at once.
+    """
+    def __init__(self, *args, **kwargs):
+        raise TypeError("AsyncLetterboxdList objects are made with `await AsyncLetterboxdList.load(url)`.")
+
+    @classmethod
+    async def load(
+        cls,
+        url: str,
+        max_length: int = -1,
+        max_concurrent: int = lbt.DEFAULT_CONCURRENCY,
+        transport: AsyncTransport | None = None
+        ):
+        """
+        Fetches the list's pages (all but the first concurrently), and
+        returns the list with its films as URLs, like `LetterboxdList`.
+        See `LetterboxdList.__init__()` for the arguments.
+        """
+        lb_list = cls.__new__(cls)                 # skips calling __init__
+        lb_list._url            = url
+        lb_list._transport      = AsyncTransport._for_caller(transport)
+        lb_list._max_concurrent = max_concurrent
+        lb_list._records        = None
+
+        try:
+            first_page      = await lb_list._transport.get(url)
+            handle_http_err(first_page.status, url)
+            first_page_html = HTMLParser(first_page.body)
+            lb_list._read_first_page(first_page_html, max_length)
+
+            film_urls = lb_list._urls_on_page(first_page_html)
+            later     = await lb_list._transport.fetch_ordered(lb_list._later_page_urls(), PAGE_CONCURRENCY)
+        finally:
+            await lb_list._transport._close_if_implicit()
+
+        for resp in later:
+            handle_http_err(resp.status, resp.url)
+            film_urls.extend(lb_list._urls_on_page(HTMLParser(resp.body)))
+
+        lb_list._films = film_urls
+        return lb_list
+
+
+    def is_initialized(self, n: int) -> bool:
+        """
+        Checks to see if the nth element of the list is initialized
+        as an AsyncLetterboxdFilm.
+        """
+        return isinstance(self._films[n], AsyncLetterboxdFilm)
+
+
+    async def init_film(self, n: int) -> AsyncLetterboxdFilm:
+        """
+        See `LetterboxdList.init_film()`.
+        """
+        if not self.is_initialized(n):
+            self._films[n] = await AsyncLetterboxdFilm.load(self._films[n], self._transport)
+
+        return self._films[n]
+
+
+    async def init_films(self, indices: Iterable[int] | None = None, with_stats: bool = False):
+        """
+        See `LetterboxdList.init_films()`.
+        """
+        async for _ in self.films(indices, with_stats):
+            pass
+
+
+    async def films(
+        self,
+        indices: Iterable[int] | None = None,
+        with_stats: bool = False
+        ) -> AsyncIterator[AsyncLetterboxdFilm]:
+        """
+        Initializes the films at `indices` (all of them, if not given),
+        yielding each one as soon as it and every film before it are ready,
+        so they come out in list order. Films already initialized are
+        yielded without any requests.
+        """
+        if indices is None:
+            indices = range(len(self._films))
+
+        indices = list(indices)
+        to_init = [n for n in indices if not self.is_initialized(n)]
+        urls    = [self._films[n] for n in to_init]
+        next_up = 0
+
+        async for i, film in fetch_films(urls, self._max_concurrent, self._transport, with_stats):
+            self._films[to_init[i]] = film
+
+            while next_up < len(indices) and self.is_initialized(indices[next_up]):
+                yield self._films[indices[next_up]]
+                next_up += 1
+
+        # in case there was nothing to fetch
+        for n in indices[next_up:]:
+            yield self._films[n]
+
+
+    def __aiter__(self) -> AsyncIterator[AsyncLetterboxdFilm]:
+        return self.films()
@@ -0,0 +1,149 @@
+"""
+An optional on-disk cache for pages fetched from Letterboxd, so exporting
+overlapping lists again doesn't mean fetching every film page again.
+
+Responses are kept in a SQLite database with their bodies compressed, and
+each kind of page (list, film, stats) has its own maximum age. Once an entry
+is older than that, it's revalidated with the server (using the `ETag` and
+`Last-Modified` headers it came with) rather than downloaded in full.
+"""
+import os
+import time
+import zlib
+import sqlite3
+from typing import NamedTuple
+
+DB_NAME = "responses.sqlite3"
+
+# in seconds; film info rarely changes, but stats change all the time
+DEFAULT_MAX_AGES = {
+    "list":  60 * 60,
+    "film":  7 * 24 * 60 * 60,
+    "stats": 6 * 60 * 60,
+}
+
+
+def resource_kind(url: str) -> str:
+    """
+    What kind of Letterboxd page a URL points to: `"stats"`, `"film"`, or
+    `"list"` (which covers anything else).
+    """
+    if "/csi/film/" in url:
+        return "stats"
+    if "/film/" in url:
+        return "film"
+    return "list"
+
+
+class CacheEntry(NamedTuple):
+    """
+    A cached response, with what's needed to revalidate it.
+    """
+    body:          str
+    stored_at:     float
+    etag:          str | None
+    last_modified: str | None
+
+
+class ResponseCache:
+    """
+    The cache itself. `max_ages` maps each kind of page (see `resource_kind()`)
+    to how long, in seconds, its entries are good for without revalidation;
+    any kinds left out use `DEFAULT_MAX_AGES`.
+
+    Each process opens its own connection to the database, so one cache can
+    be handed to every worker in a `multiprocessing.Pool`.
+    """
+    def __init__(self, cache_dir: str, max_ages: dict[str, float] | None = None):
+        self._cache_dir = cache_dir
+        self._max_ages  = DEFAULT_MAX_AGES | (max_ages or {})
+        self._conn      = None
+        self._conn_pid  = None
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+
+    def __getstate__(self):
+        # SQLite connections can't be pickled (or used across a fork)
+        state = self.__dict__.copy()
+        state["_conn"]     = None
+        state["_conn_pid"] = None
+        return state
+
+
+    @property
+    def cache_dir(self) -> str:
+        """
+        The directory the database is kept in.
+        """
+        return self._cache_dir
+
+    @property
+    def max_ages(self) -> dict[str, float]:
+        """
+        Maximum age, in seconds, for each kind of page.
+        """
+        return self._max_ages
+
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn     = sqlite3.connect(
+                os.path.join(self._cache_dir, DB_NAME),
+                timeout=30,
+                isolation_level=None            # autocommit
+            )
+            self._conn_pid = os.getpid()
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, kind TEXT, stored_at REAL, "
+                "etag TEXT, last_modified TEXT, body BLOB)"
+            )
+
+        return self._conn
+
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        """
+        The cached response for `url`, fresh or not, or `None` if there isn't one.
+        """
+        row = self._db().execute(
+            "SELECT body, stored_at, etag, last_modified FROM responses WHERE url = ?",
+            (url,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        body, stored_at, etag, last_modified = row
+        return CacheEntry(zlib.decompress(body).decode(), stored_at, etag, last_modified)
+
+
+    def is_fresh(self, url: str, entry: CacheEntry) -> bool:
+        """
+        Whether `entry` can be used as-is, without checking with the server.
+        """
+        return time.time() - entry.stored_at < self._max_ages[resource_kind(url)]
+
+
+    def store(self, url: str, body: str, etag: str | None = None, last_modified: str | None = None):
+        """
+        Cache a (successful) response.
+        """
+        self._db().execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+            (url, resource_kind(url), time.time(), etag, last_modified,
+             zlib.compress(body.encode()))
+        )
+
+
+    def refresh(self, url: str):
+        """
+        Mark an entry as fresh again, after the server said it hasn't
+        changed (a `304 Not Modified`).
+        """
+        self._db().execute(
+            "UPDATE responses SET stored_at = ? WHERE url = ?",
+            (time.time(), url)
+        )
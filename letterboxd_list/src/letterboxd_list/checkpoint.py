@@ -0,0 +1,204 @@
+"""
+Checkpoints for `lblist` exports, so a run that dies partway through can be
+picked up again with `--resume`, without fetching the finished films again.
+
+Finished exports leave a `Manifest` behind, so they can be brought up to
+date later with `--update`, only fetching the films added since.
+"""
+import os
+import json
+from letterboxd_list.containers import RequestError
+
+JOURNAL_SUFFIX  = ".partial"
+MANIFEST_SUFFIX = ".manifest"
+
+
+class Checkpoint:
+    """
+    A journal of the rows an export has finished so far, kept next to the
+    output file (at `<output file>.partial`) until the export completes.
+
+    It's a JSON Lines file: the first line records which list and columns
+    the export is for, and each line after holds one finished chunk of rows,
+    with the list index it starts at and the film URLs it came from. Lines
+    are flushed as they're written, so a crash loses at most the chunks that
+    were still in progress.
+    """
+    def __init__(self, output_file: str, list_url: str, header: str):
+        self._path     = output_file + JOURNAL_SUFFIX
+        self._list_url = list_url
+        self._header   = header
+        self._file     = None
+
+
+    @property
+    def path(self) -> str:
+        """
+        Where the journal is kept.
+        """
+        return self._path
+
+    @property
+    def exists(self) -> bool:
+        """
+        Whether there's a journal on disk from this or an earlier run.
+        """
+        return os.path.exists(self._path)
+
+
+    def load(self, film_urls: list[str]) -> dict[int, list[str]]:
+        """
+        Reads back the chunks finished by an earlier run, as a `dict` from
+        each chunk's starting index to its rows. Chunks whose films no longer
+        match the list at those positions (because the list has been edited
+        since) are left out, so they get fetched again.
+
+        Raises `RequestError` if the journal is for a different list or set
+        of attributes.
+        """
+        finished = {}
+
+        with open(self._path, "r", encoding="utf-8") as journal:
+            meta = json.loads(journal.readline())
+            if meta["list_url"] != self._list_url or meta["header"] != self._header:
+                raise RequestError(
+                    f"The checkpoint at {self._path} is for a different export "
+                    f"(list {meta['list_url']}, columns {meta['header']}). "
+                    "Remove it, or run without --resume to start over."
+                )
+
+            for line in journal:
+                try:
+                    chunk = json.loads(line)
+                except json.JSONDecodeError:
+                    continue                # a line may have been cut off by a crash
+
+                start = chunk["start"]
+                if film_urls[start:start+len(chunk["urls"])] == chunk["urls"]:
+                    finished[start] = chunk["rows"]
+
+        return finished
+
+
+    def start(self, resume: bool):
+        """
+        Opens the journal for writing; appending to it if `resume`,
+        otherwise starting a new one.
+        """
+        if resume and self.exists:
+            self._file = open(self._path, "a+", encoding="utf-8")
+
+            # don't tack the next chunk onto a line cut off by a crash
+            if self._file.tell() > 0:
+                self._file.seek(self._file.tell() - 1)
+                if self._file.read(1) != "\n":
+                    self._file.write("\n")
+            return
+
+        self._file = open(self._path, "w", encoding="utf-8")
+        self._file.write(json.dumps({"list_url": self._list_url, "header": self._header}) + "\n")
+        self._file.flush()
+
+
+    def record(self, start: int, urls: list[str], rows: list[str]):
+        """
+        Adds a finished chunk to the journal.
+        """
+        self._file.write(json.dumps({"start": start, "urls": urls, "rows": rows}) + "\n")
+        self._file.flush()
+
+
+    def close(self):
+        """
+        Closes the journal, leaving it on disk.
+        """
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+    def remove(self):
+        """
+        Closes and deletes the journal, once the export is complete.
+        """
+        self.close()
+        if self.exists:
+            os.remove(self._path)
+
+
+
+class Manifest:
+    """
+    A record of which film each row of a finished export came from, kept
+    next to the output file (at `<output file>.manifest`). It's a JSON file
+    with the list and columns the export is for, and the film URLs in the
+    same order as the rows in the output file.
+    """
+    def __init__(self, output_file: str, list_url: str, header: str):
+        self._output   = output_file
+        self._path     = output_file + MANIFEST_SUFFIX
+        self._list_url = list_url
+        self._header   = header
+
+
+    @property
+    def path(self) -> str:
+        """
+        Where the manifest is kept.
+        """
+        return self._path
+
+    @property
+    def exists(self) -> bool:
+        """
+        Whether there's a manifest on disk from an earlier export.
+        """
+        return os.path.exists(self._path)
+
+
+    def save(self, film_urls: list[str]):
+        """
+        Records the film URLs of the rows just written to the output file.
+        """
+        with open(self._path, "w", encoding="utf-8") as manifest:
+            json.dump({"list_url": self._list_url, "header": self._header, "urls": film_urls}, manifest)
+
+
+    def load(self) -> tuple[list[str], list[str]]:
+        """
+        Reads back the film URLs of the earlier export, along with its rows
+        from the output file (without their ranks, if the list is ranked).
+
+        Raises `RequestError` if there's no earlier export to go off of, if it
+        was for a different list or set of attributes, or if the output file
+        doesn't match the manifest anymore.
+        """
+        if not self.exists or not os.path.exists(self._output):
+            raise RequestError(
+                f"There's no earlier export at {self._output} (with a manifest at "
+                f"{self._path}) to update. Run without --update to make one."
+            )
+
+        with open(self._path, "r", encoding="utf-8") as manifest:
+            meta = json.load(manifest)
+        if meta["list_url"] != self._list_url or meta["header"] != self._header:
+            raise RequestError(
+                f"The export at {self._output} is of a different list or set of columns "
+                f"(list {meta['list_url']}, columns {meta['header']}). "
+                "Run without --update to start over."
+            )
+
+        with open(self._output, "r", encoding="utf-8") as output:
+            header = output.readline()
+            rows   = output.readlines()
+
+        if header.startswith("Rank,"):
+            rows = [row.split(",", 1)[1] for row in rows]
+
+        if len(rows) != len(meta["urls"]):
+            raise RequestError(
+                f"The export at {self._output} has been changed since it was made, "
+                f"so it no longer matches {self._path}. Run without --update to start over."
+            )
+
+        return meta["urls"], rows
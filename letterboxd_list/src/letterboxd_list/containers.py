@@ -4,9 +4,13 @@ Includes the central logic of the app encapsulated in the
 """
 import re
 import copy
-import pycurl
+from typing import NamedTuple
 from collections.abc import Iterable, Iterator
 from letterboxd_list import VALID_ATTRS
+import letterboxd_list.transport as lbt
+import letterboxd_list.profiling as profiling
+from letterboxd_list.memo import film_key
+from letterboxd_list.streaming import HEAD_END_MARKER, TITLE_MARKER, YEAR_MARKER, TABS_MARKER, DIV_TAG
 from selectolax.parser import HTMLParser
 
 TABBED_ATTRS = [
@@ -47,6 +51,16 @@ TABBED_ATTRS = [
     "writer"
 ]
 
+# for constant-time membership checks
+_VALID_ATTR_SET  = frozenset(VALID_ATTRS)
+_TABBED_ATTR_SET = frozenset(TABBED_ATTRS)
+
+# the most list pages to fetch at once
+PAGE_CONCURRENCY = 8
+
+# the tags the average rating is read from (see page_regions())
+_META_TAG = re.compile(r"<meta\b[^>]*>", re.IGNORECASE)
+
 
 def handle_http_err(status_code: int, url: str) -> None:
     """
@@ -69,6 +83,142 @@ def quote_enclose(string: str) -> str:
     return "\""+string+"\""
 
 
+def stats_url(film_url: str) -> str:
+    """
+    The URL of a film's stats page (where likes and watches are), 
+    which can be worked out from the film's URL alone.
+    """
+    insert_index = film_url.find("/film")
+    return film_url[:insert_index] + "/csi" + film_url[insert_index:] + "stats/"
+
+
+def page_regions(page_str: str) -> str | None:
+    """
+    Cuts a film page down to the parts `LetterboxdFilm` reads anything from:
+    the meta tags in the head (for the average rating), the title and year,
+    and the tabbed section with the cast, crew, details and genres. Parsing
+    that takes a fraction of the time it takes to parse the whole page.
+
+    Returns `None` if any of those parts can't be found where they're 
+    expected, in which case the whole page should be parsed instead.
+    """
+    head_end = page_str.find(HEAD_END_MARKER)
+    title_at = page_str.find(TITLE_MARKER, max(head_end, 0))
+    tabs_at  = page_str.find(TABS_MARKER, max(head_end, 0))
+    if head_end < 0 or title_at < 0 or tabs_at < 0:
+        return None
+
+    # the title's <span>, which is what's looked for
+    title_start = page_str.rfind("<", 0, title_at)
+    title_end   = page_str.find("</span>", title_at)
+    if title_start < 0 or title_end < 0 or not page_str.startswith("<span", title_start):
+        return None
+
+    regions = ["<html><head>", *_META_TAG.findall(page_str, 0, head_end), "</head><body>"]
+    regions.append(page_str[title_start:title_end + len("</span>")])
+
+    # unreleased films may not have a year
+    year_at = page_str.find(YEAR_MARKER)
+    if year_at >= 0:
+        year_start = page_str.rfind("<a", 0, year_at)
+        year_end   = page_str.find("</a>", year_at)
+        if year_start < 0 or year_end < 0:
+            return None
+        regions.append(page_str[year_start:year_end + len("</a>")])
+
+    # the tabbed section runs until its <div> is closed
+    depth    = 0
+    tabs_end = -1
+    for tag in DIV_TAG.finditer(page_str, tabs_at):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            tabs_end = page_str.find(">", tag.end()) + 1
+            break
+    if tabs_end <= 0:
+        return None
+
+    regions.append(page_str[tabs_at:tabs_end])
+    regions.append("</body></html>")
+    return "".join(regions)
+
+
+def format_csv_value(found_attr) -> str:
+    """
+    Formats an attribute's value as a CSV cell (see `LetterboxdFilm.get_attrs_csv()`).
+    """
+    if   isinstance(found_attr, list):
+        # separate list elements by ";" not ","
+        found_attr = quote_enclose("; ".join(found_attr))
+
+    elif isinstance(found_attr, dict):
+
+        if len(found_attr) == 0:
+            found_attr = "(not listed)"      # empty dicts need to be handled explicitly
+        else:
+            found_attr = [f"{key}: {value}" for (key, value) in found_attr.items()]
+            found_attr = quote_enclose("; ".join(found_attr))
+
+    # regardless
+    return str(found_attr)
+
+
+def _tabbed_values(attribute: str, elements: list) -> list:
+    """
+    Turns the link elements found for a tabbed attribute into its values.
+    Shared by `LetterboxdFilm.get_tabbed_attribute()` and `ExtractionPlan`.
+    """
+    # extract text from found HTML elements,
+    # stripping out whitespace and commas
+    attribute_list = [e.text().strip().replace(",","") for e in elements]
+
+    # Remove plural and singluar versions of occurrences
+    # of the attribute name in the list, because sometimes that happens
+    attr_versions = [
+        attribute,
+        attribute+"s",
+        attribute.capitalize(),
+        attribute.capitalize()+"s"
+    ]
+    for av in attr_versions:
+        if av in attribute_list:
+            attribute_list.remove(av)
+
+    # director appears twice on every page, so only return unique values,
+    # with order preserved (found here: https://stackoverflow.com/a/17016257)
+    if attribute == "director" and len(attribute_list) > 0:
+        return list(dict.fromkeys(attribute_list))
+
+    if len(attribute_list) > 0:
+        return attribute_list
+
+    # the outcome whether the attribute was not valid or valid but not found for the film
+    return ["(not listed)"]
+
+
+def _cast_dict(actor_nodes: list) -> dict:
+    """
+    Turns the actor link elements on a film page into a cast list.
+    Shared by `LetterboxdFilm.get_cast_list()` and `ExtractionPlan`.
+    """
+    casting = {}
+    for node in actor_nodes:
+
+        # Some films, like in documentaries, the "actors" are all appearing
+        # as themselves, not as a character. This catches those cases.
+        if 'title' not in node.attributes.keys():
+            casting[node.text()] = "Self"
+            continue
+
+        # double-quotes are reserved for the CSV formatting
+        acting_role = node.attributes['title']
+        if not acting_role:
+            raise ChangedLetterboxdDOM(f"DOM changed for casting.")
+        
+        casting[node.text().replace("\"", "'")] = acting_role.replace("\"", "'")
+
+    return casting
+
+
 
 class RequestError(ValueError):
     """
@@ -97,6 +247,179 @@ class ChangedLetterboxdDOM(ValueError):
 
 
 
+class ListDiff(NamedTuple):
+    """
+    How a list has changed since an earlier copy of its film URLs
+    (see `LetterboxdList.diff()`):
+    `added`:   the positions, in the list now, of films that weren't in it before.
+    `removed`: the URLs of films that aren't in it anymore.
+    `kept`:    a `dict` from the position of each film still in the list to its
+        position before, so films that were moved can be told apart.
+    """
+    added:   list[int]
+    removed: list[str]
+    kept:    dict[int, int]
+
+    @property
+    def unchanged(self) -> bool:
+        """
+        Whether the list has the same films, in the same order, as before.
+        """
+        return not self.added and not self.removed and all(n == m for n, m in self.kept.items())
+
+
+
+class ExtractionPlan:
+    """
+    A set of requested attributes, validated and worked out once, so that 
+    many films can have them extracted without repeating that work.
+
+    Rather than running a separate CSS query over the whole film page per
+    attribute (which is what `get_tabbed_attribute()` does), the plan walks
+    the page's links once, and sorts each one into the bucket for every 
+    requested attribute in its path (e.g. `/director/andrei-tarkovsky/` goes
+    in the `director` bucket). All the requested columns come from that one 
+    traversal.
+
+    A usage example:
+
+    .. code-block:: python
+
+        >>> plan = ExtractionPlan(["director", "genre", "cast-list"])
+        >>> for film in films:
+        ...     print(film.get_attrs_csv(plan))
+
+    """
+    def __init__(self, attrs: list | str):
+
+        # strings technically are accepted, but each character is treated as
+        # an independent attribute. So enforce convert the string to a list.
+        if isinstance(attrs, str):
+            attrs = [attrs]
+
+        # looping through to show user which specific attribute is not valid
+        for attr in attrs:
+            if attr not in _VALID_ATTR_SET:
+                raise ValueError(f"{attr} is not a valid attribute. ")
+
+        self._attrs   = tuple(attrs)
+        link_attrs    = {a for a in attrs if a in _TABBED_ATTR_SET}
+        if "cast-list" in attrs:
+            link_attrs.add("actor")             # the cast list comes from the actor links
+        self._buckets = frozenset(link_attrs)
+
+
+    @property
+    def attrs(self) -> tuple[str, ...]:
+        """
+        The requested attributes, in the order their values are returned.
+        """
+        return self._attrs
+
+    @property
+    def needs_stats(self) -> bool:
+        """
+        Whether any of the attributes come from the film's stats page, 
+        in which case it's worth fetching alongside the film page.
+        """
+        return "likes" in self._attrs or "watches" in self._attrs
+
+
+    def _link_buckets(self, page_html: HTMLParser) -> dict[str, list]:
+        """
+        The single pass over the page: sorts every link into the buckets
+        of the attributes whose `/<attr>/` appears in its `href`, the same 
+        way `a[href*='/<attr>/']` would match it, in document order.
+        """
+        buckets = {b: [] for b in self._buckets}
+        if not buckets:
+            return buckets
+
+        for node in page_html.css("a[href]"):
+            href = node.attributes.get("href") or ""
+
+            # the segments with a "/" on both sides
+            for segment in href.split("/")[1:-1]:
+                if segment in buckets:
+                    buckets[segment].append(node)
+
+        return buckets
+
+
+    def extract(self, film) -> list:
+        """
+        The values of the requested attributes for `film` (a `LetterboxdFilm`),
+        in the same order as `attrs`.
+        """
+        # a film's page is only gone over for the values it doesn't have yet
+        # (e.g. a film from the memo, which may not even have its page)
+        buckets = {}
+        if any(a in _PAGE_ATTR_SET and a not in film._values for a in self._attrs):
+            film._ensure_page()
+            with profiling.timed("links", film.url):
+                buckets = self._link_buckets(film._html)
+
+        values = []
+        for attr in self._attrs:
+            with profiling.timed(profiling.ATTR_STAGES.get(attr, "tabbed"), film.url):
+
+                match attr:
+                    case "likes":      found_attr = film._count_likes()
+                    case "watches":    found_attr = film._count_watches()
+                    case _ if attr in film._values:
+                                       found_attr = film._page_value(attr)
+                    case "avg-rating": found_attr = film.get_avg_rating()
+                    case "cast-list":  found_attr = film._keep_value(attr, lambda: _cast_dict(buckets["actor"]))
+                    case _:            found_attr = film._keep_value(attr, lambda: _tabbed_values(attr, buckets[attr]))
+
+            values.append(found_attr)
+
+        return values
+
+
+
+# the attributes read off a film page (as opposed to its stats page), which are
+# what's kept of a film in the memo (see page_record())
+PAGE_ATTRS     = TABBED_ATTRS + ["cast-list", "avg-rating"]
+_PAGE_ATTR_SET = frozenset(PAGE_ATTRS)
+
+
+class FilmRecord(NamedTuple):
+    """
+    What's left of a `LetterboxdFilm` once the attributes wanted from it have
+    been extracted (see `LetterboxdFilm.to_record()`): its URL, title and year,
+    and the values of those attributes, by name. The parsed pages aren't kept,
+    so a record takes up a small fraction of the memory of a film.
+    """
+    url:    str
+    title:  str
+    year:   str
+    values: dict[str, object]
+
+    def get_attrs_csv(self, attrs: list | str | ExtractionPlan) -> str:
+        """
+        See `LetterboxdFilm.get_attrs_csv()`. Only the attributes the record
+        was made with can be asked for; others raise a `KeyError`.
+        """
+        plan = attrs if isinstance(attrs, ExtractionPlan) else ExtractionPlan(attrs)
+        return ",".join(format_csv_value(self.values[a]) for a in plan.attrs)
+
+
+
+def page_record(film) -> FilmRecord:
+    """
+    What's kept of `film` (a `LetterboxdFilm`) in its transport's `memo`:
+    the values of the attributes read off its film page (see `PAGE_ATTRS`).
+    Nothing is extracted to make it; the record has the values extracted so
+    far, and is added to as more are, from `film` or any film made from the
+    record. An attribute that couldn't be found (e.g. a page without an
+    average rating) has its `ChangedLetterboxdDOM` kept instead, to be raised
+    whenever it's asked for.
+    """
+    return FilmRecord(film.url, film.title, film.year, film._values)
+
+
+
 class LetterboxdFilm:
     """
     This class gets the HTML for the pages relevant to a film on Letterboxd,
@@ -110,26 +433,135 @@ class LetterboxdFilm:
     - Film page HTML
 
     Any other film information is accessed through CSS-based searches on the 
-    HTML, implemented as methods.
+    HTML, implemented as methods. Only the parts of the film page those read
+    from are parsed (see `page_regions()`), unless they can't be found.
+
+    Requests go through `transport` (a pooled `Transport`), or the process'
+    default one if none is given, so films share open connections. A film 
+    that's still in the transport's `memo` isn't fetched again; the new
+    object answers from the values extracted from the page before (see
+    `page_record()`), and only fetches and parses the page if asked for
+    one that wasn't.
     """
-    def __init__(self, film_url):
+    def __init__(self, film_url, transport: lbt.Transport | None = None):
+
+        transport       = transport or lbt.default_transport()
+        self._transport = transport
+        memo            = transport.memo
+        key             = film_key(film_url)
+
+        record = memo.get(key)
+        if record is not None:
+            self._from_record(film_url, record)
+            return
+
+        resp = transport.get(film_url)
+        handle_http_err(resp.status, film_url)
+        self._load(film_url, resp.body)
+        if memo.max_films:
+            memo.put(key, page_record(self))
+
+    @classmethod
+    def from_record(
+        cls,
+        film_url: str,
+        record: FilmRecord,
+        transport: lbt.Transport | None = None
+        ):
+        """
+        Builds a `LetterboxdFilm` from a `page_record()` of it (e.g. from a
+        transport's `memo`), without making any requests. Its film page is
+        still fetched if it's asked for a value the record doesn't have, and
+        its stats page if likes or watches are.
+        """
+        film = cls.__new__(cls)                    # skips calling __init__
+        film._transport = transport or lbt.default_transport()
+        film._from_record(film_url, record)
+        return film
+
+    def _from_record(self, film_url: str, record: FilmRecord):
+        self._url        = film_url
+        self._stats_url  = stats_url(film_url)
+        self._title      = record.title
+        self._year       = record.year
+        self._html       = None                 # until a value that isn't in the record is asked for
+        self._values     = record.values
+        self._stats_html = None
 
-        self._url       = film_url
-        insert_index    = film_url.find("/film")
-        stats_url       = film_url[:insert_index] + "/csi" + film_url[insert_index:] + "stats/"
-        self._stats_url = stats_url
+    def _ensure_page(self):
+        """
+        Fetches and parses the film page, if the film was made from a record
+        without it. The values extracted from it go on being added to the
+        record's.
+        """
+        if self._html is not None:
+            return
+
+        resp = self._transport.get(self._url)
+        handle_http_err(resp.status, self._url)
+        self._load(self._url, resp.body, self._values)
 
-        self._curl      = pycurl.Curl()
-        self._curl.setopt(pycurl.HTTPHEADER, ["User-Agent: Application"])
+    def _page_value(self, attr: str):
+        """
+        The value of `attr` kept in the film's page values, copied so
+        it can't be changed in the memo.
+        """
+        value = self._values[attr]
+        if isinstance(value, ChangedLetterboxdDOM):
+            raise ChangedLetterboxdDOM(*value.args)
+        return copy.copy(value)
+
+    def _keep_value(self, attr: str, extract):
+        """
+        Extracts `attr` from the film page with `extract()`, and keeps its
+        value (or the `ChangedLetterboxdDOM` it raised) in the film's page
+        values, to be answered from the next time.
+        """
+        try:
+            self._values[attr] = extract()
+        except ChangedLetterboxdDOM as dom_err:
+            self._values[attr] = dom_err
+            raise
+
+        return self._page_value(attr)
+
+    @classmethod
+    def from_html(
+        cls,
+        film_url: str,
+        page_html: str,
+        transport: lbt.Transport | None = None,
+        stats_html: str | None = None
+        ):
+        """
+        Builds a `LetterboxdFilm` from a film page that has already been 
+        fetched (e.g. by a `FetchEngine`), without making any requests.
+        The stats page can be given too, if it was fetched alongside.
+        """
+        film = cls.__new__(cls)                    # skips calling __init__
+        film._transport = transport or lbt.default_transport()
+        film._load(film_url, page_html)
 
-        self._curl.setopt(pycurl.URL, film_url)
+        if stats_html is not None:
+            with profiling.timed("stats-parse", film_url):
+                film._stats_html = HTMLParser(stats_html)
 
-        resp_str        = self._curl.perform_rs()
-        status_code     = self._curl.getinfo(pycurl.RESPONSE_CODE)
-        handle_http_err(status_code, self._url)
+        return film
 
-        page_html       = HTMLParser(resp_str)
+    def _load(self, film_url: str, page_str: str, values: dict | None = None):
+        """
+        Parses the film page, and sets up everything the rest 
+        of the class depends on. `values` are the film's page values
+        extracted so far, if any.
+        """
+        self._url       = film_url
+        self._stats_url = stats_url(film_url)
+
+        with profiling.timed("parse", film_url):
+            region      = page_regions(page_str)
+            page_html   = HTMLParser(region if region is not None else page_str)
         self._html      = page_html
+        self._values    = {} if values is None else values
         self._title     = page_html.css("span.js-widont")[0].text()
         year_el         = page_html.css("a[href^='/films/year/']")
 
@@ -156,12 +588,10 @@ class LetterboxdFilm:
 
     def __deepcopy__(self, memo):
         """
-        Since Curl objects cannot be deep-copied (and their specific config data isn't
-        that important in this class), this class' deep copy has to be implemented 
-        such that everything *but* the Curl object member is copied. 
-        
-        It essentially get reinitialized for both the source and the copy, since 
-        it needs to be deleted for the duration of the copy process.
+        Since Curl objects cannot be deep-copied (and the connection pool they
+        come from is meant to be shared anyway), this class' deep copy has to 
+        be implemented such that everything *but* the `Transport` is copied. 
+        The copy uses the same `Transport` as the original.
 
         Discovered thanks to this StackOverflow answer: https://stackoverflow.com/a/56478412
         """
@@ -173,11 +603,15 @@ class LetterboxdFilm:
         obj_copy._title     = copy.deepcopy(self._title,      memo)
         obj_copy._year      = copy.deepcopy(self._year,       memo)
 
-        if not self._html.html:
+        # the page values are only ever added to, so they can be shared
+        obj_copy._values = self._values
+        if self._html is None:
+            obj_copy._html = None
+        elif not self._html.html:
             raise Exception("During __getitem__ copy, somehow self._html.html was None.")
-    
-        obj_copy._html = HTMLParser(self._html.html)
-        obj_copy._curl = self._curl
+        else:
+            obj_copy._html = HTMLParser(self._html.html)
+        obj_copy._transport = self._transport
 
         if self._stats_html:
             if self._stats_html.html:
@@ -211,7 +645,7 @@ class LetterboxdFilm:
         return self._year
 
 
-    def get_attrs_csv(self, attrs: list | str) -> str:
+    def get_attrs_csv(self, attrs: list | str | ExtractionPlan) -> str:
         """
         Gets a list of attributes and formats it as a CSV line. No initial or 
         terminal commas are added nor is there a newline added at the end of the line.
@@ -227,50 +661,29 @@ class LetterboxdFilm:
         ```
         "element1; element2; element3; ..."
         ```
+
+        When getting the same attributes for many films, pass an `ExtractionPlan`
+        built once from them, instead of the attribute list itself.
         """
+        plan = attrs if isinstance(attrs, ExtractionPlan) else ExtractionPlan(attrs)
+
         # trivial case
-        if len(attrs) == 0:
+        if len(plan.attrs) == 0:
             return ""
 
-        # strings technically are accepted, but each character is treated as
-        # an independent attribute. So enforce convert the string to a list.
-        if isinstance(attrs, str):
-            attrs = [attrs]
+        values = plan.extract(self)
+        with profiling.timed("csv", self._url):
+            return ",".join(format_csv_value(v) for v in values)
 
-        # looping through to show user which specific attribute is not valid
-        for attr in attrs:
-            if attr not in VALID_ATTRS:
-                raise ValueError(f"{attr} is not a valid attribute. ")
-
-        attr_line = []
-        for attr in attrs:
-
-            found_attr = "(not listed)"              # default
-            if attr in TABBED_ATTRS:
-                found_attr = self.get_tabbed_attribute(attr)
-            else:
-                match attr:
-                    case "avg-rating": found_attr = self.get_avg_rating()
-                    case "cast-list":  found_attr = self.get_cast_list()
-                    case "likes":      found_attr = self.get_likes()
-                    case "watches":    found_attr = self.get_watches()
 
-            if   isinstance(found_attr, list):
-                # separate list elements by ";" not ","
-                found_attr = quote_enclose("; ".join(found_attr))
-
-            elif isinstance(found_attr, dict):
-
-                if len(found_attr) == 0:
-                    found_attr = "(not listed)"      # empty dicts need to be handled explicitly
-                else:
-                    found_attr = [f"{key}: {value}" for (key, value) in found_attr.items()]
-                    found_attr = quote_enclose("; ".join(found_attr))
-
-            # regardless
-            attr_line.append(str(found_attr))
-
-        return ",".join(attr_line)
+    def to_record(self, attrs: list | str | ExtractionPlan = ()) -> FilmRecord:
+        """
+        Extracts `attrs` (if any) and returns them in a `FilmRecord`, along
+        with the film's URL, title and year. The record doesn't hold on to the
+        film's pages, so it's the thing to keep around once a film is done with.
+        """
+        plan = attrs if isinstance(attrs, ExtractionPlan) else ExtractionPlan(attrs)
+        return FilmRecord(self._url, self._title, self._year, dict(zip(plan.attrs, plan.extract(self))))
 
 
     def get_tabbed_attribute(self, attribute: str) -> list:
@@ -303,7 +716,7 @@ class LetterboxdFilm:
 
         """
 
-        if attribute not in TABBED_ATTRS:
+        if attribute not in _TABBED_ATTR_SET:
 
             # I'm building the error message like this to preserve the formatting.
             err_msg = [
@@ -320,40 +733,27 @@ class LetterboxdFilm:
 
             raise ValueError(err_msg)
 
-        elements = self._html.css("a[href*='/" + attribute + "/']")
-
-        # extract text from found HTML elements,
-        # stripping out whitespace and commas
-        attribute_list = [e.text().strip().replace(",","") for e in elements]
+        if attribute in self._values:
+            return self._page_value(attribute)
 
-        # Remove plural and singluar versions of occurrences
-        # of the attribute name in the list, because sometimes that happens
-        attr_versions = [
+        self._ensure_page()
+        return self._keep_value(
             attribute,
-            attribute+"s",
-            attribute.capitalize(),
-            attribute.capitalize()+"s"
-        ]
-        for av in attr_versions:
-            if av in attribute_list:
-                attribute_list.remove(av)
-
-        # director appears twice on every page, so only return unique values,
-        # with order preserved (found here: https://stackoverflow.com/a/17016257)
-        if attribute == "director" and len(attribute_list) > 0:
-            return list(dict.fromkeys(attribute_list))
-
-        if len(attribute_list) > 0:
-            return attribute_list
-
-        # the outcome whether the attribute was not valid or valid but not found for the film
-        return ["(not listed)"]
+            lambda: _tabbed_values(attribute, self._html.css("a[href*='/" + attribute + "/']"))
+        )
 
 
     def get_avg_rating(self) -> float:
         """
         Get average rating on Letterboxd.
         """
+        if "avg-rating" in self._values:
+            return self._page_value("avg-rating")
+
+        self._ensure_page()
+        return self._keep_value("avg-rating", self._find_avg_rating)
+
+    def _find_avg_rating(self) -> float:
         selector = "meta[name='twitter:data2']"
         rating_element = self._html.css("meta[name='twitter:data2']")
         if not rating_element:
@@ -381,36 +781,20 @@ class LetterboxdFilm:
 
         For casting director, use `get_tabbed_attribute("casting")`.
         """
-        actor_nodes = self._html.css("a[href*='/actor/']")
+        if "cast-list" in self._values:
+            return self._page_value("cast-list")
 
-        casting = {}
-        for node in actor_nodes:
-
-            # Some films, like in documentaries, the "actors" are all appearing
-            # as themselves, not as a character. This catches those cases.
-            if 'title' not in node.attributes.keys():
-                casting[node.text()] = "Self"
-                continue
-
-            # double-quotes are reserved for the CSV formatting
-            acting_role = node.attributes['title']
-            if not acting_role:
-                raise ChangedLetterboxdDOM(f"DOM changed for casting.")
-            
-            casting[node.text().replace("\"", "'")] = acting_role.replace("\"", "'")
-
-        return casting
+        self._ensure_page()
+        return self._keep_value("cast-list", lambda: _cast_dict(self._html.css("a[href*='/actor/']")))
 
 
     # Statistics section
 
     def _get_stats_html(self) -> HTMLParser:
-        self._curl.setopt(pycurl.URL, self._stats_url)
-        stats_response   = self._curl.perform_rs()
-        status_code      = self._curl.getinfo(pycurl.RESPONSE_CODE)
-        handle_http_err(status_code, self._stats_url)
+        stats_response   = self._transport.get(self._stats_url)
+        handle_http_err(stats_response.status, self._stats_url)
 
-        stats_html       = HTMLParser(stats_response)
+        stats_html       = HTMLParser(stats_response.body)
         
         return stats_html
 
@@ -419,9 +803,16 @@ class LetterboxdFilm:
         """
         Return the amount of watches the film has on Letterboxd.
         """
+        return self._count_watches()
+
+    def _count_watches(self) -> int:
+        """
+        Reads the watch count off the stats page (fetching it
+        first, if it hasn't been yet).
+        """
         if not self._stats_html:
             self._stats_html = self._get_stats_html()
-  
+
         selector = "div.production-statistic.-watches"
 
         try:
@@ -451,6 +842,13 @@ class LetterboxdFilm:
         """
         Return the amount of likes the film has on Letterboxd.
         """
+        return self._count_likes()
+
+    def _count_likes(self) -> int:
+        """
+        Reads the like count off the stats page (fetching it
+        first, if it hasn't been yet).
+        """
         if not self._stats_html:
             self._stats_html = self._get_stats_html()
 
@@ -480,6 +878,46 @@ class LetterboxdFilm:
 
 
 
+def fetch_films(
+    film_urls: Iterable[str],
+    max_concurrent: int = lbt.DEFAULT_CONCURRENCY,
+    transport: lbt.Transport | None = None,
+    with_stats: bool = False
+    ) -> Iterator[tuple[int, LetterboxdFilm]]:
+    """
+    Fetches and initializes many films at once, with up to `max_concurrent`
+    requests in flight. Yields `(i, film)` pairs in the order the films 
+    finish, where `i` is the position of the film's URL in `film_urls`.
+
+    With `with_stats`, each film's stats page is fetched at the same time
+    as its film page (instead of after, on the first `get_likes()` or
+    `get_watches()`), and a film is yielded once both have come back.
+    """
+    transport = transport or lbt.default_transport()
+
+    if not with_stats:
+        for i, resp in transport.fetch(film_urls, max_concurrent):
+            handle_http_err(resp.status, resp.url)
+            yield i, LetterboxdFilm.from_html(resp.url, resp.body, transport)
+        return
+
+    # film i's page is request 2i, and its stats page is request 2i+1,
+    # so the two are requested back to back
+    requests = (url for film_url in film_urls for url in (film_url, stats_url(film_url)))
+    arrived  = {}
+    for j, resp in transport.fetch(requests, max_concurrent):
+        handle_http_err(resp.status, resp.url)
+
+        i, is_stats = divmod(j, 2)
+        if i not in arrived:
+            arrived[i] = resp
+            continue
+
+        film_resp, stats_resp = (arrived.pop(i), resp) if is_stats else (resp, arrived.pop(i))
+        yield i, LetterboxdFilm.from_html(film_resp.url, film_resp.body, transport, stats_resp.body)
+
+
+
 
 class LetterboxdList:
     """
@@ -499,8 +937,19 @@ class LetterboxdList:
     to the index of the film in the list, and the list is not designed to be
     modified. The `is_ranked` boolean allows the user to check and implement
     display of list rank as they see fit. 
+
+    For long lists, pass `records` to keep each film as a `FilmRecord` with just
+    those attributes, instead of a `LetterboxdFilm` with its pages parsed.
     """
-    def __init__(self, url: str, sub_init=False, max_length=-1):
+    def __init__(
+        self,
+        url: str,
+        sub_init=False,
+        max_length=-1,
+        max_concurrent=lbt.DEFAULT_CONCURRENCY,
+        transport: lbt.Transport | None = None,
+        records: list | str | ExtractionPlan | None = None
+        ):
         """
         Initialize a `LetterboxdList` object.
             `url`: the URL to the list.
@@ -509,19 +958,38 @@ class LetterboxdList:
             depends on at least 1 HTTP request. Default: `False`.
             `max_length`: Raise `ListTooLongError` error if list length exceeds
             this value. Default: -1 (meaning "no limit").
+            `max_concurrent`: The most film requests to have in flight at once
+            when initializing films in bulk (see `init_films()`). Default: 64.
+            `transport`: The `Transport` to make requests through, which is
+            shared with the films in the list. Default: the process' default one.
+            `records`: If given, films are kept as `FilmRecord`s with these 
+            attributes once initialized, rather than as `LetterboxdFilm`s.
+            Default: `None`.
         """
         self._url       = url
-        self._curl      = pycurl.Curl()
-        self._curl.setopt(pycurl.URL, self._url)
-        self._curl.setopt(
-            pycurl.HTTPHEADER,
-            ["User-Agent: Application", "Connection: Keep-Alive"]
-        )
+        self._transport = transport or lbt.default_transport()
+        self._records   = None
+        if records is not None:
+            self._records = records if isinstance(records, ExtractionPlan) else ExtractionPlan(records)
+
+        first_page      = self._transport.get(self._url)
+        handle_http_err(first_page.status, self._url)
+        first_page_html = HTMLParser(first_page.body)
+
+        self._read_first_page(first_page_html, max_length)
+        self._max_concurrent = max_concurrent
 
-        first_page_html = HTMLParser(self._curl.perform_rs())
-        resp_code       = self._curl.getinfo(pycurl.HTTP_CODE)
-        handle_http_err(resp_code, self._url)
+        self._films     = self._get_urls(first_page_html)
+
+        if sub_init:
+            self.init_films()
 
+
+    def _read_first_page(self, first_page_html: HTMLParser, max_length: int):
+        """
+        Gets the list's name, length, page count and whether it's ranked
+        from its first page.
+        """
         self._name      = first_page_html.css(".title-1")[0].text()
         self._length    = self._get_list_len(first_page_html)
 
@@ -537,12 +1005,6 @@ class LetterboxdList:
         self._num_pages = int(page_num_nodes[-1].text()) if len(page_num_nodes) > 0 else 1
         self._is_ranked = bool(first_page_html.css("p.list-number"))
 
-        self._films     = self._get_urls(first_page_html)
-
-        if sub_init:
-            for n in range(self._length):
-                self.init_film(n)
-
 
     def _get_list_len(self, html_dom: HTMLParser) -> int:
         """
@@ -582,13 +1044,47 @@ class LetterboxdList:
     def _get_urls(self, first_page: HTMLParser) -> list[str | LetterboxdFilm]:
         """
         Fetches all the URLs to films, across all list pages.
+
+        The URLs of every page after the first are known as soon as we know
+        how many pages there are, so those are fetched concurrently (at most
+        `PAGE_CONCURRENCY` at a time), then put back together in list order.
         """
         
         # we already have the first page, so start with the URLs there
+        film_urls = self._urls_on_page(first_page)
+
+        if self._num_pages > 1:
+            # now we do the rest, if there is any
+            page_urls = self._later_page_urls()
+            engine    = lbt.FetchEngine(min(PAGE_CONCURRENCY, len(page_urls)), self._transport)
+
+            for resp in engine.fetch_ordered(page_urls):
+                handle_http_err(resp.status, resp.url)
+                film_urls.extend(self._urls_on_page(HTMLParser(resp.body)))
+
+        return film_urls
+
+
+    def _later_page_urls(self) -> list[str]:
+        """
+        The URLs of every page of the list after the first.
+        """
+        return [
+            self._url+"page/"+str(current_page)+"/"
+            for current_page in range(2, self._num_pages+1) # exclude the first page, include last
+        ]
+
+
+    def _urls_on_page(self, list_page: HTMLParser) -> list[str]:
+        """
+        Gets the film URLs from a single page of the list.
+        """
         film_urls = []
-        selector = "div[data-target-link^='/film/']"
-        el_attr  = "data-target-link"
-        for el in first_page.css("div[data-target-link^='/film/']"):
+        selector  = "div[data-target-link^='/film/']"
+        el_attr   = "data-target-link"
+        site_root = self._url[:self._url.find("/", self._url.find("//") + 2)]
+
+        for el in list_page.css(selector):
             
             target_link = el.attrs[el_attr]
 
@@ -598,30 +1094,7 @@ class LetterboxdList:
                     f"found by CSS selector {selector}, or in the {el_attr} attribute."
                     )
             
-            film_urls.append("https://letterboxd.com" + target_link)
-
-        
-        if self._num_pages > 1:
-            # now we do the rest, if there is any
-            for current_page in range(2, self._num_pages+1): # exclude the first page, include last
-                if not self._curl:
-                    raise Exception("__getitem__ copy failed to replace Curl object")
-                
-                self._curl.setopt(pycurl.URL, self._url+"page/"+str(current_page)+"/")
-                listpage = self._curl.perform_rs()
-                tree = HTMLParser(listpage)
-
-                for el in tree.css(selector):
-                    
-                    target_link = el.attrs[el_attr]
-
-                    if not target_link:
-                        raise ChangedLetterboxdDOM(
-                            "Letterboxd film URLs are no longer in the element "
-                            f"found by CSS selector {selector}, or in the {el_attr} attribute."
-                            )
-                    
-                    film_urls.append("https://letterboxd.com" + target_link)
+            film_urls.append(site_root + target_link)
 
         return film_urls
 
@@ -631,13 +1104,17 @@ class LetterboxdList:
         This function implements the indexing syntax for the class, 
         including slicing. 
         
-        If a slice is used, a deep copy of the original LetterboxdList 
-        object is returned, with its contents being a subset of the original's.
-        Otherwise, the list item is simply returned.
+        If a slice is used, a new LetterboxdList object is returned, with its 
+        contents being a subset of the original's. The films already initialized
+        are shared with the original rather than copied (so slicing costs no more
+        than the length of the slice); films initialized through the slice 
+        afterwards are only stored in the slice. Otherwise, the list item is 
+        simply returned.
 
         Note that this list may contain both `str`s (URLs to films) and 
-        `LetterboxdFilm` objects: it starts with only `str`s, but will contain
-        only `LetterboxdFilm` objects if all have been initialized. 
+        `LetterboxdFilm` objects (or `FilmRecord`s, if the list keeps `records`):
+        it starts with only `str`s, but will contain only films if all have been
+        initialized. 
 
         Any index or key errors will be handled by the containers indexed into.
         """
@@ -647,18 +1124,10 @@ class LetterboxdList:
             return self._films[idx]
 
         if isinstance(idx, slice):
-            # since Curl objects don't support deep copying, I need to delete that attribute
-            # before the copy, and recreate it after (for both self and the copy)
-            self._curl         = None
-            subset_list        = copy.deepcopy(self)
-            subset_list._films = subset_list._films[idx]
-
-            self._curl = pycurl.Curl()
-            self._curl.setopt(
-                pycurl.HTTPHEADER,
-                ["User-Agent: Application", "Connection: Keep-Alive"]
-            )
-            subset_list._curl = self._curl
+            # a shallow copy, so the slice has the same `Transport` (and so
+            # the same connections), and its own list of the same films
+            subset_list        = copy.copy(self)
+            subset_list._films = self._films[idx]
 
             return subset_list
 
@@ -712,12 +1181,30 @@ class LetterboxdList:
         return self._url
 
 
+    @property
+    def records(self) -> ExtractionPlan | None:
+        """
+        The attributes films are kept with as `FilmRecord`s, if they are.
+        """
+        return self._records
+
+
     def is_initialized(self, n: int) -> bool:
         """
         Checks to see if the nth element of the list is initialized
-        as a LetterboxdFilm.
+        as a LetterboxdFilm (or a FilmRecord).
+        """
+        return isinstance(self._films[n], (LetterboxdFilm, FilmRecord))
+
+
+    def _keep(self, film: LetterboxdFilm) -> LetterboxdFilm | FilmRecord:
+        """
+        What's stored in the list for an initialized film.
         """
-        return isinstance(self._films[n], LetterboxdFilm)
+        if self._records is None:
+            return film
+
+        return film.to_record(self._records)
 
 
     def init_film(self, n: int):
@@ -727,14 +1214,77 @@ class LetterboxdList:
         LetterboxdFilm object. 
 
         If the list item has already been initialized, the function
-        simply returns the already-initialized object.
+        simply returns the already-initialized object. If the list keeps
+        `records`, the film's `FilmRecord` is stored and returned instead.
         """
-        if isinstance(self._films[n], LetterboxdFilm):
+        if self.is_initialized(n):
             return self._films[n]
 
         lbf = self._films[n]
         if isinstance(lbf, str):
-            lbf = LetterboxdFilm(lbf)
+            lbf = self._keep(LetterboxdFilm(lbf, self._transport))
             self._films[n] = lbf
 
-        return lbf
\ No newline at end of file
+        return lbf
+
+
+    def init_films(self, indices: Iterable[int] | None = None, with_stats: bool = False):
+        """
+        Initialize many films in the list at once (all of them, if no
+        `indices` are given), fetching their pages concurrently. Films that
+        have already been initialized are skipped, as are films still in the
+        transport's `memo`, and a film that's in the list more than once is 
+        only fetched once. With `with_stats`, their stats pages are fetched 
+        at the same time (see `fetch_films()`).
+        """
+        if indices is None:
+            indices = range(len(self._films))
+
+        memo    = self._transport.memo
+        to_init = {}                        # film key -> its indices in the list
+        for n in indices:
+            if self.is_initialized(n):
+                continue
+
+            key    = film_key(self._films[n])
+            record = memo.get(key)
+            if record is not None:
+                self._films[n] = self._keep(LetterboxdFilm.from_record(self._films[n], record, self._transport))
+            else:
+                to_init.setdefault(key, []).append(n)
+
+        keys = list(to_init)
+        urls = [self._films[to_init[key][0]] for key in keys]
+
+        # the stats pages are needed for the records, if they have likes or watches
+        with_stats = with_stats or bool(self._records and self._records.needs_stats)
+
+        for i, film in fetch_films(urls, self._max_concurrent, self._transport, with_stats):
+            if memo.max_films:
+                memo.put(keys[i], page_record(film))
+            for n in to_init[keys[i]]:
+                self._films[n] = self._keep(film)
+
+
+    def diff(self, previous: Iterable[str]) -> ListDiff:
+        """
+        Compares the list as it is now with `previous`, the film URLs it had
+        at some earlier point (in list order), e.g. from the last export.
+        No requests are made; the list pages were already read when the
+        list was initialized.
+        """
+        previous  = {url: m for m, url in enumerate(previous)}
+        now       = [f if isinstance(f, str) else f.url for f in self._films]
+        now_set   = set(now)
+        added     = []
+        kept      = {}
+
+        for n, url in enumerate(now):
+            if url in previous:
+                kept[n] = previous[url]
+            else:
+                added.append(n)
+
+        removed = [url for url in previous if url not in now_set]
+
+        return ListDiff(added, removed, kept)
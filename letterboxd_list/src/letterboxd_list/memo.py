@@ -0,0 +1,138 @@
+"""
+An in-process memo of the data extracted from films that have already been
+fetched, so asking for the same film again (e.g. iterating over a 
+`LetterboxdList` more than once, several lists that share films, or a list
+that has a film in it twice) doesn't fetch and parse its page all over again.
+
+Each `Transport` keeps a `FilmMemo`, which `LetterboxdFilm` and
+`LetterboxdList` go through. What's kept for a film is a `FilmRecord` of the
+values on its film page, not its parsed page (see `containers.page_record()`).
+The memo holds a bounded number of them, dropping the least recently used
+ones first, and ones older than its `max_age`.
+"""
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from urllib.parse import urlsplit
+
+DEFAULT_MAX_FILMS = 1024
+DEFAULT_MAX_AGE   = 60 * 60         # seconds
+
+
+def film_key(film_url: str) -> tuple[str, str]:
+    """
+    What a film is memoized under: the site it's on, and its slug (the part
+    of the URL after `/film/`), so different spellings of the same film's
+    URL (e.g. without the trailing slash) share one entry.
+    """
+    parts = urlsplit(film_url)
+    path  = parts.path
+    if "/film/" in path:
+        path = path.split("/film/", 1)[1]
+
+    return parts.netloc.lower(), path.strip("/").split("/")[0]
+
+
+class FilmMemo:
+    """
+    Keeps up to `max_films` films' records (or anything else), by key, for
+    up to `max_age` seconds each (`None` keeps them until they're dropped to
+    make room). With a `max_films` of 0, nothing is kept.
+
+    The memo is for reusing films one after another, not for films loaded
+    at the same time: it isn't locked (and neither is the rest of the
+    `Transport` it belongs to), and a film asked for again while it's still
+    being loaded is loaded twice. Only `LetterboxdFilm` and `LetterboxdList`
+    go through it; `fetch_films()` (and so `lblist --batch`) and the `aio`
+    API fetch every film they're given. Each process (like each pool worker)
+    has its own, by way of its own transport.
+    """
+    def __init__(self, max_films: int = DEFAULT_MAX_FILMS, max_age: float | None = DEFAULT_MAX_AGE):
+        if max_films < 0:
+            raise ValueError("max_films can't be negative.")
+
+        self._max_films = max_films
+        self._max_age   = max_age
+        self._films     = OrderedDict()     # key -> (when it was kept, film), least recently used first
+
+
+    def __len__(self) -> int:
+        return len(self._films)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._fresh(key) is not None
+
+
+    @property
+    def max_films(self) -> int:
+        """
+        The most films kept at once.
+        """
+        return self._max_films
+
+    @property
+    def max_age(self) -> float | None:
+        """
+        How many seconds a film is kept for, at most.
+        """
+        return self._max_age
+
+
+    def _fresh(self, key: Hashable):
+        """
+        The film kept under `key`, if there is one and it isn't too old
+        (in which case it's dropped).
+        """
+        entry = self._films.get(key)
+        if entry is None:
+            return None
+
+        kept_at, film = entry
+        if self._max_age is not None and time.monotonic() - kept_at > self._max_age:
+            del self._films[key]
+            return None
+
+        self._films.move_to_end(key)
+        return film
+
+
+    def get(self, key: Hashable):
+        """
+        The film kept under `key`, or `None` if there isn't one
+        (or it's too old).
+        """
+        return self._fresh(key)
+
+
+    def put(self, key: Hashable, film):
+        """
+        Keeps `film` under `key`, dropping the least recently used film
+        if there are too many.
+        """
+        if self._max_films == 0:
+            return
+
+        self._films[key] = (time.monotonic(), film)
+        self._films.move_to_end(key)
+        while len(self._films) > self._max_films:
+            self._films.popitem(last=False)
+
+
+    def load(self, key: Hashable, loader: Callable[[], object]):
+        """
+        The film kept under `key`, or else the one `loader()` returns
+        (which is then kept).
+        """
+        film = self._fresh(key)
+        if film is None:
+            film = loader()
+            self.put(key, film)
+
+        return film
+
+
+    def clear(self):
+        """
+        Drops every film kept so far.
+        """
+        self._films.clear()
@@ -0,0 +1,252 @@
+"""
+Per-stage timing of the films in an `lblist` run (`--profile`), to show
+where the time goes: the network (from Curl's own timings of each request),
+parsing the pages, each kind of attribute extraction, and assembling the CSV.
+
+Profiling is switched on per process with `enable()`. Until it is, `timed()`
+and `record_request()` do nothing, so the code paths they're in cost next to
+nothing extra. Each pool worker hands its timings over with `take()` as it
+finishes a chunk, and the main process adds them up in a `Profile` of its own,
+which writes the report.
+"""
+import json
+import time
+import statistics
+from contextlib import contextmanager
+import pycurl
+
+# where the time for one film can go, in the order it's spent
+NETWORK_STAGES = ("dns", "connect", "tls", "wait", "transfer", "stats-fetch")
+STAGES         = NETWORK_STAGES + (
+    "parse", "stats-parse", "links", "tabbed", "cast-list", "avg-rating", "stats", "csv"
+)
+
+# the extraction stage each attribute's time counts toward
+# (anything else is one of the tabbed attributes)
+ATTR_STAGES = {
+    "avg-rating": "avg-rating",
+    "cast-list":  "cast-list",
+    "likes":      "stats",
+    "watches":    "stats",
+}
+
+SLOWEST_FILMS = 10
+
+# this process' Profile, if profiling (see enable())
+_profile = None
+
+
+def percentile(values: list[float], pct: int) -> float | None:
+    """
+    The `pct`th percentile of `values` (which don't need to be sorted).
+    """
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def _film_url(url: str) -> tuple[str, bool]:
+    """
+    The film a request was for, and whether it was for the film's stats
+    page (the reverse of `containers.stats_url()`).
+    """
+    if "/csi/film/" in url and url.endswith("/stats/"):
+        return url.replace("/csi", "", 1)[:-len("stats/")], True
+    return url, False
+
+
+class Profile:
+    """
+    The wall and CPU time spent on each film, by stage (see `STAGES`).
+    Time added to a stage more than once for the same film (e.g. for a
+    retried request) is summed.
+    """
+    def __init__(self):
+        self._films = {}                # film URL -> {stage: [wall, cpu]}
+
+
+    def __len__(self) -> int:
+        return len(self._films)
+
+
+    def add(self, film_url: str, stage: str, wall: float, cpu: float = 0.0):
+        """
+        Counts `wall` seconds (of which `cpu` were spent on the CPU) toward
+        `stage` for the film at `film_url`.
+        """
+        times = self._films.setdefault(film_url, {}).setdefault(stage, [0.0, 0.0])
+        times[0] += wall
+        times[1] += cpu
+
+
+    def merge(self, timings: dict[str, dict[str, list[float]]]):
+        """
+        Adds in the timings from another process' profile (from `take()`).
+        """
+        for film_url, stages in timings.items():
+            for stage, (wall, cpu) in stages.items():
+                self.add(film_url, stage, wall, cpu)
+
+
+    def timings(self) -> dict[str, dict[str, list[float]]]:
+        """
+        Every film's timings so far, as `{film_url: {stage: [wall, cpu]}}`.
+        """
+        return self._films
+
+
+    def film_seconds(self) -> dict[str, float]:
+        """
+        The time spent on each film, as the sum of the wall time of its stages.
+        """
+        return {url: sum(w for w, _ in t.values()) for url, t in self._films.items()}
+
+
+    def report(self, seconds: float | None = None, slowest: int = SLOWEST_FILMS) -> dict:
+        """
+        A summary of the timings: for each stage, the total wall and CPU
+        seconds spent on it, and percentiles of the time each film spent
+        in it; percentiles of the time spent on each film in all (see
+        `film_seconds()`); and the `slowest` films, with where their time went.
+        CPU time isn't measured for the network stages, so it's `None` for those.
+        """
+        stages = {}
+        for stage in STAGES:
+            walls = [t[stage][0] for t in self._films.values() if stage in t]
+            if not walls:
+                continue
+
+            cpu = sum(t[stage][1] for t in self._films.values() if stage in t)
+            stages[stage] = {
+                "films":   len(walls),
+                "wall":    round(sum(walls), 6),
+                "cpu":     None if stage in NETWORK_STAGES else round(cpu, 6),
+                "p50_ms":  round(percentile(walls, 50) * 1000, 3),
+                "p90_ms":  round(percentile(walls, 90) * 1000, 3),
+                "p99_ms":  round(percentile(walls, 99) * 1000, 3),
+                "max_ms":  round(max(walls) * 1000, 3),
+            }
+
+        totals = self.film_seconds()
+        ranked = sorted(totals, key=totals.get, reverse=True)[:slowest]
+        per_film = {
+            f"p{pct}_ms": round(percentile(list(totals.values()), pct) * 1000, 3)
+            for pct in (50, 90, 99)
+        } if totals else {}
+
+        return {
+            "films":    len(self._films),
+            "seconds":  round(seconds, 3) if seconds is not None else None,
+            "stages":   stages,
+            "per_film": per_film,
+            "slowest": [
+                {
+                    "url":      url,
+                    "total_ms": round(totals[url] * 1000, 3),
+                    "stages":   {
+                        stage: round(self._films[url][stage][0] * 1000, 3)
+                        for stage in STAGES if stage in self._films[url]
+                    }
+                }
+                for url in ranked
+            ]
+        }
+
+
+    def write(self, path: str, seconds: float | None = None):
+        """
+        Writes the `report()` to `path` as JSON.
+        """
+        with open(path, "w", encoding="utf-8") as report_file:
+            json.dump(self.report(seconds), report_file, indent=2)
+            report_file.write("\n")
+
+
+
+def enable():
+    """
+    Starts profiling in the current process (e.g. in a pool worker's initializer).
+    """
+    global _profile
+    _profile = Profile()
+
+
+def disable():
+    """
+    Stops profiling in the current process, dropping any timings not taken yet.
+    """
+    global _profile
+    _profile = None
+
+
+def enabled() -> bool:
+    """
+    Whether the current process is profiling.
+    """
+    return _profile is not None
+
+
+def take() -> dict[str, dict[str, list[float]]] | None:
+    """
+    The timings recorded in this process since the last `take()` (as from
+    `Profile.timings()`), which are then cleared; `None` if not profiling.
+    """
+    global _profile
+
+    if _profile is None:
+        return None
+
+    timings  = _profile.timings()
+    _profile = Profile()
+    return timings
+
+
+@contextmanager
+def timed(stage: str, film_url: str):
+    """
+    Times the body of the `with` block toward `stage` for `film_url`,
+    if profiling.
+    """
+    if _profile is None:
+        yield
+        return
+
+    wall = time.perf_counter()
+    cpu  = time.process_time()
+    try:
+        yield
+    finally:
+        _profile.add(film_url, stage, time.perf_counter() - wall, time.process_time() - cpu)
+
+
+def record_request(url: str, handle):
+    """
+    Splits a finished request's time into its network stages, from the
+    timings Curl keeps on its `handle`, if profiling. The whole of a
+    stats page request counts as `stats-fetch` for its film.
+    """
+    if _profile is None:
+        return
+
+    # each of these is the time from the start of the request
+    total    = handle.getinfo(pycurl.TOTAL_TIME)
+    film_url, is_stats = _film_url(url)
+    if is_stats:
+        _profile.add(film_url, "stats-fetch", total)
+        return
+
+    lookup   = handle.getinfo(pycurl.NAMELOOKUP_TIME)
+    connect  = handle.getinfo(pycurl.CONNECT_TIME)
+    tls      = handle.getinfo(pycurl.APPCONNECT_TIME)
+    ready    = handle.getinfo(pycurl.PRETRANSFER_TIME)
+    first    = handle.getinfo(pycurl.STARTTRANSFER_TIME)
+
+    # reused connections report 0 for the steps they skipped
+    _profile.add(film_url, "dns",      lookup)
+    _profile.add(film_url, "connect",  max(0.0, connect - lookup))
+    _profile.add(film_url, "tls",      max(0.0, tls - connect) if tls else 0.0)
+    _profile.add(film_url, "wait",     max(0.0, first - ready))
+    _profile.add(film_url, "transfer", max(0.0, total - first))
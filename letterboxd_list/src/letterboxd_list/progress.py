@@ -0,0 +1,218 @@
+"""
+Progress reporting for `lblist`, kept off the path each film takes through
+the workers.
+
+Each worker process counts the films it finishes in its own slot of a shared
+array, which only it writes to, so counting a film takes no lock and does no
+I/O. A worker gives its slot up as it exits, for the one a pool starts in its
+place to count in. A `ProgressReporter` thread in the main process adds the
+slots up and redraws the progress bar a few times a second; when output isn't
+going to a terminal, it prints a line of JSON every so often instead.
+"""
+import sys
+import json
+import threading
+import multiprocessing as mp
+from multiprocessing.util import Finalize
+from math import ceil
+from datetime import datetime
+from shutil import get_terminal_size
+
+TTY_REFRESH_SECONDS  = 0.2
+LINE_REFRESH_SECONDS = 5.0
+
+# this worker's counter, where in it to count, and the lock to count with
+# if that slot's shared (see attach_worker())
+_counters = None
+_slot     = None
+_lock     = None
+_release  = None
+
+
+def print_progress_bar(rows_now: int, total_rows: int, func_start_time: datetime, stream=None):
+    """
+    Handles progress bar output. Will change width if terminal width changes
+    during runtime.
+    """
+    output_width  = get_terminal_size(fallback=(80,25))[0]-37
+    completion    = rows_now/total_rows
+    bar_width_now = ceil(output_width * completion)
+
+    since_start   = datetime.now() - func_start_time
+    est_remaining = since_start * (total_rows/rows_now - 1)
+    minutes       = int(est_remaining.total_seconds()) // 60
+    seconds       = est_remaining.seconds % 60                   # `seconds` may be > 60
+
+    print("| ", "█" * bar_width_now,
+            (output_width - bar_width_now) * " ", "|",
+            f"{completion:.0%}  ",
+            f"Time remaining: {minutes:02d}:{seconds:02d}",
+            end = "\r", file=stream or sys.stdout, flush=True)
+
+
+def attach_worker(counters, taken):
+    """
+    For a pool's initializer: claims a slot in `counters` (the array of a
+    `ProgressReporter`) for the current worker process, and marks it in
+    `taken` until the worker exits. The lock on `taken` is only taken here,
+    and when the slot's given up, once each per worker.
+
+    A pool starts a new worker in place of any that exits, which gets the
+    slot the old one gave up. A worker that's killed can't give its slot
+    up, so if none are left, the worker counts in the last slot of
+    `counters`, which is kept for that, and locked every time it's counted on.
+    """
+    global _counters, _slot, _lock, _release
+
+    with taken.get_lock():
+        free = next((i for i, used in enumerate(taken.get_obj()) if not used), None)
+        if free is not None:
+            taken[free] = 1
+
+    _counters = counters
+    if free is None:
+        _slot    = len(counters) - 1
+        _lock    = taken.get_lock()
+        _release = None
+    else:
+        _slot    = free
+        _lock    = None
+        _release = Finalize(None, _give_up_slot, args=(taken, free), exitpriority=0)
+
+
+def detach_worker():
+    """
+    Stops counting films for the current worker, giving its slot up (which
+    is done anyway when the worker exits).
+    """
+    global _counters, _release
+
+    if _release is not None:
+        _release()
+    _counters = None
+    _release  = None
+
+
+def _give_up_slot(taken, slot: int):
+    with taken.get_lock():
+        taken[slot] = 0
+
+
+def report_done(films: int = 1):
+    """
+    Counts `films` more films as finished by the current worker. Does nothing
+    outside of a worker attached with `attach_worker()`.
+    """
+    if _counters is None:
+        return
+
+    if _lock is None:
+        _counters[_slot] += films       # this worker is the slot's only writer
+    else:
+        with _lock:
+            _counters[_slot] += films
+
+
+class ProgressReporter:
+    """
+    Shows the progress of `total` films being fetched by up to `workers` pool
+    workers (which should be started with `attach_worker()` and `initargs()`),
+    plus however many are counted with `add()` from the main process.
+
+    While running (between `start()` and `stop()`, or in a `with` block), it
+    redraws a progress bar on `stream` every `TTY_REFRESH_SECONDS` if that's a
+    terminal, and otherwise writes a JSON line every `LINE_REFRESH_SECONDS`:
+
+    .. code-block:: json
+
+        {"done": 120, "total": 500, "elapsed": 12.3, "remaining": 39.0}
+
+    """
+    def __init__(self, total: int, workers: int, start_time: datetime | None = None, stream=None):
+        self._total      = total
+        self._counters   = mp.RawArray('i', workers + 1)    # the last for workers left without a slot
+        self._taken      = mp.Array('b', workers)
+        self._base       = 0
+        self._start_time = start_time or datetime.now()
+        self._stream     = stream or sys.stdout
+        self._tty        = self._stream.isatty()
+        self._stopped    = threading.Event()
+        self._thread     = None
+
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+    @property
+    def done(self) -> int:
+        """
+        How many films have been finished so far.
+        """
+        return self._base + sum(self._counters)
+
+    def initargs(self) -> tuple:
+        """
+        The arguments `attach_worker()` needs in each worker.
+        """
+        return (self._counters, self._taken)
+
+
+    def add(self, films: int):
+        """
+        Counts films finished outside of the workers (e.g. from a checkpoint).
+        """
+        self._base += films
+
+
+    def render(self):
+        """
+        Shows the current progress once.
+        """
+        done = self.done
+        if self._tty:
+            if done > 0:
+                print_progress_bar(done, self._total, self._start_time, self._stream)
+            return
+
+        elapsed   = (datetime.now() - self._start_time).total_seconds()
+        remaining = elapsed * (self._total / done - 1) if done else None
+        line      = {
+            "done":      done,
+            "total":     self._total,
+            "elapsed":   round(elapsed, 1),
+            "remaining": round(remaining, 1) if remaining is not None else None
+        }
+        print(json.dumps(line), file=self._stream, flush=True)
+
+
+    def _run(self):
+        interval = TTY_REFRESH_SECONDS if self._tty else LINE_REFRESH_SECONDS
+        while not self._stopped.wait(interval):
+            self.render()
+
+
+    def start(self):
+        """
+        Starts redrawing the progress in the background.
+        """
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+
+    def stop(self):
+        """
+        Stops redrawing, after showing the progress one last time.
+        """
+        if self._thread is None:
+            return
+
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        self.render()
@@ -0,0 +1,168 @@
+"""
+Pacing for requests to Letterboxd, so raising the concurrency doesn't end
+with the server turning requests away (with a `429 Too Many Requests` or a
+`503`), and the export failing partway through.
+
+`RateLimiter` combines three things:
+- a token bucket, capping the request rate (if one is given);
+- an AIMD window on how many requests are in flight, which is halved when
+  the server pushes back and grows by one request per window of successes;
+- retries, with jittered exponential backoff, for responses that are worth
+  trying again, honouring the server's `Retry-After` header if it sends one.
+"""
+import time
+import random
+from email.utils import parsedate_to_datetime
+
+RETRY_STATUSES    = frozenset({429, 500, 502, 503, 504})
+THROTTLE_STATUSES = frozenset({429, 503})       # the server asking us to slow down
+
+
+def retry_after_seconds(value: str | None) -> float | None:
+    """
+    Parses a `Retry-After` header, which is either a number of seconds or
+    an HTTP date. Returns `None` if it's missing or can't be read.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Paces the requests made through a `Transport` (one per process).
+
+    `rate` is the most requests to start per second, with up to `burst` of
+    them at once (no limit if `rate` is `None`). Responses with a status in
+    `RETRY_STATUSES` are retried up to `max_retries` times, after a random
+    delay of up to `base_delay * 2**attempt` seconds (capped at `max_delay`),
+    or after however long the server's `Retry-After` says. A `Retry-After`
+    holds back every request, not just the one that got it.
+
+    The in-flight window starts out unlimited, and is only cut down once
+    the server pushes back (see `THROTTLE_STATUSES`).
+    """
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: int = 1,
+        max_retries: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0
+        ):
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive.")
+
+        self._rate        = rate
+        self._burst       = max(1, burst)
+        self._max_retries = max_retries
+        self._base_delay  = base_delay
+        self._max_delay   = max_delay
+
+        self._tokens      = float(self._burst)
+        self._refilled_at = time.monotonic()
+        self._paused_til  = 0.0
+        self._window      = float("inf")        # AIMD in-flight limit
+
+
+    @property
+    def rate(self) -> float | None:
+        """
+        The most requests started per second, if there's a limit.
+        """
+        return self._rate
+
+    @property
+    def max_retries(self) -> int:
+        """
+        How many times a request is retried before giving up.
+        """
+        return self._max_retries
+
+
+    def split(self, parts: int) -> "RateLimiter":
+        """
+        A new limiter with the same settings, but `1/parts` of the rate, for
+        each of `parts` processes to share the rate limit between them.
+        """
+        return RateLimiter(
+            self._rate / parts if self._rate else None,
+            max(1, self._burst // parts),
+            self._max_retries,
+            self._base_delay,
+            self._max_delay
+        )
+
+
+    def concurrency(self, max_concurrent: int) -> int:
+        """
+        How many requests may be in flight right now, out of `max_concurrent`.
+        """
+        if self._window >= max_concurrent:
+            return max_concurrent
+
+        return max(1, int(self._window))
+
+
+    def try_acquire(self) -> float:
+        """
+        Takes a token to start a request, returning 0. If there isn't one
+        (or a `Retry-After` is holding requests back), nothing is taken, and
+        the number of seconds to wait before trying again is returned.
+        """
+        now = time.monotonic()
+        if now < self._paused_til:
+            return self._paused_til - now
+
+        if self._rate is None:
+            return 0.0
+
+        self._tokens      = min(self._burst, self._tokens + (now - self._refilled_at) * self._rate)
+        self._refilled_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+
+        return (1 - self._tokens) / self._rate
+
+
+    def acquire(self):
+        """
+        Blocks until a request can be started.
+        """
+        while (wait := self.try_acquire()) > 0:
+            time.sleep(wait)
+
+
+    def record(self, status: int, headers: dict[str, str], attempt: int, in_flight: int = 1) -> float | None:
+        """
+        Takes in the outcome of a request (its `attempt`th retry, starting at 0,
+        made with `in_flight` requests going at the time), adjusting the window.
+        Returns how many seconds to wait before retrying it, or `None` if it
+        shouldn't be.
+        """
+        if status in THROTTLE_STATUSES:
+            # multiplicative decrease, from what was actually going at the time
+            self._window = max(1.0, min(self._window, in_flight) / 2)
+        elif status < 400 and self._window != float("inf"):
+            # additive increase: about one more request per window of successes
+            self._window += 1 / self._window
+
+        if status not in RETRY_STATUSES or attempt >= self._max_retries:
+            return None
+
+        retry_after = retry_after_seconds(headers.get("retry-after"))
+        if retry_after is not None:
+            self._paused_til = max(self._paused_til, time.monotonic() + retry_after)
+            return retry_after + random.uniform(0, self._base_delay)
+
+        return random.uniform(0, min(self._max_delay, self._base_delay * 2 ** attempt))
@@ -0,0 +1,141 @@
+"""
+Recording the responses a run gets from Letterboxd, and playing them back
+later without touching the network, so a run can be repeated exactly (e.g.
+to profile parsing on its own, or to re-export a frozen snapshot of a list).
+
+A `ResponseArchive` is a single SQLite file, with the bodies compressed. Given
+to a `Transport` in `"record"` mode, every response it gets is stored; in
+`"replay"` mode, every request is answered from the archive instead, and a
+request that wasn't recorded raises `NotRecordedError`.
+"""
+import os
+import json
+import zlib
+import sqlite3
+from typing import NamedTuple
+
+MODES = ("record", "replay")
+
+
+class NotRecordedError(LookupError):
+    """
+    Raised when replaying an archive that has no response for a URL.
+    """
+
+
+class ArchivedResponse(NamedTuple):
+    """
+    A recorded response (the same fields as a `transport.Response`).
+    """
+    url:     str
+    status:  int
+    body:    str
+    headers: dict[str, str]
+
+
+class ResponseArchive:
+    """
+    The archive at `path`, opened to `"record"` responses into or to
+    `"replay"` them from. Recording into an existing archive adds to it,
+    replacing the responses for any URLs requested again.
+
+    Like `ResponseCache`, each process opens its own connection to the
+    database, so one archive can be handed to every worker in a pool.
+    """
+    def __init__(self, path: str, mode: str = "replay"):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}.")
+        if mode == "replay" and not os.path.exists(path):
+            raise FileNotFoundError(f"There's no archive at {path} to replay.")
+
+        self._path     = path
+        self._mode     = mode
+        self._conn     = None
+        self._conn_pid = None
+
+
+    def __getstate__(self):
+        # SQLite connections can't be pickled (or used across a fork)
+        state = self.__dict__.copy()
+        state["_conn"]     = None
+        state["_conn_pid"] = None
+        return state
+
+
+    @property
+    def path(self) -> str:
+        """
+        Where the archive is kept.
+        """
+        return self._path
+
+    @property
+    def mode(self) -> str:
+        """
+        `"record"` or `"replay"`.
+        """
+        return self._mode
+
+    @property
+    def recording(self) -> bool:
+        """
+        Whether responses are being stored in the archive.
+        """
+        return self._mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        """
+        Whether requests are being answered from the archive.
+        """
+        return self._mode == "replay"
+
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn     = sqlite3.connect(self._path, timeout=30, isolation_level=None)
+            self._conn_pid = os.getpid()
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, status INTEGER, headers TEXT, body BLOB)"
+            )
+
+        return self._conn
+
+
+    def __len__(self) -> int:
+        return self._db().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+    def urls(self) -> list[str]:
+        """
+        The URLs with a recorded response.
+        """
+        return [url for (url,) in self._db().execute("SELECT url FROM responses ORDER BY url")]
+
+
+    def store(self, url: str, status: int, body: str, headers: dict[str, str]):
+        """
+        Records a response.
+        """
+        self._db().execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+            (url, status, json.dumps(headers), zlib.compress(body.encode()))
+        )
+
+
+    def lookup(self, url: str) -> ArchivedResponse:
+        """
+        The recorded response for `url`. Raises `NotRecordedError` if there isn't one.
+        """
+        row = self._db().execute(
+            "SELECT status, headers, body FROM responses WHERE url = ?",
+            (url,)
+        ).fetchone()
+
+        if row is None:
+            raise NotRecordedError(f"No response was recorded for {url} in {self._path}.")
+
+        status, headers, body = row
+        return ArchivedResponse(url, status, zlib.decompress(body).decode(), json.loads(headers))
@@ -0,0 +1,101 @@
+"""
+How `lblist` splits up the films it has to fetch between its worker processes.
+
+Rather than working out every chunk up front, `ChunkScheduler` hands them out
+one at a time as workers are ready for more, sizing each one from how quickly
+chunks have been finishing so far. Chunks get smaller as the films run out,
+so no worker is left with a long chunk while the others sit idle at the end.
+"""
+from math import ceil
+
+TARGET_CHUNK_SECONDS = 2.0      # about how long each chunk should take a worker
+SMOOTHING            = 0.3      # weight of the newest chunk in the rate estimate
+
+
+class ChunkScheduler:
+    """
+    Hands out `(start, end)` chunks of list indices from `gaps` (the ranges
+    of indices left to fetch, as from `__main__.missing_chunks()`), in order.
+
+    Chunks are sized to take a worker about `target_seconds`, going by the
+    films per second that `record()` has been told about, but are kept
+    between `min_size` and `max_size` films. Near the end, no chunk is
+    bigger than a share of what's left for each of the `workers`, down to
+    a single film.
+    """
+    def __init__(
+        self,
+        gaps: list[tuple[int, int]],
+        workers: int,
+        min_size: int,
+        max_size: int,
+        target_seconds: float = TARGET_CHUNK_SECONDS
+        ):
+        self._gaps      = [list(gap) for gap in gaps if gap[1] > gap[0]]
+        self._workers   = max(1, workers)
+        self._min_size  = max(1, min_size)
+        self._max_size  = max(self._min_size, max_size)
+        self._target    = target_seconds
+        self._remaining = sum(end - start for start, end in self._gaps)
+        self._rate      = None                  # films per second, per worker
+
+
+    @property
+    def remaining(self) -> int:
+        """
+        How many films haven't been handed out yet.
+        """
+        return self._remaining
+
+    @property
+    def next_start(self) -> int | None:
+        """
+        The list index the next chunk starts at, if there is one.
+        """
+        return self._gaps[0][0] if self._gaps else None
+
+
+    def chunk_size(self) -> int:
+        """
+        How many films the next chunk should have.
+        """
+        size = self._min_size
+        if self._rate is not None:
+            size = round(self._rate * self._target)
+        size = max(self._min_size, min(self._max_size, size))
+
+        # guided scheduling: the tail is split finer and finer
+        return max(1, min(size, ceil(self._remaining / (2 * self._workers))))
+
+
+    def next_chunk(self) -> tuple[int, int] | None:
+        """
+        The next chunk to hand out, or `None` if they've all been.
+        """
+        if not self._gaps:
+            return None
+
+        gap   = self._gaps[0]
+        start = gap[0]
+        end   = min(gap[1], start + self.chunk_size())
+
+        gap[0] = end
+        if gap[0] == gap[1]:
+            self._gaps.pop(0)
+
+        self._remaining -= end - start
+        return start, end
+
+
+    def record(self, films: int, seconds: float):
+        """
+        Takes in how long a worker took over a chunk of `films` films.
+        """
+        if films <= 0 or seconds <= 0:
+            return
+
+        rate = films / seconds
+        if self._rate is None:
+            self._rate = rate
+        else:
+            self._rate = SMOOTHING * rate + (1 - SMOOTHING) * self._rate
@@ -0,0 +1,278 @@
+"""
+Where `lblist` output goes. Rows are written as soon as they're ready,
+instead of all at once at the end, while still coming out in list order.
+
+Besides CSV, rows can be written as JSON Lines, Parquet or Arrow IPC (see
+`FORMATS`), keeping each attribute's structure instead of flattening it into
+a string: lists stay lists, the cast list is a map from actor to role, and
+`likes`, `watches` and `avg-rating` are numbers. For those formats, a row is
+the film's title and year followed by its attribute values, as they come
+out of `ExtractionPlan.extract()`. Parquet and Arrow need `pyarrow`.
+"""
+import json
+import time
+
+FORMATS    = ("csv", "jsonl", "parquet", "arrow")
+EXTENSIONS = {"csv": ".csv", "jsonl": ".jsonl", "parquet": ".parquet", "arrow": ".arrow"}
+
+NOT_LISTED = "(not listed)"
+
+# how the structured formats type each column (anything else is a list of strings)
+INT_COLUMNS    = frozenset(["rank", "year", "likes", "watches"])
+FLOAT_COLUMNS  = frozenset(["avg-rating"])
+STRING_COLUMNS = frozenset(["title"])
+MAP_COLUMNS    = frozenset(["cast-list"])
+
+ARROW_BATCH_ROWS = 1024
+
+
+def structured_value(column: str, value):
+    """
+    `value` as it's written to the structured formats: typed for its column,
+    with `"(not listed)"` (and the empty values that stand for it) as `None`.
+    """
+    if value == NOT_LISTED or value == [NOT_LISTED] or value == {}:
+        return None
+
+    if column in INT_COLUMNS:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    if column in FLOAT_COLUMNS:
+        return float(value)
+
+    return value
+
+
+
+class Sink:
+    """
+    The ordering that every sink shares: rows come in chunks (with the list
+    index of each chunk's first row), in whatever order the workers finish
+    them. Chunks that arrive ahead of their turn are held in a reorder buffer
+    until the rows before them have been written; keeping that buffer small
+    is up to the caller, by not having too many chunks outstanding at once
+    (see `buffered`).
+
+    Subclasses write each run of rows that's ready with `_write_rows()`, and
+    are flushed at least every `flush_every` seconds, so a long export can be
+    followed on disk while it's running.
+    """
+    def __init__(self, ranked: bool, flush_every: float = 2.0):
+        self._ranked      = ranked
+        self._flush_every = flush_every
+        self._last_flush  = time.monotonic()
+        self._next_index  = 0
+        self._pending     = {}                 # start index -> rows
+
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+    @property
+    def written(self) -> int:
+        """
+        How many rows have been written so far (which is also the list index
+        of the next row to be written).
+        """
+        return self._next_index
+
+    @property
+    def buffered(self) -> int:
+        """
+        How many rows are being held until the rows before them come in.
+        """
+        return sum(len(rows) for rows in self._pending.values())
+
+
+    def write(self, start: int, rows: list):
+        """
+        Hand over the rows for list indices `start` through `start + len(rows) - 1`.
+        """
+        self._pending[start] = rows
+
+        while self._next_index in self._pending:
+            rows = self._pending.pop(self._next_index)
+            self._write_rows(self._next_index, rows)
+            self._next_index += len(rows)
+
+        if time.monotonic() - self._last_flush >= self._flush_every:
+            self._flush()
+            self._last_flush = time.monotonic()
+
+
+    def _write_rows(self, start: int, rows: list):
+        raise NotImplementedError
+
+    def _flush(self):
+        raise NotImplementedError
+
+
+    def close(self):
+        """
+        Flush and close the file. Any rows still waiting on earlier ones
+        are dropped, since they can't be written in the right place.
+        """
+        raise NotImplementedError
+
+
+
+class CSVSink(Sink):
+    """
+    Writes CSV rows to `path` as they finish, in list order, prepending the
+    rank if the list is ranked. Each row should be a string ending with a
+    newline (see `Sink` for how rows are handed over).
+    """
+    def __init__(self, path: str, header: str, ranked: bool, flush_every: float = 2.0):
+        super().__init__(ranked, flush_every)
+        self._file = open(path, "w", encoding="utf-8")
+
+        if ranked:
+            header = "Rank," + header
+        self._file.write(header + "\n")
+
+
+    def _write_rows(self, start: int, rows: list[str]):
+        if self._ranked:
+            rows = [f"{start + i + 1},{row}" for (i, row) in enumerate(rows)]
+
+        self._file.writelines(rows)
+
+
+    def _flush(self):
+        self._file.flush()
+
+
+    def close(self):
+        self._file.close()
+
+
+
+class JSONLinesSink(Sink):
+    """
+    Writes each row to `path` as a JSON object on a line of its own, with
+    `columns` as its keys (and `rank` first, if the list is ranked). Rows are
+    lists of values in the same order as `columns`.
+    """
+    def __init__(self, path: str, columns: list[str], ranked: bool, flush_every: float = 2.0):
+        super().__init__(ranked, flush_every)
+        self._file    = open(path, "w", encoding="utf-8")
+        self._columns = list(columns)
+
+
+    def _write_rows(self, start: int, rows: list[list]):
+        lines = []
+        for i, row in enumerate(rows):
+            record = {"rank": start + i + 1} if self._ranked else {}
+            for column, value in zip(self._columns, row):
+                record[column] = structured_value(column, value)
+            lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+
+        self._file.writelines(lines)
+
+
+    def _flush(self):
+        self._file.flush()
+
+
+    def close(self):
+        self._file.close()
+
+
+
+class ArrowSink(Sink):
+    """
+    Writes rows to `path` as a Parquet file (`fmt="parquet"`) or an Arrow IPC
+    file (`fmt="arrow"`, which can be memory-mapped to read it back), with a
+    column per entry in `columns` (and `rank` first, if the list is ranked).
+    Rows are lists of values in the same order as `columns`.
+
+    Rows are gathered column by column, and written out as a record batch
+    every `batch_rows` rows (and whatever's left when the sink is closed).
+    """
+    def __init__(
+        self,
+        path: str,
+        columns: list[str],
+        ranked: bool,
+        fmt: str = "parquet",
+        batch_rows: int = ARROW_BATCH_ROWS
+        ):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as imp_err:
+            raise ImportError(
+                "Writing Parquet or Arrow files needs pyarrow "
+                "(`pip install letterboxd_list[arrow]`)."
+            ) from imp_err
+
+        super().__init__(ranked, flush_every=float("inf"))
+        self._pa         = pa
+        self._columns    = (["rank"] if ranked else []) + list(columns)
+        self._schema     = pa.schema([(c, self._arrow_type(c)) for c in self._columns])
+        self._values     = {c: [] for c in self._columns}
+        self._batch_rows = batch_rows
+
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(path, self._schema)
+        elif fmt == "arrow":
+            self._writer = pa.ipc.new_file(path, self._schema)
+        else:
+            raise ValueError(f"ArrowSink can't write {fmt} files.")
+
+
+    def _arrow_type(self, column: str):
+        pa = self._pa
+        if column in INT_COLUMNS:
+            return pa.int64()
+        if column in FLOAT_COLUMNS:
+            return pa.float64()
+        if column in STRING_COLUMNS:
+            return pa.string()
+        if column in MAP_COLUMNS:
+            return pa.map_(pa.string(), pa.string())
+        return pa.list_(pa.string())
+
+
+    def _write_rows(self, start: int, rows: list[list]):
+        columns = self._columns[1:] if self._ranked else self._columns
+        if self._ranked:
+            self._values["rank"].extend(range(start + 1, start + len(rows) + 1))
+
+        for column, values in zip(columns, zip(*rows)):
+            self._values[column].extend(structured_value(column, v) for v in values)
+
+        if len(self._values[self._columns[0]]) >= self._batch_rows:
+            self._flush()
+
+
+    def _flush(self):
+        if not self._values[self._columns[0]]:
+            return
+
+        pa    = self._pa
+        batch = pa.record_batch(
+            [
+                pa.array(
+                    # maps are given as lists of pairs
+                    [list(v.items()) if isinstance(v, dict) else v for v in self._values[c]]
+                    if c in MAP_COLUMNS else self._values[c],
+                    type=self._schema.field(c).type
+                )
+                for c in self._columns
+            ],
+            schema=self._schema
+        )
+        self._writer.write_batch(batch)
+        self._values = {c: [] for c in self._columns}
+
+
+    def close(self):
+        self._flush()
+        self._writer.close()
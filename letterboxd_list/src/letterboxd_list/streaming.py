@@ -0,0 +1,107 @@
+"""
+Stopping the download of a film page once everything that's read from it has
+come in. Film pages run long after the tabbed section (reviews, lists,
+similar films), none of which `LetterboxdFilm` looks at.
+
+A `PageCutoff` is fed a film page as it arrives, and says when the head, the
+title, the year and the whole of the tabbed section have been seen, in that
+order. If a page doesn't look like that (e.g. Letterboxd changed its layout,
+or the film has no year), it never says so, and the whole page is downloaded
+and parsed as usual; a transfer that's cut off by anything else is still an
+error. Which parts of the page these are is the same as in
+`containers.page_regions()`, which the markers here are shared with.
+"""
+import re
+from urllib.parse import urlsplit
+
+# markers for the parts of a film page anything is read from
+HEAD_END_MARKER = "</head>"
+TITLE_MARKER    = "js-widont"
+YEAR_MARKER     = 'href="/films/year/'
+TABS_MARKER     = '<div id="tabbed-content"'
+DIV_TAG         = re.compile(r"<(/?)div\b", re.IGNORECASE)
+
+_HEAD_END = HEAD_END_MARKER.encode()
+_TITLE    = TITLE_MARKER.encode()
+_YEAR     = YEAR_MARKER.encode()
+_TABS     = TABS_MARKER.encode()
+_DIV      = re.compile(DIV_TAG.pattern.encode(), re.IGNORECASE)
+
+_FILM_PATH = re.compile(r"^/film/[^/]+/?$")
+
+
+def is_film_page(url: str) -> bool:
+    """
+    Whether `url` is a film's main page (and not its stats page, or any
+    of its other pages).
+    """
+    return _FILM_PATH.match(urlsplit(url).path) is not None
+
+
+class PageCutoff:
+    """
+    Watches a film page come in, a chunk of bytes at a time (see `feed()`).
+    Only the bytes that could still hold a marker that hasn't been found
+    yet are kept, along with the tabbed section once it starts.
+
+    Once `complete`, `end` is how many bytes into the page the tabbed
+    section's closing tag ends, which is where a page can be cut without
+    splitting a character in two.
+    """
+    __slots__ = ("_seen", "_dropped", "_scan", "_depth", "_markers", "complete", "end")
+
+    def __init__(self):
+        self._seen     = bytearray()
+        self._dropped  = 0                  # how many bytes of the page were let go of from the start of _seen
+        self._scan     = 0                  # where to look for the next <div> in the tabbed section
+        self._depth    = 0
+        self._markers  = [_HEAD_END, _TITLE, _YEAR, _TABS]
+        self.complete  = False
+        self.end       = None
+
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Takes the next `chunk` of the page, and returns whether everything
+        that's read from the page has now come in.
+        """
+        if self.complete:
+            return True
+
+        self._seen += chunk
+
+        # the markers before the tabbed section, in the order they come in
+        while self._markers:
+            found = self._seen.find(self._markers[0])
+            if found < 0:
+                # keep just enough to find a marker split across chunks
+                self._drop(max(0, len(self._seen) - len(self._markers[0]) + 1))
+                return False
+
+            marker = self._markers.pop(0)
+            self._drop(found if marker is _TABS else found + len(marker))
+
+        # then the tabbed section, which runs until its <div> is closed
+        for tag in _DIV.finditer(self._seen, self._scan):
+            if tag.end() == len(self._seen):
+                break                       # it could still be e.g. a <divider>
+
+            depth = self._depth + (-1 if tag.group(1) else 1)
+            close = self._seen.find(b">", tag.end()) if depth == 0 else -1
+            if depth == 0 and close < 0:
+                break
+
+            self._depth = depth
+            self._scan  = tag.end()
+            if depth == 0:
+                self.complete = True
+                self.end      = self._dropped + close + 1
+                self._seen    = bytearray()
+                return True
+
+        return False
+
+
+    def _drop(self, count: int):
+        del self._seen[:count]
+        self._dropped += count
@@ -0,0 +1,115 @@
+"""
+Accounting for the bytes a run downloads. Responses are asked for compressed
+(with whatever encodings libcurl was built with, like gzip, brotli or zstd)
+and decompressed as they come in, so what goes over the wire can be a lot
+less than the pages themselves; on a metered link, that's what counts.
+
+Each `Transport` keeps a `Traffic` tally of both, per kind of page (told
+apart by `cache.resource_kind()`, the same way the cache does). Each pool
+worker hands its tally over with `take()` as it finishes a chunk, and the
+main process adds them up with `merge()`, to report at the end of an export.
+"""
+from letterboxd_list.cache import resource_kind
+
+# the kinds of page counted separately, in the order they're reported
+RESOURCES = ("list", "film", "stats")
+
+_LABELS = {"list": "List pages", "film": "Film pages", "stats": "Stats pages"}
+
+
+def format_bytes(size: float) -> str:
+    """
+    `size` bytes in the biggest unit it's at least one of.
+    """
+    for unit in ("B", "kB", "MB", "GB"):
+        if size < 1000 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1000
+
+
+class Traffic:
+    """
+    How many responses of each kind of page (see `resource_kind()`) came
+    over the network, and how many bytes their bodies were, as sent (`wire`)
+    and once decompressed (`body`). Pages served from a cache aren't counted.
+    """
+    def __init__(self):
+        self._counts = {}               # resource -> [responses, wire, body]
+
+
+    def record(self, url: str, wire: int, body: int):
+        """
+        Counts a response for `url`, whose body was `wire` bytes as sent
+        and `body` bytes decompressed.
+        """
+        self.add(resource_kind(url), 1, wire, body)
+
+
+    def add(self, resource: str, responses: int, wire: int, body: int):
+        """
+        Counts `responses` responses of a kind, with `wire` and `body` bytes between them.
+        """
+        counts     = self._counts.setdefault(resource, [0, 0, 0])
+        counts[0] += responses
+        counts[1] += wire
+        counts[2] += body
+
+
+    def merge(self, counts: dict[str, list[int]]):
+        """
+        Adds in another tally's counts (from `counts()` or `take()`).
+        """
+        for resource, (responses, wire, body) in counts.items():
+            self.add(resource, responses, wire, body)
+
+
+    def counts(self) -> dict[str, list[int]]:
+        """
+        The counts so far, as `{resource: [responses, wire, body]}`.
+        """
+        return self._counts
+
+
+    def take(self) -> dict[str, list[int]]:
+        """
+        The counts so far (as from `counts()`), which are then cleared.
+        """
+        counts       = self._counts
+        self._counts = {}
+        return counts
+
+
+    @property
+    def wire(self) -> int:
+        """
+        The bytes received in all, as sent.
+        """
+        return sum(counts[1] for counts in self._counts.values())
+
+    @property
+    def body(self) -> int:
+        """
+        The bytes received in all, decompressed.
+        """
+        return sum(counts[2] for counts in self._counts.values())
+
+
+    def report(self) -> str:
+        """
+        A summary of the counts, a line per kind of page, with the total first.
+        """
+        lines = [self._line("Downloaded", sum(c[0] for c in self._counts.values()), self.wire, self.body)]
+        for resource in RESOURCES:
+            if resource in self._counts:
+                lines.append(self._line("  " + _LABELS[resource], *self._counts[resource]))
+
+        return "\n".join(lines)
+
+
+    @staticmethod
+    def _line(label: str, responses: int, wire: int, body: int) -> str:
+        saved = f", {1 - wire / body:.0%} saved" if body else ""
+        return (
+            f"{label + ':':<16}{format_bytes(wire):>10} "
+            f"({format_bytes(body)} decompressed{saved}) in {responses} response(s)"
+        )
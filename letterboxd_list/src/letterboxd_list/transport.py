@@ -0,0 +1,620 @@
+"""
+The networking side of the package. 
+
+`Transport` hands out reusable Curl handles that share one DNS cache, TLS
+session cache and connection cache, so requests to Letterboxd reuse open 
+connections instead of each paying for a new TCP and TLS handshake.
+`FetchEngine` keeps many requests in flight at once from a single process, 
+by driving a set of those handles through one `pycurl.CurlMulti` event loop.
+Where the server and libcurl both support it, requests are made over HTTP/2,
+so they can share a connection as concurrent streams. Film pages stop
+downloading once everything that's read from them has come in (see
+`streaming.py`). Responses are asked for compressed, and each `Transport`
+tallies the bytes it downloads, compressed and not (see `traffic.py`).
+
+A `Transport` can also be given a `ResponseCache` (see `cache.py`), in which
+case fresh pages are served from disk without touching the network. Requests
+are paced, and retried when the server pushes back, by its `RateLimiter`
+(see `ratelimit.py`). Given a `ResponseArchive` (see `replay.py`), it records
+every response into it, or answers every request from it. Films made through
+a `Transport` are memoized in its `FilmMemo` (see `memo.py`).
+"""
+import os
+import time
+import heapq
+from io import BytesIO, SEEK_END
+from typing import NamedTuple
+from collections.abc import Iterable, Iterator
+import pycurl
+import letterboxd_list.profiling as profiling
+from letterboxd_list.cache import ResponseCache, CacheEntry
+from letterboxd_list.memo import FilmMemo, DEFAULT_MAX_FILMS, DEFAULT_MAX_AGE
+from letterboxd_list.ratelimit import RateLimiter
+from letterboxd_list.replay import ResponseArchive
+from letterboxd_list.streaming import PageCutoff, is_film_page
+from letterboxd_list.traffic import Traffic
+
+DEFAULT_CONCURRENCY = 64
+HEADERS             = ["User-Agent: Application", "Connection: Keep-Alive"]
+
+# whether the libcurl pycurl was built against can speak HTTP/2 at all
+HTTP2_SUPPORTED     = bool(pycurl.version_info()[4] & pycurl.VERSION_HTTP2)
+
+
+class Response(NamedTuple):
+    """
+    What's left of a transfer once it's done: the URL that was requested,
+    the HTTP status code, the decoded body, and the response headers 
+    (with lowercase names).
+    """
+    url:     str
+    status:  int
+    body:    str
+    headers: dict[str, str]
+
+
+class Transfer:
+    """
+    The state of one request while it's in progress. Made by 
+    `Transport.start()`, and turned into a `Response` by `Transport.finish()`.
+    """
+    __slots__ = ("url", "buffer", "headers", "cached", "cutoff", "cut_short", "version", "_cut_http1")
+
+    def __init__(
+        self,
+        url: str,
+        cached: CacheEntry | None = None,
+        cutoff: PageCutoff | None = None,
+        cut_http1: bool = False
+        ):
+        self.url        = url
+        self.buffer     = BytesIO()
+        self.headers    = {}
+        self.cached     = cached
+        self.cutoff     = cutoff
+        self.cut_short  = False
+        self.version    = None              # e.g. "HTTP/2", once the response starts
+        self._cut_http1 = cut_http1
+
+    def header_line(self, line: bytes):
+        """
+        For `pycurl.HEADERFUNCTION`. Only keeps the headers of the last
+        response, in case of redirects.
+        """
+        line = line.decode("iso-8859-1")
+        if line.startswith("HTTP/"):
+            self.headers = {}
+            self.version = line.split(" ", 1)[0]
+        elif ":" in line:
+            name, value = line.split(":", 1)
+            self.headers[name.strip().lower()] = value.strip()
+
+
+    def write(self, chunk: bytes) -> int | None:
+        """
+        For `pycurl.WRITEFUNCTION`. Once the `cutoff` has seen everything it
+        needs, the rest of the body is skipped, by telling libcurl that
+        nothing was written (which it reports as `E_WRITE_ERROR`, and which
+        `cut_short` tells apart from a real failure). The body is cut back to
+        the end of the tabbed section, since the chunk it came in with could
+        end partway through a character.
+
+        That's only done if there's more to come, and only over HTTP/2 (unless
+        made with `cut_http1`), where just the one stream is reset. Over
+        HTTP/1.1, the connection would have to be closed, and a new handshake
+        costs more than the rest of a page.
+        """
+        self.buffer.write(chunk)
+        if self.cutoff is None or not self.cutoff.feed(chunk):
+            return None
+
+        cutoff      = self.cutoff
+        self.cutoff = None
+        # the length of a compressed body says nothing about how much of it is left
+        length      = self.headers.get("content-length", "")
+        if length.isdigit() and "content-encoding" not in self.headers \
+                and self.buffer.tell() >= int(length):
+            return None
+        if self.version in (None, "HTTP/1.0", "HTTP/1.1") and not self._cut_http1:
+            return None
+
+        self.buffer.truncate(cutoff.end)
+        self.buffer.seek(0, SEEK_END)    # truncating doesn't move back to the new end
+        self.cut_short = True
+        return 0
+
+
+def new_handle(http2: bool = False, compressed: bool = True) -> pycurl.Curl:
+    """
+    A Curl handle configured the way every request in the package expects.
+
+    With `http2`, HTTPS requests offer HTTP/2 (falling back to HTTP/1.1 if 
+    the server doesn't take it up), and wait for a connection they can share
+    rather than opening another one.
+
+    With `compressed`, responses are asked for in any encoding libcurl can
+    decode (e.g. gzip, brotli or zstd, depending on how it was built), and
+    are decompressed as they're received.
+    """
+    curl = pycurl.Curl()
+    curl.setopt(pycurl.HTTPHEADER, HEADERS)
+    if compressed:
+        curl.setopt(pycurl.ACCEPT_ENCODING, "")
+
+    if http2 and HTTP2_SUPPORTED:
+        curl.setopt(pycurl.HTTP_VERSION, pycurl.CURL_HTTP_VERSION_2TLS)
+        curl.setopt(pycurl.PIPEWAIT, 1)
+    else:
+        curl.setopt(pycurl.HTTP_VERSION, pycurl.CURL_HTTP_VERSION_1_1)
+
+    return curl
+
+
+class Transport:
+    """
+    A pool of Curl handles backed by a `pycurl.CurlShare`, which shares the
+    DNS cache, TLS session cache and connection cache between all of them.
+    Handles are checked out with `acquire()` and returned with `release()`,
+    or used implicitly through `get()` and `fetch()`.
+
+    One `Transport` is meant to be used per process (see `default_transport()`);
+    Curl handles and their connections can't be shared across a `fork()`. Nor
+    is it locked for use from several threads at once.
+
+    If a `cache` is given, `get()` and `fetch()` serve fresh pages from it,
+    revalidate stale ones, and store whatever comes back with a `200`.
+
+    Requests are paced by `limiter` (by default, one with no rate limit that
+    retries `429`s and `5xx`s), which everything using the transport shares.
+
+    With an `archive` in `"record"` mode, every response is stored in it; in
+    `"replay"` mode, `get()` and `fetch()` answer every request from it instead
+    of the network (or the cache), raising `NotRecordedError` for any URL that
+    wasn't recorded.
+
+    With `http2` (the default), requests are made over HTTP/2 where possible, 
+    and the ones in flight together through a `CurlMulti` (see `new_multi()`)
+    are multiplexed over as few connections as they can be.
+
+    The values read off up to `memo_size` film pages fetched through the
+    transport are kept in its `memo`, for up to `memo_max_age` seconds, so
+    asking for those films again doesn't make any requests (a `memo_size`
+    of 0 turns this off).
+
+    Film pages stop downloading once the parts of them that are read from
+    have come in (see `Transfer.write()`). By default (`early_abort=None`)
+    that's only done over HTTP/2; `True` does it over HTTP/1.1 as well, and
+    `False` always downloads whole pages. What's stored in the `cache` or
+    `archive` is then whatever part of the page was downloaded.
+
+    With `compressed` (the default), responses are asked for compressed.
+    The bytes downloaded, as sent and decompressed, are tallied in `traffic`.
+    """
+    def __init__(
+        self,
+        cache: ResponseCache | None = None,
+        limiter: RateLimiter | None = None,
+        archive: ResponseArchive | None = None,
+        http2: bool = True,
+        memo_size: int = DEFAULT_MAX_FILMS,
+        memo_max_age: float | None = DEFAULT_MAX_AGE,
+        early_abort: bool | None = None,
+        compressed: bool = True
+        ):
+        self._cache       = cache
+        self._limiter     = limiter or RateLimiter()
+        self._archive     = archive
+        self._http2       = http2
+        self._memo        = FilmMemo(memo_size, memo_max_age)
+        self._early_abort = early_abort
+        self._compressed  = compressed
+        self._traffic     = Traffic()
+        self._share = pycurl.CurlShare()
+        self._share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_DNS)
+        self._share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_SSL_SESSION)
+        self._share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_CONNECT)
+
+        self._idle        = []
+        self._connections = 0
+
+
+    @property
+    def cache(self) -> ResponseCache | None:
+        """
+        The on-disk cache in use, if any.
+        """
+        return self._cache
+
+    @property
+    def archive(self) -> ResponseArchive | None:
+        """
+        The archive responses are recorded into or replayed from, if any.
+        """
+        return self._archive
+
+    @property
+    def limiter(self) -> RateLimiter:
+        """
+        What paces and retries the requests made through this transport.
+        """
+        return self._limiter
+
+    @property
+    def memo(self) -> FilmMemo:
+        """
+        The films fetched through this transport lately, for reuse.
+        """
+        return self._memo
+
+    @property
+    def http2(self) -> bool:
+        """
+        Whether requests are made over HTTP/2 where the server allows it.
+        """
+        return self._http2 and HTTP2_SUPPORTED
+
+    @property
+    def compressed(self) -> bool:
+        """
+        Whether responses are asked for compressed.
+        """
+        return self._compressed
+
+    @property
+    def traffic(self) -> Traffic:
+        """
+        The bytes downloaded through this transport so far, by kind of page.
+        """
+        return self._traffic
+
+    @property
+    def connections(self) -> int:
+        """
+        How many new connections (and so TCP/TLS handshakes) the handles
+        from this transport have had to open so far.
+        """
+        return self._connections
+
+
+    def acquire(self) -> pycurl.Curl:
+        """
+        Check out a handle from the pool, making a new one if none are idle.
+        """
+        if self._idle:
+            return self._idle.pop()
+
+        handle = new_handle(self._http2, self._compressed)
+        handle.setopt(pycurl.SHARE, self._share)
+        return handle
+
+
+    def new_multi(self) -> pycurl.CurlMulti:
+        """
+        A `CurlMulti` to drive this transport's handles through, which
+        multiplexes their requests over shared HTTP/2 connections if it can.
+        """
+        multi = pycurl.CurlMulti()
+        if self.http2:
+            multi.setopt(pycurl.M_PIPELINING, pycurl.PIPE_MULTIPLEX)
+        return multi
+
+
+    def release(self, handle: pycurl.Curl):
+        """
+        Return a handle to the pool once its transfer is done.
+        """
+        self._connections += handle.getinfo(pycurl.NUM_CONNECTS)
+        self._idle.append(handle)
+
+
+    def lookup(self, url: str) -> Response | None:
+        """
+        A response for `url` straight from the cache, if there is a fresh one,
+        or from the archive, if it's being replayed.
+        """
+        if self._archive is not None and self._archive.replaying:
+            return Response(*self._archive.lookup(url))
+
+        if self._cache is None:
+            return None
+
+        entry = self._cache.lookup(url)
+        if entry is None or not self._cache.is_fresh(url, entry):
+            return None
+
+        # pages from the cache are part of the run too
+        resp = Response(url, 200, entry.body, {})
+        if self._archive is not None and self._archive.recording:
+            self._archive.store(*resp)
+
+        return resp
+
+
+    def start(self, url: str) -> tuple[pycurl.Curl, Transfer]:
+        """
+        Check out a handle and set it up to fetch `url` (it still has to be
+        performed, either directly or through a `CurlMulti`). If there's a
+        stale cached copy of the page, the request is made conditional.
+        A transfer that's cut short on purpose (see `Transfer.write()`) fails
+        with `E_WRITE_ERROR`, but should be finished like any other.
+        """
+        cached  = self._cache.lookup(url) if self._cache else None
+        headers = list(HEADERS)
+        if cached and cached.etag:
+            headers.append(f"If-None-Match: {cached.etag}")
+        if cached and cached.last_modified:
+            headers.append(f"If-Modified-Since: {cached.last_modified}")
+
+        cutoff   = PageCutoff() if self._early_abort is not False and is_film_page(url) else None
+        transfer = Transfer(url, cached, cutoff, cut_http1=self._early_abort is True)
+        handle   = self.acquire()
+        handle.setopt(pycurl.URL, url)
+        handle.setopt(pycurl.HTTPHEADER, headers)
+        handle.setopt(pycurl.WRITEFUNCTION, transfer.write)
+        handle.setopt(pycurl.HEADERFUNCTION, transfer.header_line)
+
+        return handle, transfer
+
+
+    def finish(self, handle: pycurl.Curl, transfer: Transfer) -> Response:
+        """
+        Turn a performed transfer into a `Response`, and return its handle 
+        to the pool. A `304 Not Modified` is answered with the cached page.
+        """
+        status = handle.getinfo(pycurl.RESPONSE_CODE)
+        profiling.record_request(transfer.url, handle)
+        self._traffic.record(
+            transfer.url,
+            handle.getinfo(pycurl.SIZE_DOWNLOAD_T),
+            transfer.buffer.tell()
+        )
+        self.release(handle)
+
+        if status == 304 and transfer.cached:
+            self._cache.refresh(transfer.url)
+            resp = Response(transfer.url, 200, transfer.cached.body, transfer.headers)
+        else:
+            body = transfer.buffer.getvalue().decode()
+            if status == 200 and self._cache:
+                self._cache.store(
+                    transfer.url,
+                    body,
+                    transfer.headers.get("etag"),
+                    transfer.headers.get("last-modified")
+                )
+            resp = Response(transfer.url, status, body, transfer.headers)
+
+        if self._archive is not None and self._archive.recording:
+            self._archive.store(*resp)
+
+        return resp
+
+
+    def get(self, url: str) -> Response:
+        """
+        Fetch a single URL, blocking until it's done (including any retries).
+        """
+        cached = self.lookup(url)
+        if cached:
+            return cached
+
+        attempt = 0
+        while True:
+            self._limiter.acquire()
+            handle, transfer = self.start(url)
+            try:
+                handle.perform()
+            except pycurl.error:
+                if not transfer.cut_short:
+                    self.release(handle)
+                    raise
+
+            resp  = self.finish(handle, transfer)
+            delay = self._limiter.record(resp.status, resp.headers, attempt)
+            if delay is None:
+                return resp
+
+            time.sleep(delay)
+            attempt += 1
+
+
+    def fetch(
+        self,
+        urls: Iterable[str],
+        max_concurrent: int = DEFAULT_CONCURRENCY
+        ) -> Iterator[tuple[int, Response]]:
+        """
+        Shorthand for `FetchEngine(max_concurrent, self).fetch(urls)`.
+        """
+        return FetchEngine(max_concurrent, self).fetch(urls)
+
+
+_default_transport = None
+_default_pid       = None
+_default_options   = {}
+
+def configure_default_transport(**options):
+    """
+    Set the arguments the default `Transport` is made with (e.g. a `cache`),
+    replacing the current default one. Pool workers should call this in
+    their initializer, since configuration isn't carried across processes
+    started with "spawn".
+    """
+    global _default_transport, _default_options
+
+    _default_options   = options
+    _default_transport = None
+
+
+def default_transport() -> Transport:
+    """
+    The `Transport` shared by everything in the current process that wasn't
+    given one explicitly. A new one is made after a `fork()` (e.g. in a pool
+    worker), so each worker process reuses its own connections.
+    """
+    global _default_transport, _default_pid
+
+    if _default_transport is None or _default_pid != os.getpid():
+        _default_transport = Transport(**_default_options)
+        _default_pid       = os.getpid()
+
+    return _default_transport
+
+
+class FetchEngine:
+    """
+    Fetches a batch of URLs concurrently, with at most `max_concurrent`
+    requests in flight at a time. Handles are reused as transfers finish,
+    so a batch of 5,000 URLs only ever needs `max_concurrent` of them.
+
+    Handles come from `transport` (the process' default one if not given),
+    so connections opened for one batch are reused by the next.
+
+    A usage example:
+
+    .. code-block:: python
+
+        >>> engine = FetchEngine(max_concurrent=100)
+        >>> for i, resp in engine.fetch(film_urls):
+        ...     print(i, resp.status)
+
+    """
+    def __init__(
+        self,
+        max_concurrent: int = DEFAULT_CONCURRENCY,
+        transport: Transport | None = None
+        ):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1.")
+
+        self._max_concurrent = max_concurrent
+        self._transport      = transport or default_transport()
+
+
+    @property
+    def max_concurrent(self) -> int:
+        """
+        The most requests this engine will have in flight at once.
+        """
+        return self._max_concurrent
+
+
+    def fetch(self, urls: Iterable[str]) -> Iterator[tuple[int, Response]]:
+        """
+        Yields `(i, response)` pairs in the order the transfers *finish*,
+        where `i` is the position of the URL in `urls` (like `enumerate`).
+        Network-level failures raise `pycurl.error`, same as `perform_rs()`;
+        HTTP error codes are left to the caller. Pages that are fresh in the
+        transport's cache are yielded without taking up a request slot.
+
+        Requests are started as the transport's `RateLimiter` allows, and
+        responses it says to retry are requested again after their backoff
+        (in the meantime, other requests carry on); only the response of the
+        last try is yielded.
+        """
+        limiter   = self._transport.limiter
+        pending   = enumerate(urls)
+        multi     = self._transport.new_multi()
+        active    = {}                      # handle -> (position, attempt, transfer)
+        retries   = []                      # heap of (when, position, url, attempt)
+        next_up   = None                    # (position, url, attempt), waiting on the limiter
+        exhausted = False
+
+        try:
+            while True:
+                # top up the in-flight requests
+                wait = 1.0
+                while len(active) < limiter.concurrency(self._max_concurrent):
+                    if next_up is None:
+                        if retries and retries[0][0] <= time.monotonic():
+                            _, i, url, attempt = heapq.heappop(retries)
+                            next_up = (i, url, attempt)
+                        elif not exhausted:
+                            try:
+                                i, url = next(pending)
+                            except StopIteration:
+                                exhausted = True
+                                continue
+
+                            cached = self._transport.lookup(url)
+                            if cached:
+                                yield i, cached
+                                continue
+                            next_up = (i, url, 0)
+                        else:
+                            if retries:
+                                wait = retries[0][0] - time.monotonic()
+                            break
+
+                    wait = limiter.try_acquire()
+                    if wait > 0:
+                        break
+
+                    i, url, attempt  = next_up
+                    next_up          = None
+                    handle, transfer = self._transport.start(url)
+                    active[handle]   = (i, attempt, transfer)
+                    multi.add_handle(handle)
+
+                if not active:
+                    if next_up is None and not retries:
+                        return
+
+                    # nothing to do until the limiter or a backoff lets up
+                    time.sleep(max(0.0, wait))
+                    continue
+
+                while True:
+                    ret, _ = multi.perform()
+                    if ret != pycurl.E_CALL_MULTI_PERFORM:
+                        break
+
+                finished = []
+                while True:
+                    queued, ok_list, err_list = multi.info_read()
+
+                    for handle, errno, errmsg in err_list:
+                        if not active[handle][2].cut_short:
+                            raise pycurl.error(errno, f"{errmsg} ({active[handle][2].url})")
+                        finished.append(handle)
+
+                    finished.extend(ok_list)
+                    if queued == 0:
+                        break
+
+                if not finished:
+                    multi.select(min(1.0, max(0.0, wait)) if next_up or retries else 1.0)
+                    continue
+
+                for handle in finished:
+                    i, attempt, transfer = active.pop(handle)
+                    multi.remove_handle(handle)
+
+                    resp  = self._transport.finish(handle, transfer)
+                    delay = limiter.record(resp.status, resp.headers, attempt, len(active) + 1)
+                    if delay is not None:
+                        heapq.heappush(retries, (time.monotonic() + delay, i, transfer.url, attempt + 1))
+                        continue
+
+                    yield i, resp
+
+        finally:
+            # handles from unfinished transfers can't be reused,
+            # since they could still be mid-transfer
+            for handle in active:
+                multi.remove_handle(handle)
+                handle.close()
+            multi.close()
+
+
+    def fetch_ordered(self, urls: Iterable[str]) -> list[Response]:
+        """
+        Fetches all of `urls` concurrently, but returns the responses
+        in the same order as the URLs were given.
+        """
+        urls      = list(urls)
+        responses = [None] * len(urls)
+        for i, resp in self.fetch(urls):
+            responses[i] = resp
+
+        return responses
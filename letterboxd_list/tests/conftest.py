@@ -0,0 +1,14 @@
+"""
+Fixtures shared by the tests: a local stand-in for Letterboxd (see
+`stub_letterboxd.py`), so the networking code can be tested without hitting
+the real site.
+"""
+import pytest
+from tests.stub_letterboxd import StubLetterboxd
+
+
+@pytest.fixture
+def stub_site():
+    site = StubLetterboxd()
+    yield site
+    site.close()
@@ -0,0 +1,301 @@
+"""
+A stand-in for letterboxd.com that runs locally, so the networking code can
+be tested (and benchmarked) without hitting the real site. It serves list
+pages, film pages and stats pages that follow the same structure as the ones
+on Letterboxd. The tests get one from the `stub_site` fixture in
+`conftest.py`, and `benchmarks/bench.py` starts its own.
+"""
+import gzip
+import time
+import zlib
+import random
+import threading
+from functools import lru_cache
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from letterboxd_list.cache import resource_kind
+from letterboxd_list.replay import ResponseArchive
+
+FILMS_PER_PAGE = 100
+
+# enough made-up reviews for a film page to be about as long as a real one
+# (well over 100 kB, most of it after the tabbed section)
+DEFAULT_REVIEWS = 160
+
+
+def make_film(n: int) -> dict:
+    """
+    Deterministic made-up film data, so tests can check what was extracted.
+    """
+    return {
+        "slug":     f"film-{n}",
+        "title":    f"Film Number {n}",
+        "year":     str(1950 + n % 70),
+        "rating":   f"{1 + (n % 40) / 10:.2f}",
+        "director": [f"Director {n}"],
+        "writer":   [f"Writer {n}", f"Co-Writer {n}"],
+        "genre":    ["Drama", "Comedy"] if n % 2 else ["Horror"],
+        "cast":     {f"Actor {n}-{k}": f"Role {k}" for k in range(3)},
+        "watches":  1000 + n,
+        "likes":    100 + n,
+    }
+
+
+@lru_cache(maxsize=8)
+def review_section(reviews: int) -> str:
+    """
+    `reviews` made-up reviews, marked up like the ones at the end of a film
+    page. The words are picked at random (but the same every time), so the
+    section compresses about as well as prose does, not like a repeated line.
+    """
+    rng   = random.Random(reviews)
+    words = ["".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(2, 9))) for _ in range(2000)]
+    items = "".join(
+        '<li class="film-detail"><div class="film-detail-content">'
+        f'<p class="attribution">Review by <a href="/member-{k}/" class="context">'
+        f'<strong class="name">Member {k}</strong></a></p>'
+        '<div class="body-text -prose collapsible-text"><p>A review. '
+        + " ".join(rng.choices(words, k=rng.randint(20, 100)))
+        + "</p></div></div></li>"
+        for k in range(reviews)
+    )
+    return f'<section class="film-recent-reviews"><ul>{items}</ul></section>'
+
+
+def film_page(film: dict, reviews: int = DEFAULT_REVIEWS) -> str:
+    cast  = "".join(
+        f'<a href="/actor/{name.lower().replace(" ", "-")}/" title="{role}">{name}</a>'
+        for name, role in film["cast"].items()
+    )
+    crew  = "".join(
+        f'<a href="/{attr}/{name.lower().replace(" ", "-")}/">{name}</a>'
+        for attr in ("director", "writer") for name in film[attr]
+    )
+    genre = "".join(
+        f'<a href="/films/genre/{g.lower()}/">{g}</a>' for g in film["genre"]
+    )
+    directed_by = film["director"][0]
+    return (
+        "<!DOCTYPE html><html><head>"
+        f'<meta name="twitter:data2" content="{film["rating"]} out of 5">'
+        "</head><body>"
+        '<section class="film-header">'
+        f'<h1><span class="name js-widont">{film["title"]}</span></h1>'
+        f'<div class="releasedate"><a href="/films/year/{film["year"]}/">{film["year"]}</a></div>'
+        f'<p>Directed by <a href="/director/{directed_by.lower().replace(" ", "-")}/">{directed_by}</a></p>'
+        "</section>"
+        '<div id="tabbed-content">'
+        f'<div id="tab-cast">{cast}</div>'
+        f'<div id="tab-crew">{crew}</div>'
+        f'<div id="tab-genres">{genre}</div>'
+        "</div>"
+        + review_section(reviews)
+        + "</body></html>"
+    )
+
+
+def stats_page(film: dict) -> str:
+    return (
+        "<html><body>"
+        f'<div class="production-statistic -watches" aria-label="Watched by {film["watches"]:,} members"></div>'
+        f'<div class="production-statistic -likes"><a title="Liked by {film["likes"]:,} members"></a></div>'
+        "</body></html>"
+    )
+
+
+def list_page(name: str, films: list, page: int, ranked: bool) -> str:
+    num_pages = max(1, -(-len(films) // FILMS_PER_PAGE))
+    on_page   = films[(page-1)*FILMS_PER_PAGE : page*FILMS_PER_PAGE]
+    entries   = "".join(
+        "<li>"
+        + (f'<p class="list-number">{(page-1)*FILMS_PER_PAGE + i + 1}</p>' if ranked else "")
+        + f'<div data-target-link="/film/{f["slug"]}/"></div></li>'
+        for i, f in enumerate(on_page)
+    )
+    pages     = "".join(
+        f'<li class="paginate-page"><a href="page/{p}/">{p}</a></li>'
+        for p in range(1, num_pages+1)
+    ) if num_pages > 1 else ""
+
+    return (
+        "<html><head>"
+        f'<meta name="description" content="A list of {len(films):,} films compiled on Letterboxd, including ...">'
+        "</head><body>"
+        f'<h1 class="title-1">{name}</h1>'
+        f"<ul>{entries}</ul><ul>{pages}</ul>"
+        "</body></html>"
+    )
+
+
+class _Server(ThreadingHTTPServer):
+    # the default backlog of 5 overflows when dozens of connections open at
+    # once, and the connections that spill over can stall for good
+    request_queue_size = 256
+
+
+class StubLetterboxd:
+    """
+    Routes:
+        `/film/<slug>/`                  film pages
+        `/csi/film/<slug>/stats/`        stats pages
+        `/<user>/list/<name>/`           list pages (`page/<n>/` for the rest)
+        `/status/<code>/`                responds with that status code
+
+    Lists are registered with `add_list()`. Every request path is counted
+    in `hits`, and `latency` (in seconds) is added to every response.
+    Film pages end in `reviews` made-up reviews (see `review_section()`).
+    Instead of the made-up film and stats pages, ones recorded from the real
+    site can be served with `serve_recorded()`.
+    With `compression` set to `"gzip"`, responses are gzipped for requests
+    that accept it.
+    Responses carry an `ETag`, and a matching `If-None-Match` gets a `304`
+    (counted in `not_modified`). Requests can be turned away with `throttle()`.
+    """
+    def __init__(self):
+        self.films   = {}
+        self.lists   = {}
+        self.hits    = Counter()
+        self.not_modified = Counter()
+        self.latency = 0.0
+        self.reviews = DEFAULT_REVIEWS
+        self.recorded = None
+        self.compression = None
+        self.refusals = {}
+        self._server = _Server(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def film_url(self, n: int) -> str:
+        return f"{self.url}/film/film-{n}/"
+
+    def add_list(self, path: str, film_nums: list[int], ranked=False) -> str:
+        films = [self.films.setdefault(f"film-{n}", make_film(n)) for n in film_nums]
+        self.lists[path] = (films, ranked)
+        return self.url + path
+
+    def throttle(self, path: str, times: int, status: int = 429, retry_after: str | None = None):
+        """
+        Answer the next `times` requests for `path` with `status` (and a
+        `Retry-After` header, if given) instead of the page.
+        """
+        self.refusals[path] = [times, status, retry_after]
+
+    def serve_recorded(self, archive: ResponseArchive):
+        """
+        Answers requests for films' pages with pages recorded in `archive`
+        (e.g. with `lblist --record`) instead, so what's downloaded and parsed
+        is the real thing: film `n`'s pages are those of the `n`th recorded
+        film (going around again if there are fewer), and its stats page is
+        that film's, if it was recorded too.
+        """
+        pages = {"film": {}, "stats": {}}
+        for url in archive.urls():
+            kind     = resource_kind(url)
+            response = archive.lookup(url)
+            if kind in pages and response.status == 200:
+                slug = url.rstrip("/").removesuffix("/stats").rsplit("/", 1)[-1]
+                pages[kind][slug] = response.body
+
+        films = sorted(pages["film"])
+        if not films:
+            raise ValueError(f"No film pages were recorded in {archive.path}.")
+
+        self.recorded = [(pages["film"][slug], pages["stats"].get(slug)) for slug in films]
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def render(self, path: str) -> tuple[int, str]:
+        parts = [p for p in path.split("/") if p]
+
+        if len(parts) == 2 and parts[0] == "status":
+            return int(parts[1]), ""
+
+        if len(parts) == 2 and parts[0] == "film" and self._film(parts[1]):
+            if self.recorded:
+                return 200, self._recorded(parts[1])[0]
+            return 200, film_page(self._film(parts[1]), self.reviews)
+
+        if len(parts) == 4 and parts[:2] == ["csi", "film"] and parts[3] == "stats" \
+                and self._film(parts[2]):
+            if self.recorded and self._recorded(parts[2])[1] is not None:
+                return 200, self._recorded(parts[2])[1]
+            return 200, stats_page(self._film(parts[2]))
+
+        page = 1
+        if len(parts) >= 2 and parts[-2] == "page":
+            page  = int(parts[-1])
+            parts = parts[:-2]
+
+        list_path = "/" + "/".join(parts) + "/"
+        if list_path in self.lists:
+            films, ranked = self.lists[list_path]
+            return 200, list_page(parts[-1], films, page, ranked)
+
+        return 404, "<html><body>Not found</body></html>"
+
+    def _film(self, slug: str) -> dict | None:
+        num = slug.removeprefix("film-")
+        if not num.isdigit():
+            return None
+        return self.films.setdefault(slug, make_film(int(num)))
+
+    def _recorded(self, slug: str) -> tuple[str, str | None]:
+        return self.recorded[int(slug.removeprefix("film-")) % len(self.recorded)]
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                site.hits[self.path] += 1
+                if site.latency:
+                    time.sleep(site.latency)
+
+                refusal = site.refusals.get(self.path)
+                if refusal and refusal[0] > 0:
+                    refusal[0] -= 1
+                    self.send_response(refusal[1])
+                    if refusal[2] is not None:
+                        self.send_header("Retry-After", refusal[2])
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                status, body = site.render(self.path)
+                payload      = body.encode()
+                etag         = f'"{zlib.crc32(payload):08x}"'
+
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    site.not_modified[self.path] += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(status)
+                if site.compression and site.compression in self.headers.get("Accept-Encoding", ""):
+                    payload = gzip.compress(payload)
+                    self.send_header("Content-Encoding", site.compression)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                try:
+                    self.wfile.write(payload)
+                except ConnectionError:
+                    pass                    # the client stopped reading early
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,147 @@
+"""
+Test the `asyncio` API against the local stand-in for Letterboxd
+(see `stub_letterboxd.py`).
+"""
+import time
+import asyncio
+import contextlib
+import pytest
+import pycurl
+import src.letterboxd_list.aio as lba
+import src.letterboxd_list.transport as lbt
+
+
+def test_fetch_overlaps(stub_site):
+    """
+    20 requests that take 0.2s each should take about 0.2s in all,
+    with the event loop free the whole time.
+    """
+    stub_site.latency = 0.2
+    urls = [stub_site.film_url(n) for n in range(20)]
+
+    async def fetch_and_tick():
+        ticks = 0
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        tick_task = asyncio.create_task(ticker())
+        async with lba.AsyncTransport() as transport:
+            responses = await transport.fetch_ordered(urls, max_concurrent=20)
+        tick_task.cancel()
+        return responses, ticks
+
+    start = time.perf_counter()
+    responses, ticks = asyncio.run(fetch_and_tick())
+
+    assert time.perf_counter() - start < 2
+    assert [r.url for r in responses] == urls
+    assert all(r.status == 200 for r in responses)
+    assert ticks > 5
+
+
+def test_network_error():
+    async def fetch_nothing():
+        async with lba.AsyncTransport() as transport:
+            await transport.get("http://127.0.0.1:9/film/nothing-here/")
+
+    with pytest.raises(pycurl.error):
+        asyncio.run(fetch_nothing())
+
+
+def test_film(stub_site):
+    async def load():
+        async with lba.AsyncTransport() as transport:
+            film = await lba.AsyncLetterboxdFilm.load(stub_site.film_url(7), transport)
+            return film, await film.get_likes(), await film.get_attrs_csv(["director", "watches"])
+
+    film, likes, csv = asyncio.run(load())
+
+    assert film.title == "Film Number 7"
+    assert likes == 107
+    assert csv == "\"Director 7\",1007"
+    assert stub_site.hits["/csi/film/film-7/stats/"] == 1
+
+    with pytest.raises(TypeError):
+        lba.AsyncLetterboxdFilm(stub_site.film_url(7))
+
+
+def test_early_abort(stub_site):
+
+    async def load():
+        async with lba.AsyncTransport(lbt.Transport(early_abort=True)) as transport:
+            page = await transport.get(stub_site.film_url(3))
+            film = await lba.AsyncLetterboxdFilm.load(stub_site.film_url(4), transport)
+            return page, film
+
+    page, film = asyncio.run(load())
+
+    assert page.status == 200 and len(page.body) < 100_000
+    assert film.title == "Film Number 4"
+
+
+def test_implicit_transports_closed(stub_site):
+    """
+    Transports made for calls that weren't given one should be closed once
+    they're done with, and reopened if used again.
+    """
+    list_url = stub_site.add_list("/someone/list/async-closed/", list(range(5)))
+
+    async def load():
+        film = await lba.AsyncLetterboxdFilm.load(stub_site.film_url(1))
+        assert film._transport._multi is None
+        assert await film.get_likes() == 101
+        assert film._transport._multi is None
+
+        lb_list = await lba.AsyncLetterboxdList.load(list_url)
+        assert lb_list._transport._multi is None
+        titles = [film.title async for film in lb_list]
+        assert lb_list._transport._multi is None
+
+        # left early, which is only cleaned up once the generator is closed
+        async with contextlib.aclosing(lba.fetch_films([stub_site.film_url(n) for n in range(5)], 2)) as films:
+            async for _, film in films:
+                break
+        assert film._transport._multi is None
+        return titles
+
+    assert asyncio.run(load()) == [f"Film Number {n}" for n in range(5)]
+
+
+def test_implicit_transport_closed_on_error(stub_site, monkeypatch):
+    """
+    If a film's stats page can't be fetched, its transport should still be
+    closed, which can only be done once the film page is done with too.
+    """
+    stub_site.latency = 0.3
+    monkeypatch.setattr(lba, "stats_url", lambda url: "http://127.0.0.1:9/csi/film/nothing-here/stats/")
+
+    made     = []
+    original = lba.AsyncTransport._for_caller.__func__
+    monkeypatch.setattr(lba.AsyncTransport, "_for_caller",
+                        classmethod(lambda cls, transport: made.append(original(cls, transport)) or made[-1]))
+
+    with pytest.raises(pycurl.error):
+        asyncio.run(lba.AsyncLetterboxdFilm.load(stub_site.film_url(2), with_stats=True))
+
+    assert made[0]._multi is None and not made[0]._active
+
+
+def test_list(stub_site):
+    list_url = stub_site.add_list("/someone/list/async-one/", list(range(250)))
+
+    async def load():
+        async with lba.AsyncTransport() as transport:
+            lb_list = await lba.AsyncLetterboxdList.load(list_url, max_concurrent=16, transport=transport)
+            films   = [film async for film in lb_list]
+            return lb_list, films
+
+    lb_list, films = asyncio.run(load())
+
+    assert lb_list.num_pages == 3
+    assert lb_list.length == 250
+    assert [f.title for f in films] == [f"Film Number {n}" for n in range(250)]
+    assert all(lb_list.is_initialized(n) for n in range(250))
+    assert stub_site.hits["/film/film-100/"] == 1
@@ -0,0 +1,72 @@
+"""
+Test exporting many lists at once (`lblist --batch`), against the local
+stand-in for Letterboxd (see `stub_letterboxd.py`).
+"""
+import os
+import pytest
+import src.letterboxd_list.__main__ as lbmain
+
+
+def test_list_urls_from_args(tmp_path):
+    url_file = tmp_path / "lists.txt"
+    url_file.write_text(
+        "https://letterboxd.com/a/list/one/\n\n# not this one\nhttps://letterboxd.com/b/list/two/\n",
+        encoding="utf-8"
+    )
+
+    urls = lbmain.list_urls_from_args(["https://letterboxd.com/c/list/three/", str(url_file)])
+    assert urls == [
+        "https://letterboxd.com/c/list/three/",
+        "https://letterboxd.com/a/list/one/",
+        "https://letterboxd.com/b/list/two/",
+    ]
+    assert lbmain.list_csv_name("https://letterboxd.com/a/list/one/") == "one.csv"
+
+
+def test_batch_matches_single_lists(stub_site, tmp_path):
+    """
+    Each list's CSV should come out the same as exporting it on its own,
+    but the films the lists share should only be fetched once.
+    """
+    first  = stub_site.add_list("/someone/list/first/", list(range(0, 40)), ranked=True)
+    second = stub_site.add_list("/someone/list/second/", list(range(60, 20, -1)))
+    attrs  = ["director", "likes"]
+
+    stub_site.hits.clear()
+    lbmain.get_lists_with_attrs([first, second], list(attrs), str(tmp_path / "batch"))
+    assert stub_site.hits["/film/film-30/"] == 1
+    assert stub_site.hits["/film/film-50/"] == 1
+
+    for name, url in (("first", first), ("second", second)):
+        single = str(tmp_path / f"{name}-single.csv")
+        lbmain.get_list_with_attrs(url, list(attrs), single)
+
+        with open(single, encoding="utf-8") as f1, open(tmp_path / "batch" / f"{name}.csv", encoding="utf-8") as f2:
+            assert f1.read() == f2.read()
+
+
+def test_batch_combined(stub_site, tmp_path):
+    first    = stub_site.add_list("/someone/list/first/", [0, 1, 2])
+    second   = stub_site.add_list("/other/list/second/", [2, 3])
+    combined = str(tmp_path / "combined.csv")
+
+    lbmain.get_lists_with_attrs([first, second], ["genre"], combined, combined=True)
+
+    with open(combined, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+
+    assert lines[0] == "Title,Year,Genre,Lists"
+    assert len(lines) == 5
+    assert lines[1].startswith("\"Film Number 0\"")
+    assert lines[1].endswith(f",\"{first}\"")
+    assert lines[3].endswith(f",\"{first}; {second}\"")
+    assert lines[4].endswith(f",\"{second}\"")
+
+
+def test_batch_name_clash(stub_site, tmp_path):
+    first  = stub_site.add_list("/someone/list/same/", [0, 1])
+    second = stub_site.add_list("/other/list/same/", [2, 3])
+
+    with pytest.raises(lbmain.lbc.RequestError):
+        lbmain.get_lists_with_attrs([first, second], [], str(tmp_path))
+    assert not os.path.exists(tmp_path / "same.csv")
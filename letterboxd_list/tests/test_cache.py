@@ -0,0 +1,67 @@
+"""
+Test the on-disk response cache, against the local stand-in for 
+Letterboxd (see `stub_letterboxd.py`).
+"""
+import src.letterboxd_list.cache as lbcache
+import src.letterboxd_list.transport as lbt
+import src.letterboxd_list.containers as lbc
+
+
+def test_resource_kind():
+    assert lbcache.resource_kind("https://letterboxd.com/csi/film/stalker/stats/") == "stats"
+    assert lbcache.resource_kind("https://letterboxd.com/film/stalker/") == "film"
+    assert lbcache.resource_kind("https://letterboxd.com/someone/list/a-list/page/2/") == "list"
+
+
+def test_store_and_lookup(tmp_path):
+    cache = lbcache.ResponseCache(str(tmp_path), {"film": 60})
+    url   = "https://letterboxd.com/film/stalker/"
+
+    assert cache.lookup(url) is None
+
+    cache.store(url, "<html>Сталкер</html>", etag='"abc"')
+    entry = cache.lookup(url)
+    assert entry.body == "<html>Сталкер</html>"
+    assert entry.etag == '"abc"'
+    assert cache.is_fresh(url, entry)
+
+    # bodies are compressed on disk
+    raw = cache._db().execute("SELECT body FROM responses").fetchone()[0]
+    assert raw != entry.body.encode()
+
+
+def test_fresh_entries_skip_network(stub_site, tmp_path):
+    cache = lbcache.ResponseCache(str(tmp_path))
+    urls  = [stub_site.film_url(n) for n in range(5)]
+
+    films = [lbc.LetterboxdFilm(u, lbt.Transport(cache)) for u in urls]
+    again = dict(lbc.fetch_films(urls, transport=lbt.Transport(cache)))
+
+    for n, url in enumerate(urls):
+        assert stub_site.hits[url.removeprefix(stub_site.url)] == 1
+        assert again[n].title == films[n].title
+
+
+def test_stale_entries_revalidated(stub_site, tmp_path):
+    """
+    With a max age of 0, every lookup is stale, so the second round of
+    requests should be conditional, and answered with `304`s.
+    """
+    cache = lbcache.ResponseCache(str(tmp_path), {"film": 0, "stats": 0})
+    film  = lbc.LetterboxdFilm(stub_site.film_url(1), lbt.Transport(cache))
+    film.get_likes()
+
+    again = lbc.LetterboxdFilm(stub_site.film_url(1), lbt.Transport(cache))
+    assert again.title == film.title
+    assert again.get_likes() == film.get_likes()
+    assert stub_site.not_modified["/film/film-1/"] == 1
+    assert stub_site.not_modified["/csi/film/film-1/stats/"] == 1
+
+
+def test_errors_not_cached(stub_site, tmp_path):
+    cache = lbcache.ResponseCache(str(tmp_path))
+    pool  = lbt.Transport(cache)
+    url   = stub_site.url + "/status/500/"
+
+    assert pool.get(url).status == 500
+    assert cache.lookup(url) is None
@@ -0,0 +1,121 @@
+"""
+Test checkpointing and resuming `lblist` exports, against the local
+stand-in for Letterboxd (see `stub_letterboxd.py`).
+"""
+import os
+import pytest
+import src.letterboxd_list.__main__ as lbmain
+from src.letterboxd_list.checkpoint import Checkpoint, JOURNAL_SUFFIX, MANIFEST_SUFFIX
+
+URLS = [f"https://letterboxd.com/film/film-{n}/" for n in range(6)]
+
+
+def test_journal_round_trip(tmp_path):
+    output = str(tmp_path / "out.csv")
+    journal = Checkpoint(output, "https://letterboxd.com/u/list/l/", "Title,Year")
+    journal.start(resume=False)
+    journal.record(0, URLS[0:2], ["\"A\",1\n", "\"B\",2\n"])
+    journal.record(4, URLS[4:6], ["\"E\",5\n", "\"F\",6\n"])
+    journal.close()
+
+    # simulate a crash partway through writing a line
+    with open(output + JOURNAL_SUFFIX, "a", encoding="utf-8") as f:
+        f.write('{"start": 2, "urls": ["https://letterb')
+
+    again = Checkpoint(output, "https://letterboxd.com/u/list/l/", "Title,Year")
+    assert again.load(URLS) == {0: ["\"A\",1\n", "\"B\",2\n"], 4: ["\"E\",5\n", "\"F\",6\n"]}
+
+    # resuming appends on a fresh line
+    again.start(resume=True)
+    again.record(2, URLS[2:4], ["\"C\",3\n", "\"D\",4\n"])
+    again.close()
+    assert len(again.load(URLS)) == 3
+
+    # chunks whose films have moved are dropped
+    assert 0 not in again.load(URLS[1:] + URLS[:1])
+
+    with pytest.raises(lbmain.lbc.RequestError):
+        Checkpoint(output, "https://letterboxd.com/u/list/other/", "Title,Year").load(URLS)
+
+    again.remove()
+    assert not os.path.exists(output + JOURNAL_SUFFIX)
+
+
+def test_reused_chunks():
+    rows = ["a\n", "b\n", "c\n", "d\n"]
+    assert lbmain.reused_chunks({0: 1, 1: 0, 3: 3, 4: 2}, rows) == {0: ["b\n", "a\n"], 3: ["d\n", "c\n"]}
+    assert lbmain.reused_chunks({}, rows) == {}
+
+
+def test_missing_chunks():
+    done = {0: ["r"] * 3, 5: ["r"] * 2, 6: ["r"]}      # the last overlaps the one before
+    assert lbmain.missing_chunks(12, done, 3) == [(3, 5), (7, 10), (10, 12)]
+    assert 6 not in done
+
+
+def test_resume_matches_full_run(stub_site, tmp_path):
+    list_url = stub_site.add_list("/someone/list/resumable/", list(range(120)), ranked=True)
+    full     = str(tmp_path / "full.csv")
+    resumed  = str(tmp_path / "resumed.csv")
+
+    lbmain.get_list_with_attrs(list_url, ["director", "likes"], full)
+    assert not os.path.exists(full + JOURNAL_SUFFIX)
+
+    # pretend an earlier run got through a few chunks before dying
+    with open(full, encoding="utf-8") as f:
+        rows = [line.split(",", 1)[1] for line in f.readlines()[1:]]
+    film_urls = [stub_site.film_url(n) for n in range(120)]
+    journal   = Checkpoint(resumed, list_url, "Title,Year,Director,Likes")
+    journal.start(resume=False)
+    journal.record(0, film_urls[0:40], rows[0:40])
+    journal.record(70, film_urls[70:90], rows[70:90])
+    journal.close()
+
+    stub_site.hits.clear()
+    lbmain.get_list_with_attrs(list_url, ["director", "likes"], resumed, resume=True)
+
+    with open(full, encoding="utf-8") as f1, open(resumed, encoding="utf-8") as f2:
+        assert f1.read() == f2.read()
+
+    assert stub_site.hits["/film/film-10/"] == 0
+    assert stub_site.hits["/film/film-80/"] == 0
+    assert stub_site.hits["/film/film-50/"] == 1
+    assert not os.path.exists(resumed + JOURNAL_SUFFIX)
+
+
+def test_update_matches_full_run(stub_site, tmp_path):
+    """
+    After films are added, removed and moved around, an update should come
+    out the same as a fresh export, fetching only the films that were added.
+    """
+    list_path = "/someone/list/updatable/"
+    list_url  = stub_site.add_list(list_path, list(range(60)), ranked=True)
+    updated   = str(tmp_path / "updated.csv")
+    full      = str(tmp_path / "full.csv")
+
+    lbmain.get_list_with_attrs(list_url, ["director"], updated)
+    assert os.path.exists(updated + MANIFEST_SUFFIX)
+
+    stub_site.add_list(list_path, [100, 101] + list(range(5, 30)) + [1, 0] + list(range(40, 60)), ranked=True)
+    lb_list = lbmain.lbc.LetterboxdList(list_url)
+    changes = lb_list.diff([stub_site.film_url(n) for n in range(60)])
+    assert changes.added == [0, 1]
+    assert len(changes.removed) == 13
+    assert changes.kept[27] == 1
+    assert not changes.unchanged
+    assert lb_list.diff(list(lb_list)).unchanged
+
+    stub_site.hits.clear()
+    lbmain.get_list_with_attrs(list_url, ["director"], updated, update=True)
+    lbmain.get_list_with_attrs(list_url, ["director"], full)
+
+    with open(full, encoding="utf-8") as f1, open(updated, encoding="utf-8") as f2:
+        assert f1.read() == f2.read()
+
+    assert stub_site.hits["/film/film-100/"] == 2       # once for the update, once for the full run
+    assert stub_site.hits["/film/film-10/"] == 1
+    assert not os.path.exists(updated + JOURNAL_SUFFIX)
+
+    # an update of a different set of columns has nothing to go off of
+    with pytest.raises(lbmain.lbc.RequestError):
+        lbmain.get_list_with_attrs(list_url, ["writer"], updated, update=True)
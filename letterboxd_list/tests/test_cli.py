@@ -27,26 +27,82 @@ def test_arg_parsing_good_args():
         {
             "debug": False,
             "list_url": "https://letterboxd.com/dialectica972/list/truly-random-films/",
+            "batch": None,
+            "combined": False,
+            "format": "csv",
             "attributes": ["director", "writer", "cast-list", "likes"],
-            "output_file": "truly-random-films.csv"
+            "output_file": "truly-random-films.csv",
+            "concurrency": 64,
+            "cache_dir": None,
+            "max_age": [],
+            "rate_limit": None,
+            "max_retries": 4,
+            "http1": False,
+            "profile": None,
+            "record": None,
+            "replay": None,
+            "resume": False,
+            "update": False
         },
         {
             "debug": False,
             "list_url": "https://letterboxd.com/dialectica972/list/truly-random-films/",
+            "batch": None,
+            "combined": False,
+            "format": "csv",
             "attributes": ["director", "writer", "cast-list", "likes"],
-            "output_file": "~/path/to/output.csv"
+            "output_file": "~/path/to/output.csv",
+            "concurrency": 64,
+            "cache_dir": None,
+            "max_age": [],
+            "rate_limit": None,
+            "max_retries": 4,
+            "http1": False,
+            "profile": None,
+            "record": None,
+            "replay": None,
+            "resume": False,
+            "update": False
         },
         {
             "debug": True,
             "list_url": "https://letterboxd.com/dialectica972/list/truly-random-films/",
+            "batch": None,
+            "combined": False,
+            "format": "csv",
             "attributes": ["director", "writer", "cast-list", "likes"],
-            "output_file": "truly-random-films.csv"
+            "output_file": "truly-random-films.csv",
+            "concurrency": 64,
+            "cache_dir": None,
+            "max_age": [],
+            "rate_limit": None,
+            "max_retries": 4,
+            "http1": False,
+            "profile": None,
+            "record": None,
+            "replay": None,
+            "resume": False,
+            "update": False
         },
         {
             "debug": False,
             "list_url": "https://letterboxd.com/dialectica972/list/truly-random-films/",
+            "batch": None,
+            "combined": False,
+            "format": "csv",
             "attributes": [],
-            "output_file": "truly-random-films.csv"
+            "output_file": "truly-random-films.csv",
+            "concurrency": 64,
+            "cache_dir": None,
+            "max_age": [],
+            "rate_limit": None,
+            "max_retries": 4,
+            "http1": False,
+            "profile": None,
+            "record": None,
+            "replay": None,
+            "resume": False,
+            "update": False
         }
     ]
 
@@ -87,6 +143,17 @@ def test_cap_header():
     assert lbmain.to_capital_header("header-with-multiple-words") == "Header With Multiple Words"
 
 
+def test_max_age_arg():
+    assert lbmain.max_age_arg("90") == (None, 90)
+    assert lbmain.max_age_arg("film=7d") == ("film", 7 * 24 * 60 * 60)
+    assert lbmain.max_age_arg("stats=30m") == ("stats", 30 * 60)
+
+    with pytest.raises(lbmain.ArgumentTypeError):
+        lbmain.max_age_arg("reviews=1h")
+    with pytest.raises(lbmain.ArgumentTypeError):
+        lbmain.max_age_arg("film=soon")
+
+
 def test_gen_default_filename():
 
     sys.argv = ["lblist", "other", "args"]
@@ -0,0 +1,87 @@
+"""
+Test that `ExtractionPlan` pulls out the same values as the individual
+`LetterboxdFilm` methods, using pages from the local stand-in for
+Letterboxd (see `stub_letterboxd.py`).
+"""
+import pytest
+import src.letterboxd_list.containers as lbc
+
+LINK_ATTRS = ["writer", "director", "genre", "cast-list", "actor", "country", "avg-rating"]
+
+
+def test_plan_matches_methods(stub_site):
+    plan = lbc.ExtractionPlan(LINK_ATTRS)
+
+    for n in range(6):
+        film     = lbc.LetterboxdFilm(stub_site.film_url(n))
+        expected = [
+            film.get_cast_list()          if attr == "cast-list"  else
+            film.get_avg_rating()         if attr == "avg-rating" else
+            film.get_tabbed_attribute(attr)
+            for attr in LINK_ATTRS
+        ]
+
+        assert plan.extract(film) == expected
+        assert film.get_attrs_csv(plan) == film.get_attrs_csv(LINK_ATTRS)
+
+
+def test_plan_values(stub_site):
+    film = lbc.LetterboxdFilm(stub_site.film_url(3))
+
+    # the director is linked twice on the page, but only listed once
+    assert film.get_attrs_csv(lbc.ExtractionPlan(["director", "genre", "likes"])) \
+        == '"Director 3","Drama; Comedy",103'
+    assert film.get_attrs_csv(lbc.ExtractionPlan([])) == ""
+
+
+def test_plan_bad_attr():
+    with pytest.raises(ValueError):
+        lbc.ExtractionPlan(["director", "bingus"])
+
+    assert lbc.ExtractionPlan("country").attrs == ("country",)
+
+
+def test_records(stub_site):
+    film   = lbc.LetterboxdFilm(stub_site.film_url(4))
+    record = film.to_record(["genre", "likes"])
+
+    assert (record.url, record.title, record.year) == (film.url, film.title, film.year)
+    assert record.values == {"genre": ["Horror"], "likes": 104}
+    assert record.get_attrs_csv(["likes", "genre"]) == film.get_attrs_csv(["likes", "genre"])
+    with pytest.raises(KeyError):
+        record.get_attrs_csv(["director"])
+
+    list_url = stub_site.add_list("/someone/list/recorded/", list(range(8)))
+    lb_list  = lbc.LetterboxdList(list_url, sub_init=True, records=["director", "watches"])
+
+    assert all(isinstance(f, lbc.FilmRecord) for f in lb_list)
+    assert lb_list[5].values == {"director": ["Director 5"], "watches": 1005}
+    assert lb_list[2:4][1].title == "Film Number 3"
+    assert lb_list.diff([f.url for f in lb_list]).unchanged
+
+
+def test_page_regions_match_full_parse(stub_site):
+    """
+    Parsing only the regions of a film page should give the same values
+    as parsing the whole page, and fall back to the whole page when the
+    regions can't be found.
+    """
+    page   = lbc.lbt.Transport().get(stub_site.film_url(6)).body
+    region = lbc.page_regions(page)
+    assert region is not None and len(region) < len(page) / 2
+
+    scoped = lbc.LetterboxdFilm.from_html(stub_site.film_url(6), page)
+    full   = lbc.LetterboxdFilm.from_html(stub_site.film_url(6), page.replace("tabbed-content", "tabs"))
+    assert len(full._html.html) > len(scoped._html.html)
+
+    plan = lbc.ExtractionPlan(LINK_ATTRS)
+    assert (scoped.title, scoped.year) == (full.title, full.year) == ("Film Number 6", "1956")
+    assert plan.extract(scoped) == plan.extract(full)
+
+    assert lbc.page_regions(page.replace("js-widont", "widont")) is None
+    assert lbc.page_regions(page.replace("</head>", "")) is None
+
+    # no year link, as for some unreleased films
+    undated = lbc.LetterboxdFilm.from_html(stub_site.film_url(6), page.replace("/films/year/", "/films/when/"))
+    assert undated.year == "(not listed)"
+    assert lbc.page_regions(page.replace("/films/year/", "/films/when/")) is not None
@@ -0,0 +1,138 @@
+"""
+Test the in-process memo of films (see `memo.py`).
+"""
+import pytest
+import src.letterboxd_list.containers as lbc
+import src.letterboxd_list.transport as lbt
+import src.letterboxd_list.memo as memo_module
+from src.letterboxd_list.memo import FilmMemo, film_key
+
+
+def test_film_key():
+    assert film_key("https://letterboxd.com/film/stalker/") == ("letterboxd.com", "stalker")
+    assert film_key("https://Letterboxd.com/film/stalker") == ("letterboxd.com", "stalker")
+    assert film_key("http://127.0.0.1:8000/film/stalker/") == ("127.0.0.1:8000", "stalker")
+
+
+def test_least_recently_used_dropped():
+    memo = FilmMemo(max_films=2)
+    memo.put("a", 1)
+    memo.put("b", 2)
+    assert memo.get("a") == 1               # so "b" is now the least recently used
+    memo.put("c", 3)
+
+    assert "a" in memo and "c" in memo
+    assert memo.get("b") is None
+    assert memo.load("b", lambda: 4) == 4
+    assert len(memo) == 2
+
+    memo.clear()
+    assert len(memo) == 0
+
+    with pytest.raises(ValueError):
+        FilmMemo(max_films=-1)
+
+
+def test_old_films_dropped(monkeypatch):
+    now  = [1000.0]
+    monkeypatch.setattr(memo_module.time, "monotonic", lambda: now[0])
+    memo = FilmMemo(max_films=4, max_age=60)
+    memo.put("a", 1)
+
+    now[0] += 59
+    assert memo.get("a") == 1
+    now[0] += 2
+    assert "a" not in memo
+    assert memo.get("a") is None
+    assert memo.load("a", lambda: 2) == 2
+
+    memo = FilmMemo(max_films=4, max_age=None)
+    memo.put("a", 1)
+    now[0] += 1e9
+    assert memo.get("a") == 1
+
+
+def test_films_memoized(stub_site):
+    pool  = lbt.Transport()
+    film  = lbc.LetterboxdFilm(stub_site.film_url(3), pool)
+    again = lbc.LetterboxdFilm(stub_site.film_url(3).rstrip("/"), pool)
+
+    assert stub_site.hits["/film/film-3/"] == 1
+    assert again.title == film.title == "Film Number 3"
+    assert again.url == stub_site.film_url(3).rstrip("/")
+
+    # only the page's values are kept, not the page, and only those extracted
+    record = pool.memo.get(film_key(film.url))
+    assert isinstance(record, lbc.FilmRecord) and record.values == {}
+    assert again._html is None
+    plan = lbc.ExtractionPlan(["genre", "cast-list", "avg-rating"])
+    assert plan.extract(film) == plan.extract(again)
+    assert set(record.values) == {"genre", "cast-list", "avg-rating"}
+    assert again._html is None and stub_site.hits["/film/film-3/"] == 1
+    assert again.get_cast_list() == film.get_cast_list()
+    again.get_cast_list().clear()                           # copies, so the memo can't be changed
+    assert lbc.LetterboxdFilm(film.url, pool).get_cast_list() == film.get_cast_list()
+
+    # a value that isn't kept yet is read off the page, fetched again
+    assert again.get_tabbed_attribute("writer") == ["Writer 3", "Co-Writer 3"]
+    assert again._html is not None
+    assert lbc.ExtractionPlan(lbc.PAGE_ATTRS).extract(again) == lbc.ExtractionPlan(lbc.PAGE_ATTRS).extract(film)
+    assert set(record.values) == set(lbc.PAGE_ATTRS)
+
+    # another transport has its own memo
+    lbc.LetterboxdFilm(stub_site.film_url(3), lbt.Transport())
+    assert stub_site.hits["/film/film-3/"] == 2
+
+    lbc.LetterboxdFilm(stub_site.film_url(4), lbt.Transport(memo_size=0))
+    lbc.LetterboxdFilm(stub_site.film_url(4), lbt.Transport(memo_size=0))
+    assert stub_site.hits["/film/film-4/"] == 2
+
+
+def test_lists_share_memo(stub_site):
+    """
+    Films repeated in a list, or shared with a list initialized earlier
+    through the same transport, should only be fetched once.
+    """
+    pool   = lbt.Transport()
+    first  = lbc.LetterboxdList(stub_site.add_list("/someone/list/first/", [1, 2, 1, 3]), transport=pool)
+    first.init_films()
+    second = lbc.LetterboxdList(stub_site.add_list("/someone/list/second/", [3, 2, 5]), transport=pool)
+    second.init_films()
+    second.init_film(0)
+
+    assert [f.title for f in first] == [f"Film Number {n}" for n in (1, 2, 1, 3)]
+    assert [f.title for f in second] == [f"Film Number {n}" for n in (3, 2, 5)]
+    for n in (1, 2, 3, 5):
+        assert stub_site.hits[f"/film/film-{n}/"] == 1
+
+
+def test_record_without_rating(stub_site):
+    page   = lbt.Transport().get(stub_site.film_url(2)).body.replace("twitter:data2", "twitter:data9")
+    film   = lbc.LetterboxdFilm.from_html(stub_site.film_url(2), page)
+    record = lbc.page_record(film)
+    with pytest.raises(lbc.ChangedLetterboxdDOM):
+        film.get_avg_rating()
+
+    again = lbc.LetterboxdFilm.from_record(stub_site.film_url(2), record)
+    with pytest.raises(lbc.ChangedLetterboxdDOM):
+        again.get_avg_rating()
+    assert again._html is None                              # the error was kept, not looked for again
+
+
+def test_nothing_extracted_up_front(stub_site, monkeypatch):
+    """
+    Making a film (memoized or not) shouldn't extract anything from it, so a
+    section that can't be read only matters if it's asked for.
+    """
+    list_url = stub_site.add_list("/someone/list/bad-cast/", [1, 2])
+    monkeypatch.setattr(lbc, "_cast_dict", lambda nodes: (_ for _ in ()).throw(lbc.ChangedLetterboxdDOM("cast")))
+
+    film = lbc.LetterboxdFilm(stub_site.film_url(1), lbt.Transport(memo_size=0))
+    assert film._values == {}
+    assert film.get_tabbed_attribute("director") == ["Director 1"]
+
+    lb_list = lbc.LetterboxdList(list_url, sub_init=True, records=["director"])
+    assert [f.values for f in lb_list] == [{"director": ["Director 1"]}, {"director": ["Director 2"]}]
+
+    with pytest.raises(lbc.ChangedLetterboxdDOM):
+        film.get_cast_list()
@@ -0,0 +1,69 @@
+"""
+Test the per-stage profiling of `lblist` runs (`--profile`).
+"""
+import json
+import src.letterboxd_list.__main__ as lbmain
+import src.letterboxd_list.containers as lbc
+
+# the module the package itself records timings through
+profiling = lbc.profiling
+
+
+def test_report():
+    profile = profiling.Profile()
+    profile.add("a", "parse", 0.010, 0.009)
+    profile.add("a", "dns", 0.5)
+    profile.merge({"b": {"parse": [0.030, 0.020]}, "a": {"parse": [0.010, 0.001]}})
+
+    report = profile.report(seconds=1.5)
+    assert report["films"] == 2
+    assert report["seconds"] == 1.5
+    assert report["stages"]["parse"]["films"] == 2
+    assert report["stages"]["parse"]["wall"] == 0.05
+    assert report["stages"]["parse"]["cpu"] == 0.03
+    assert report["stages"]["parse"]["max_ms"] == 30.0
+    assert report["stages"]["dns"]["cpu"] is None           # not measured for the network
+    assert report["per_film"]["p50_ms"] == 275.0            # between a (520ms) and b (30ms)
+
+    assert [film["url"] for film in report["slowest"]] == ["a", "b"]
+    assert report["slowest"][0]["stages"] == {"dns": 500.0, "parse": 20.0}
+
+
+def test_stages_recorded(stub_site):
+    plan = lbc.ExtractionPlan(["director", "cast-list", "avg-rating", "likes"])
+    urls = [stub_site.film_url(n) for n in range(5)]
+
+    assert profiling.take() is None
+    profiling.enable()
+    try:
+        for _, film in lbc.fetch_films(urls, with_stats=True):
+            film.get_attrs_csv(plan)
+        timings = profiling.take()
+        assert profiling.take() == {}
+    finally:
+        profiling.disable()
+
+    assert sorted(timings) == sorted(urls)
+    for stages in timings.values():
+        assert set(stages) == {
+            "dns", "connect", "tls", "wait", "transfer", "stats-fetch",
+            "parse", "stats-parse", "links", "tabbed", "cast-list", "avg-rating", "stats", "csv"
+        }
+        assert all(wall >= 0 and cpu >= 0 for wall, cpu in stages.values())
+
+
+def test_profile_file(stub_site, tmp_path):
+    list_url = stub_site.add_list("/someone/list/profiled/", list(range(40)))
+    output   = str(tmp_path / "out.csv")
+    report   = str(tmp_path / "profile.json")
+
+    lbmain.get_list_with_attrs(list_url, ["genre", "watches"], output, profile_file=report)
+
+    with open(report, encoding="utf-8") as report_file:
+        summary = json.load(report_file)
+
+    assert summary["films"] == 40
+    assert summary["stages"]["tabbed"]["films"] == 40
+    assert summary["stages"]["stats-fetch"]["films"] == 40
+    assert len(summary["slowest"]) == profiling.SLOWEST_FILMS
+    assert not profiling.enabled()                          # only the workers profile
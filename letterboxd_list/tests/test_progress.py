@@ -0,0 +1,68 @@
+"""
+Test progress reporting for `lblist`.
+"""
+import io
+import json
+import src.letterboxd_list.progress as progress
+
+
+def test_worker_counts():
+    reporter = progress.ProgressReporter(total=10, workers=2)
+    reporter.add(3)
+
+    # stand in for a pool worker, in this process
+    progress.attach_worker(*reporter.initargs())
+    try:
+        progress.report_done()
+        progress.report_done(2)
+    finally:
+        progress.detach_worker()
+
+    assert reporter.done == 6
+    assert list(reporter.initargs()[0]) == [3, 0, 0]
+
+    progress.report_done()                  # not a worker anymore, so not counted
+    assert reporter.done == 6
+
+
+def test_replacement_workers():
+    """
+    A worker started in place of one that exited should count in the slot
+    it gave up, and workers left without a slot (in place of ones that were
+    killed) should share the spare one.
+    """
+    reporter = progress.ProgressReporter(total=10, workers=2)
+    counters, taken = reporter.initargs()
+
+    progress.attach_worker(counters, taken)
+    progress.report_done()
+    progress.detach_worker()
+    assert list(taken) == [0, 0]
+
+    try:
+        for _ in range(4):
+            progress.attach_worker(counters, taken)     # never detached, as if killed
+            progress.report_done()
+    finally:
+        progress.detach_worker()
+
+    assert list(counters) == [2, 1, 2]
+    assert reporter.done == 5
+
+
+def test_json_lines():
+    """
+    When not writing to a terminal, progress should come out as JSON lines,
+    including a last one once reporting stops.
+    """
+    stream   = io.StringIO()
+    reporter = progress.ProgressReporter(total=4, workers=1, stream=stream)
+
+    reporter.render()
+    with reporter:
+        reporter.add(4)
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert lines[0]["done"] == 0 and lines[0]["remaining"] is None
+    assert lines[-1]["done"] == lines[-1]["total"] == 4
+    assert lines[-1]["remaining"] == 0
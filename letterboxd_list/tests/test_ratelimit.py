@@ -0,0 +1,113 @@
+"""
+Test request pacing and retries, against the local stand-in for
+Letterboxd (see `stub_letterboxd.py`).
+"""
+import time
+import asyncio
+import pytest
+import src.letterboxd_list.ratelimit as lbrl
+import src.letterboxd_list.transport as lbt
+import src.letterboxd_list.containers as lbc
+import src.letterboxd_list.aio as lba
+
+
+def test_retry_after_seconds():
+    assert lbrl.retry_after_seconds("3") == 3
+    assert lbrl.retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0   # in the past
+    assert lbrl.retry_after_seconds("soon") is None
+    assert lbrl.retry_after_seconds(None) is None
+
+
+def test_window():
+    """
+    The window should halve on every 429 or 503, and creep back up on success.
+    """
+    limiter = lbrl.RateLimiter(max_retries=0)
+    assert limiter.concurrency(64) == 64
+
+    assert limiter.record(429, {}, 0, in_flight=40) is None
+    assert limiter.concurrency(64) == 20
+
+    limiter.record(503, {}, 0, in_flight=20)
+    assert limiter.concurrency(64) == 10
+
+    for _ in range(11):
+        limiter.record(200, {}, 0)
+    assert limiter.concurrency(64) == 11
+
+    # other errors aren't the server asking us to slow down
+    limiter.record(500, {}, 0)
+    limiter.record(404, {}, 0)
+    assert limiter.concurrency(64) == 11
+
+
+def test_token_bucket():
+    limiter = lbrl.RateLimiter(rate=20, burst=2)
+    assert limiter.try_acquire() == 0
+    assert limiter.try_acquire() == 0
+    assert limiter.try_acquire() > 0
+
+    start = time.perf_counter()
+    for _ in range(4):
+        limiter.acquire()
+    assert time.perf_counter() - start > 0.15
+
+    with pytest.raises(ValueError):
+        lbrl.RateLimiter(rate=0)
+
+    assert limiter.split(4).rate == 5
+    assert lbrl.RateLimiter().split(4).rate is None
+
+
+def test_get_retries(stub_site):
+    stub_site.throttle("/film/film-1/", 2, 503)
+    pool = lbt.Transport(limiter=lbrl.RateLimiter(base_delay=0.01))
+    film = lbc.LetterboxdFilm(stub_site.film_url(1), pool)
+
+    assert film.title == "Film Number 1"
+    assert stub_site.hits["/film/film-1/"] == 3
+
+    # once the retries run out, the error is the caller's
+    stub_site.throttle("/film/film-2/", 5, 500)
+    pool = lbt.Transport(limiter=lbrl.RateLimiter(max_retries=1, base_delay=0.01))
+    with pytest.raises(lbc.HTTPError):
+        lbc.LetterboxdFilm(stub_site.film_url(2), pool)
+    assert stub_site.hits["/film/film-2/"] == 2
+
+
+def test_fetch_retries(stub_site):
+    """
+    Throttled films should be retried without holding up the rest,
+    and come back all the same.
+    """
+    for n in range(0, 20, 4):
+        stub_site.throttle(f"/film/film-{n}/", 1, 429)
+
+    pool  = lbt.Transport(limiter=lbrl.RateLimiter(base_delay=0.01))
+    urls  = [stub_site.film_url(n) for n in range(20)]
+    films = dict(lbc.fetch_films(urls, max_concurrent=8, transport=pool))
+
+    assert [films[n].title for n in range(20)] == [f"Film Number {n}" for n in range(20)]
+    assert stub_site.hits["/film/film-4/"] == 2
+    assert pool.limiter.concurrency(8) < 8
+
+
+def test_retry_after_honoured(stub_site):
+    stub_site.throttle("/film/film-3/", 1, 429, retry_after="1")
+    pool  = lbt.Transport(limiter=lbrl.RateLimiter(base_delay=0.01))
+    start = time.perf_counter()
+    pool.get(stub_site.film_url(3))
+
+    assert time.perf_counter() - start >= 1
+
+
+def test_async_retries(stub_site):
+    stub_site.throttle("/film/film-5/", 2, 429)
+
+    async def load():
+        pool = lbt.Transport(limiter=lbrl.RateLimiter(base_delay=0.01))
+        async with lba.AsyncTransport(pool) as transport:
+            return await lba.AsyncLetterboxdFilm.load(stub_site.film_url(5), transport)
+
+    assert asyncio.run(load()).title == "Film Number 5"
+    assert stub_site.hits["/film/film-5/"] == 3
@@ -0,0 +1,65 @@
+"""
+Test recording responses and replaying them without the network, against
+the local stand-in for Letterboxd (see `stub_letterboxd.py`).
+"""
+import pytest
+import src.letterboxd_list.__main__ as lbmain
+import src.letterboxd_list.transport as lbt
+import src.letterboxd_list.containers as lbc
+from src.letterboxd_list.replay import ResponseArchive, NotRecordedError
+
+
+def test_round_trip(stub_site, tmp_path):
+    archive = ResponseArchive(str(tmp_path / "run.sqlite3"), "record")
+    pool    = lbt.Transport(archive=archive)
+    film    = lbc.LetterboxdFilm(stub_site.film_url(2), pool)
+    film.get_likes()
+    pool.get(stub_site.url + "/status/404/")
+
+    assert len(archive) == 3
+    assert archive.urls() == sorted([stub_site.film_url(2), lbc.stats_url(stub_site.film_url(2)),
+                                     stub_site.url + "/status/404/"])
+
+    stub_site.close()                       # nothing left to answer requests
+    replay = lbt.Transport(archive=ResponseArchive(archive.path, "replay"))
+    again  = lbc.LetterboxdFilm(stub_site.film_url(2), replay)
+
+    assert again.title == film.title
+    assert again.get_likes() == film.get_likes()
+    assert replay.get(stub_site.url + "/status/404/").status == 404
+    assert replay.connections == 0
+
+    with pytest.raises(NotRecordedError):
+        lbc.LetterboxdFilm(stub_site.film_url(3), replay)
+
+
+def test_bad_archives(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ResponseArchive(str(tmp_path / "nothing.sqlite3"))
+    with pytest.raises(ValueError):
+        ResponseArchive(str(tmp_path / "run.sqlite3"), "rewind")
+
+
+def test_replayed_export_matches(stub_site, tmp_path):
+    list_url = stub_site.add_list("/someone/list/recorded/", list(range(40)), ranked=True)
+    recorded = str(tmp_path / "recorded.csv")
+    replayed = str(tmp_path / "replayed.csv")
+    path     = str(tmp_path / "run.sqlite3")
+
+    lbmain.get_list_with_attrs(
+        list_url, ["genre", "watches"], recorded,
+        transport_options={"archive": ResponseArchive(path, "record")}
+    )
+
+    stub_site.hits.clear()
+    try:
+        lbmain.get_list_with_attrs(
+            list_url, ["genre", "watches"], replayed,
+            transport_options={"archive": ResponseArchive(path, "replay")}
+        )
+    finally:
+        lbmain.lbt.configure_default_transport()        # back to the network, for later tests
+
+    with open(recorded, encoding="utf-8") as f1, open(replayed, encoding="utf-8") as f2:
+        assert f1.read() == f2.read()
+    assert sum(stub_site.hits.values()) == 0
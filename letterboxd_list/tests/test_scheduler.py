@@ -0,0 +1,51 @@
+"""
+Test how `lblist` hands out chunks of films to its workers.
+"""
+from src.letterboxd_list.scheduler import ChunkScheduler
+
+
+def hand_out(scheduler: ChunkScheduler) -> list[tuple[int, int]]:
+    chunks = []
+    while (chunk := scheduler.next_chunk()) is not None:
+        chunks.append(chunk)
+    return chunks
+
+
+def test_covers_gaps_in_order():
+    scheduler = ChunkScheduler([(0, 50), (60, 61), (70, 200)], workers=2, min_size=16, max_size=64)
+    assert scheduler.remaining == 181
+    assert scheduler.next_start == 0
+
+    chunks  = hand_out(scheduler)
+    covered = [n for start, end in chunks for n in range(start, end)]
+    assert covered == list(range(0, 50)) + [60] + list(range(70, 200))
+    assert scheduler.remaining == 0
+    assert scheduler.next_start is None
+
+
+def test_tail_shrinks():
+    """
+    The last chunks should get down to single films, so no worker is left
+    with a whole chunk to go while the others are done.
+    """
+    chunks = hand_out(ChunkScheduler([(0, 500)], workers=4, min_size=16, max_size=64))
+    sizes  = [end - start for start, end in chunks]
+
+    assert sizes[0] == 16
+    assert sizes[-1] == 1
+    assert sizes == sorted(sizes, reverse=True)
+
+
+def test_sized_from_rate():
+    scheduler = ChunkScheduler([(0, 10_000)], workers=4, min_size=16, max_size=64, target_seconds=2)
+
+    scheduler.record(16, 1.0)               # 16 films/s, so 32 films in 2s
+    assert scheduler.chunk_size() == 32
+
+    for _ in range(20):
+        scheduler.record(64, 0.5)           # much faster: capped at max_size
+    assert scheduler.chunk_size() == 64
+
+    for _ in range(20):
+        scheduler.record(16, 30)            # much slower: kept at min_size
+    assert scheduler.chunk_size() == 16
@@ -0,0 +1,112 @@
+"""
+Test the output sinks, which write rows as they finish, in list order.
+"""
+import json
+import pytest
+import src.letterboxd_list.sinks as lbsinks
+import src.letterboxd_list.__main__ as lbmain
+
+
+def test_rows_in_order(tmp_path):
+    path = tmp_path / "out.csv"
+
+    with lbsinks.CSVSink(str(path), "Title,Year", ranked=True) as sink:
+        sink.write(2, ["\"C\",2003\n", "\"D\",2004\n"])
+        sink.write(4, ["\"E\",2005\n"])
+        assert sink.written == 0
+        assert sink.buffered == 3
+
+        sink.write(0, ["\"A\",2001\n", "\"B\",2002\n"])
+        assert sink.written == 5
+        assert sink.buffered == 0
+
+    assert path.read_text().splitlines() == [
+        "Rank,Title,Year",
+        "1,\"A\",2001",
+        "2,\"B\",2002",
+        "3,\"C\",2003",
+        "4,\"D\",2004",
+        "5,\"E\",2005",
+    ]
+
+
+def test_rows_visible_while_running(tmp_path):
+    path = tmp_path / "out.csv"
+
+    with lbsinks.CSVSink(str(path), "Title,Year", ranked=False, flush_every=0) as sink:
+        sink.write(0, ["\"A\",2001\n"])
+        assert path.read_text() == "Title,Year\n\"A\",2001\n"
+
+
+def test_json_lines(tmp_path):
+    path = tmp_path / "out.jsonl"
+
+    with lbsinks.JSONLinesSink(str(path), ["title", "year", "genre", "cast-list", "likes"], ranked=True) as sink:
+        sink.write(1, [["B", "(not listed)", ["(not listed)"], {}, 7]])
+        sink.write(0, [["A", "2001", ["Drama", "Horror"], {"Actor": "Role"}, 12]])
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert lines == [
+        {"rank": 1, "title": "A", "year": 2001, "genre": ["Drama", "Horror"], "cast-list": {"Actor": "Role"}, "likes": 12},
+        {"rank": 2, "title": "B", "year": None, "genre": None, "cast-list": None, "likes": 7},
+    ]
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_arrow_columns(tmp_path, fmt):
+    """
+    Parquet and Arrow files should have typed, nested columns, built up in
+    batches, that read back without any string parsing.
+    """
+    pa   = pytest.importorskip("pyarrow")
+    path = str(tmp_path / f"out.{fmt}")
+    rows = [
+        [f"Film {n}", str(2000 + n), ["Drama"] if n % 2 else ["(not listed)"], {f"Actor {n}": "Self"}, 4.5, 1000 + n]
+        for n in range(25)
+    ]
+
+    columns = ["title", "year", "genre", "cast-list", "avg-rating", "watches"]
+    with lbsinks.ArrowSink(path, columns, ranked=True, fmt=fmt, batch_rows=10) as sink:
+        sink.write(10, rows[10:])
+        sink.write(0, rows[:10])
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(path)
+    else:
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+
+    assert table.column_names == ["rank"] + columns
+    assert table.schema.field("watches").type == pa.int64()
+    assert table.schema.field("avg-rating").type == pa.float64()
+    assert table.schema.field("genre").type == pa.list_(pa.string())
+    assert table.num_rows == 25
+
+    data = table.to_pylist()
+    assert data[3] == {
+        "rank": 4, "title": "Film 3", "year": 2003, "genre": ["Drama"],
+        "cast-list": [("Actor 3", "Self")], "avg-rating": 4.5, "watches": 1003
+    }
+    assert data[4]["genre"] is None
+
+
+def test_export_formats(stub_site, tmp_path):
+    list_url = stub_site.add_list("/someone/list/structured/", [0, 1, 2], ranked=True)
+    output   = str(tmp_path / "out.jsonl")
+
+    lbmain.get_list_with_attrs(list_url, ["likes", "cast-list", "writer"], output, output_format="jsonl")
+
+    with open(output, encoding="utf-8") as out:
+        films = [json.loads(line) for line in out]
+    assert films[1] == {
+        "rank":      2,
+        "title":     "Film Number 1",
+        "year":      1951,
+        "cast-list": {f"Actor 1-{k}": f"Role {k}" for k in range(3)},
+        "likes":     101,
+        "writer":    ["Writer 1", "Co-Writer 1"],
+    }
+
+    with pytest.raises(lbmain.lbc.RequestError):
+        lbmain.get_list_with_attrs(list_url, ["likes"], output, update=True, output_format="jsonl")
@@ -0,0 +1,79 @@
+"""
+Test compressed transfers, and the accounting of the bytes downloaded.
+"""
+import src.letterboxd_list.__main__ as lbmain
+import src.letterboxd_list.transport as lbt
+import src.letterboxd_list.containers as lbc
+import src.letterboxd_list.traffic as lbtraffic
+
+
+def test_counted_by_kind(stub_site):
+    """
+    Responses should be tallied under the same kinds of page the cache
+    tells apart.
+    """
+    traffic = lbtraffic.Traffic()
+    for url in (stub_site.film_url(1), lbc.stats_url(stub_site.film_url(1)), stub_site.url + "/status/404/"):
+        traffic.record(url, 10, 20)
+
+    assert traffic.counts() == {"film": [1, 10, 20], "stats": [1, 10, 20], "list": [1, 10, 20]}
+
+
+def test_tally():
+    traffic = lbtraffic.Traffic()
+    traffic.add("film", 2, 1_000, 4_000)
+    traffic.merge({"film": [1, 500, 2_000], "list": [1, 300, 300]})
+
+    assert traffic.counts() == {"film": [3, 1_500, 6_000], "list": [1, 300, 300]}
+    assert (traffic.wire, traffic.body) == (1_800, 6_300)
+
+    report = traffic.report().splitlines()
+    assert report[0].split() == ["Downloaded:", "1.8", "kB", "(6.3", "kB", "decompressed,",
+                                 "71%", "saved)", "in", "4", "response(s)"]
+    assert report[1].strip().startswith("List pages:")     # in the order of RESOURCES
+    assert report[2].strip().startswith("Film pages:")
+
+    assert traffic.take() == {"film": [3, 1_500, 6_000], "list": [1, 300, 300]}
+    assert traffic.counts() == {}
+
+
+def test_compressed_responses(stub_site):
+    stub_site.compression = "gzip"
+    urls = [stub_site.film_url(n) for n in range(10)]
+
+    plain      = lbt.Transport(compressed=False)
+    compressed = lbt.Transport()
+    for pool in (plain, compressed):
+        pages = lbt.FetchEngine(transport=pool).fetch_ordered(urls)
+        assert all("js-widont" in page.body for page in pages)
+        pool.get(lbc.stats_url(urls[0]))
+
+    assert plain.traffic.wire == plain.traffic.body
+    assert compressed.traffic.body == plain.traffic.body
+    assert compressed.traffic.wire < compressed.traffic.body / 2
+    assert compressed.traffic.counts()["film"][0] == 10
+    assert compressed.traffic.counts()["stats"][0] == 1
+
+
+def test_export_report(stub_site, tmp_path, capsys):
+    stub_site.compression = "gzip"
+    list_url = stub_site.add_list("/someone/list/weighed/", list(range(30)))
+
+    lbmain.get_list_with_attrs(list_url, ["genre", "likes"], str(tmp_path / "out.csv"))
+
+    report = capsys.readouterr().out.split("Downloaded:")[1]
+    assert "in 61 response(s)" in report.splitlines()[0]
+    assert "List pages:" in report and "in 1 response(s)" in report
+    assert "Film pages:" in report and "Stats pages:" in report
+
+
+def test_cut_short_counted(stub_site):
+    """
+    A page that's cut short should be counted as only what was kept of it.
+    """
+    url  = stub_site.film_url(3)
+    pool = lbt.Transport(early_abort=True, compressed=False)
+    page = pool.get(url)
+
+    assert len(page.body) < len(lbt.Transport().get(url).body) / 4
+    assert pool.traffic.counts()["film"][2] == len(page.body.encode())
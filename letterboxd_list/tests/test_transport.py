@@ -0,0 +1,248 @@
+"""
+Test the networking layer against a local stand-in for Letterboxd
+(see `stub_letterboxd.py`), so these tests don't depend on the real site.
+"""
+import time
+import pytest
+import pycurl
+import src.letterboxd_list.transport as lbt
+import src.letterboxd_list.containers as lbc
+import src.letterboxd_list.streaming as lbs
+
+
+def test_fetch_all_urls(stub_site):
+    urls      = [stub_site.film_url(n) for n in range(30)]
+    engine    = lbt.FetchEngine(max_concurrent=8)
+    positions = []
+
+    for i, resp in engine.fetch(urls):
+        assert resp.url == urls[i]
+        assert resp.status == 200
+        assert f"Film Number {i}<" in resp.body
+        positions.append(i)
+
+    assert sorted(positions) == list(range(30))
+
+
+def test_fetch_ordered(stub_site):
+    urls      = [stub_site.film_url(n) for n in range(10)] + [stub_site.url + "/status/404/"]
+    responses = lbt.FetchEngine(max_concurrent=4).fetch_ordered(urls)
+
+    assert [r.url for r in responses] == urls
+    assert responses[-1].status == 404          # HTTP errors are left to the caller
+
+
+def test_requests_overlap(stub_site):
+    """
+    With 20 requests that each take 0.2s, doing them one at a time
+    would take 4s. With 20 in flight, it should take about 0.2s.
+    """
+    stub_site.latency = 0.2
+    urls  = [stub_site.film_url(n) for n in range(20)]
+    start = time.perf_counter()
+    lbt.FetchEngine(max_concurrent=20).fetch_ordered(urls)
+
+    assert time.perf_counter() - start < 2
+
+
+def test_http_versions(stub_site):
+    """
+    The stand-in site only speaks HTTP/1.1 (without TLS), so a transport
+    asking for HTTP/2 should fall back to it, still keeping requests in flight
+    together over separate connections.
+    """
+    stub_site.latency = 0.2
+    urls = [stub_site.film_url(n) for n in range(20)]
+
+    for http2 in (True, False):
+        pool  = lbt.Transport(http2=http2)
+        start = time.perf_counter()
+        pages = lbt.FetchEngine(max_concurrent=20, transport=pool).fetch_ordered(urls)
+
+        assert time.perf_counter() - start < 2
+        assert [page.url for page in pages] == urls
+        assert pool.http2 == (http2 and lbt.HTTP2_SUPPORTED)
+
+
+def test_network_error():
+    with pytest.raises(pycurl.error):
+        lbt.FetchEngine().fetch_ordered(["http://127.0.0.1:9/film/nothing-here/"])
+
+    with pytest.raises(ValueError):
+        lbt.FetchEngine(max_concurrent=0)
+
+
+def test_fetch_films(stub_site):
+    urls  = [stub_site.film_url(n) for n in range(12)]
+    films = dict(lbc.fetch_films(urls, max_concurrent=5))
+
+    assert len(films) == 12
+    for i, film in films.items():
+        assert film.url == urls[i]
+        assert film.title == f"Film Number {i}"
+        assert film.get_tabbed_attribute("writer") == [f"Writer {i}", f"Co-Writer {i}"]
+
+    with pytest.raises(lbc.RequestError):
+        list(lbc.fetch_films([stub_site.url + "/film/not-a-film/"]))
+
+
+def test_list_pages_in_order(stub_site):
+    """
+    350 films is 4 pages, the last 3 of which are fetched concurrently;
+    the URLs should still come out in list order.
+    """
+    list_url = stub_site.add_list("/someone/list/long-one/", list(range(350)))
+    lb_list  = lbc.LetterboxdList(list_url)
+
+    assert lb_list.num_pages == 4
+    assert lb_list.length == 350
+    assert list(lb_list) == [stub_site.film_url(n) for n in range(350)]
+    for page in range(2, 5):
+        assert stub_site.hits[f"/someone/list/long-one/page/{page}/"] == 1
+
+
+def test_list_init_films(stub_site):
+    list_url = stub_site.add_list("/someone/list/short-one/", [5, 3, 8, 1])
+    lb_list  = lbc.LetterboxdList(list_url, sub_init=True, max_concurrent=2)
+
+    assert [f.title for f in lb_list] == [f"Film Number {n}" for n in (5, 3, 8, 1)]
+
+
+def test_connections_reused(stub_site):
+    """
+    Films (and their stats pages) fetched through the same `Transport`
+    should all go over the one connection the first film opened.
+    """
+    pool  = lbt.Transport()
+    films = [lbc.LetterboxdFilm(stub_site.film_url(n), pool) for n in range(10)]
+    for film in films:
+        film.get_likes()
+
+    assert pool.connections == 1
+
+    list_url = stub_site.add_list("/someone/list/pooled/", list(range(250)))
+    lb_list  = lbc.LetterboxdList(list_url, transport=pool)
+    subset   = lb_list[5:10]
+    subset.init_films()
+
+    assert subset._transport is pool
+    assert pool.connections <= 1 + lbc.PAGE_CONCURRENCY
+
+
+def test_slices_share_films(stub_site):
+    """
+    Slicing shouldn't copy (or re-parse) the films already initialized, and
+    initializing films through a slice shouldn't touch the original list.
+    """
+    list_url = stub_site.add_list("/someone/list/sliced/", list(range(20)))
+    lb_list  = lbc.LetterboxdList(list_url)
+    lb_list.init_films(range(10))
+
+    subset = lb_list[5:15]
+    assert subset[0] is lb_list[5]
+    assert subset._transport is lb_list._transport
+
+    subset.init_film(7)
+    assert subset.is_initialized(7)
+    assert not lb_list.is_initialized(12)
+    assert [f.title for f in subset[:5]] == [f"Film Number {n}" for n in range(5, 10)]
+
+
+def test_default_transport():
+    assert lbt.default_transport() is lbt.default_transport()
+
+
+def test_fetch_films_with_stats(stub_site):
+    """
+    Stats pages should be fetched along with the film pages when asked,
+    so getting likes and watches afterwards makes no more requests.
+    """
+    urls   = [stub_site.film_url(n) for n in range(8)]
+    films  = dict(lbc.fetch_films(urls, max_concurrent=3, with_stats=True))
+    before = sum(stub_site.hits.values())
+
+    for i, film in films.items():
+        assert film.title == f"Film Number {i}"
+        assert film.get_likes() == 100 + i
+        assert film.get_watches() == 1000 + i
+
+    assert sum(stub_site.hits.values()) == before == 16
+
+    # and not at all when not asked
+    dict(lbc.fetch_films([stub_site.film_url(20)]))
+    assert stub_site.hits["/csi/film/film-20/stats/"] == 0
+
+
+def test_stats_url():
+    assert lbc.stats_url("https://letterboxd.com/film/stalker/") \
+        == "https://letterboxd.com/csi/film/stalker/stats/"
+
+
+def test_page_cutoff(stub_site):
+    page = lbt.Transport().get(stub_site.film_url(4)).body.encode()
+    done = page.index(b"</div>", page.index(b"tab-genres")) + len(b"</div></div>")
+
+    for size in (1, 7, 64, len(page)):
+        cutoff = lbs.PageCutoff()
+        fed    = 0
+        while not cutoff.feed(page[fed:fed + size]):
+            fed += size
+            assert fed < len(page)
+        assert fed < done <= fed + size
+
+    # pages that don't look as expected are read to the end
+    for changed in (
+        page.replace(b"js-widont", b"widont"),
+        page.replace(b"/films/year/", b"/films/when/"),
+        page.replace(b"tabbed-content", b"tabs"),
+        page[:done - 1],
+    ):
+        cutoff = lbs.PageCutoff()
+        assert not any(cutoff.feed(changed[i:i + 16]) for i in range(0, len(changed), 16))
+
+    assert lbs.is_film_page(stub_site.film_url(4))
+    assert not lbs.is_film_page(lbc.stats_url(stub_site.film_url(4)))
+    assert not lbs.is_film_page(stub_site.url + "/someone/list/films/")
+
+
+def test_cut_short_body_decodes(stub_site):
+    """
+    A chunk that ends partway through a character mustn't leave half of it
+    at the end of a page that's cut short.
+    """
+    page  = lbt.Transport().get(stub_site.film_url(4)).body.replace("A review.", "Une critique élogieuse.")
+    data  = page.encode()
+    split = data.index("é".encode(), data.index(b"film-recent-reviews")) + 1
+
+    transfer = lbt.Transfer(stub_site.film_url(4), cutoff=lbs.PageCutoff(), cut_http1=True)
+    assert transfer.write(data[:split]) == 0
+    assert transfer.cut_short
+
+    body = transfer.buffer.getvalue().decode()
+    assert page.startswith(body) and body.endswith("</div></div>")
+
+
+def test_early_abort(stub_site):
+    """
+    With long film pages, only the start of each should be downloaded,
+    without changing what's read from them. The stand-in site only speaks
+    HTTP/1.1, so that's only done when asked for.
+    """
+    urls  = [stub_site.film_url(n) for n in range(8)]
+    whole = lbt.Transport().get(urls[0]).body
+
+    pool  = lbt.Transport(early_abort=True)
+    pages = lbt.FetchEngine(max_concurrent=4, transport=pool).fetch_ordered(urls)
+    assert all(page.status == 200 and len(page.body) < len(whole) / 4 for page in pages)
+    assert len(pool.get(urls[0]).body) < len(whole) / 4
+    assert len(pool.get(lbc.stats_url(urls[0])).body) > 0
+
+    films = dict(lbc.fetch_films(urls, transport=pool))
+    plan  = lbc.ExtractionPlan(["director", "writer", "genre", "cast-list", "avg-rating"])
+    for i, film in films.items():
+        full = lbc.LetterboxdFilm.from_html(urls[i], lbt.Transport().get(urls[i]).body)
+        assert (film.title, film.year) == (full.title, full.year)
+        assert plan.extract(film) == plan.extract(full)
+
+    pages = lbt.FetchEngine(transport=lbt.Transport()).fetch_ordered(urls)
+    assert all(len(page.body) > len(whole) / 2 for page in pages)